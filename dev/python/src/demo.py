@@ -10,6 +10,7 @@ from lib.camera_thread import CameraThread
 from lib.point import Point
 from lib.vision_processor import VisionProcessor
 from lib.zone_manager import ZoneManager
+from lib.zone_overlay import ZoneOverlay
 from PIL import Image, ImageTk
 
 
@@ -34,6 +35,7 @@ class MainApplication:
 
         # Initialize managers and components
         self.zone_manager = ZoneManager()
+        self.zone_overlay = ZoneOverlay()
         self.init_sim_frame()
         self.init_edit_frame()
         self.update_zone_list()
@@ -82,15 +84,10 @@ class MainApplication:
                 self.vision_processor.calculate_homography(
                     points, data.get("distances", {})
                 )
-                dimensions = self.vision_processor.get_output_dimensions()
-
-                if dimensions is None:
-                    return
-
                 # Apply homography transform
-                warped = cv2.warpPerspective(
-                    self.last_frame, self.vision_processor._matrix, dimensions
-                )
+                warped = self.vision_processor.warp(self.last_frame)
+                if warped is None:
+                    return
 
                 self._draw_grid(warped)
                 self._draw_zones(warped)
@@ -116,22 +113,7 @@ class MainApplication:
 
     def _draw_zones(self, warped):
         """Draw zones and current polygon"""
-        for zone in self.zone_manager.zones:
-            points = np.array(zone)
-            cv2.fillPoly(
-                warped,
-                [points.astype(np.int32)],
-                (50, 50, 150, 100),
-                lineType=cv2.LINE_AA,
-            )
-            cv2.polylines(
-                warped,
-                [points.astype(np.int32)],
-                True,
-                (100, 100, 200),
-                2,
-                lineType=cv2.LINE_AA,
-            )
+        self.zone_overlay.apply(warped, self.zone_manager)
 
         if self.drawing_mode.get() and self.zone_manager.current_polygon:
             points = np.array(self.zone_manager.current_polygon)
@@ -219,18 +201,9 @@ class MainApplication:
                     }
                 )
 
-                # Calculate prediction
-                if "prev_coord" in existing_point:
-                    dx = existing_point["coord"][0] - existing_point["prev_coord"][0]
-                    dy = existing_point["coord"][1] - existing_point["prev_coord"][1]
-
-                    speed = np.sqrt(dx * dx + dy * dy)
-                    scale = min(max(speed / 10, 3.0), 15.0)
-
-                    existing_point["predicted"] = (
-                        existing_point["mapped"][0] + dx * scale,
-                        existing_point["mapped"][1] + dy * scale,
-                    )
+                # Prediction comes from the camera thread's Kalman filters
+                if "predicted" in point_data:
+                    existing_point["predicted"] = point_data["predicted"]
             else:
                 point_data["last_update"] = current_time
                 self.mapped_points.append(point_data)
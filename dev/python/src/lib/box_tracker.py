@@ -0,0 +1,117 @@
+from typing import Optional
+
+import numpy as np
+
+from .detections import Detections
+
+
+class BoxTracker:
+    """
+    Lightweight constant-velocity tracker that fills the gaps between detections.
+
+    The detector (with its own tracker) stays authoritative for which ids
+    exist. Between two detector results this class extrapolates every box
+    center with a smoothed per-track velocity, so positions can be produced
+    at capture frame rate while detection runs much slower.
+
+    There is no association step: boxes are matched to the previous result
+    by detector id only, and each id keeps moving at its last velocity
+    (constant-velocity model) until the next detection replaces it.
+    Extrapolated boxes are for display and mapping; they must not be fed
+    back as measurements (see ``detection``).
+
+    Attributes:
+        smoothing (float): Weight of the newest velocity measurement (0-1]
+        max_extrapolation (float): Longest time in seconds a box is moved
+            past its last detection
+        detection_seq (int): Frame sequence of the last detection used
+        detection (Optional[Detections]): Last detection used, unmoved
+
+    Example:
+        >>> tracker = BoxTracker()
+        >>> tracker.update(frame_buffer.get_result())
+        >>> detections = tracker.predict(packet.seq, packet.capture_time)
+    """
+
+    def __init__(self, smoothing: float = 0.5, max_extrapolation: float = 0.5):
+        """
+        Initialize tracker.
+
+        Args:
+            smoothing (float, optional): Velocity smoothing factor. Defaults to 0.5.
+            max_extrapolation (float, optional): Extrapolation limit in seconds.
+                                                 Defaults to 0.5.
+        """
+        self.smoothing = smoothing
+        self.max_extrapolation = max_extrapolation
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all tracks."""
+        self.detection_seq = -1
+        self.detection: Optional[Detections] = None
+        self._ids = np.zeros(0, np.int32)
+        self._boxes = np.zeros((0, 4), np.float32)
+        self._velocities = np.zeros((0, 2), np.float32)
+        self._confidences = np.zeros(0, np.float32)
+        self._has_velocity = np.zeros(0, bool)
+        self._time = 0.0
+
+    def update(self, detections: Optional[Detections]) -> None:
+        """
+        Feed the latest detector result; repeated results are ignored.
+
+        Args:
+            detections (Optional[Detections]): Latest detector result
+        """
+        if detections is None or detections.frame_seq == self.detection_seq:
+            return
+        self.detection_seq = detections.frame_seq
+        self.detection = detections
+
+        velocities = np.zeros((len(detections), 2), np.float32)
+        has_velocity = np.zeros(len(detections), bool)
+        dt = detections.capture_time - self._time
+        if len(self._ids) and dt > 0:
+            previous = {track_id: i for i, track_id in enumerate(self._ids.tolist())}
+            for i, track_id in enumerate(detections.track_ids.tolist()):
+                j = previous.get(track_id)
+                if j is None:
+                    continue
+                measured = (detections.boxes[i, :2] - self._boxes[j, :2]) / dt
+                if self._has_velocity[j]:
+                    measured = (
+                        self.smoothing * measured
+                        + (1 - self.smoothing) * self._velocities[j]
+                    )
+                velocities[i] = measured
+                has_velocity[i] = True
+
+        self._ids = detections.track_ids.copy()
+        self._boxes = detections.boxes.copy()
+        self._velocities = velocities
+        self._confidences = detections.confidences.copy()
+        self._has_velocity = has_velocity
+        self._time = detections.capture_time
+
+    def predict(self, frame_seq: int, capture_time: float) -> Detections:
+        """
+        Extrapolate the tracked boxes to a frame.
+
+        Args:
+            frame_seq (int): Sequence number of the frame
+            capture_time (float): Capture time of the frame
+
+        Returns:
+            Detections: Boxes moved to where they are expected at capture_time
+        """
+        elapsed = min(max(capture_time - self._time, 0.0), self.max_extrapolation)
+        boxes = self._boxes.copy()
+        boxes[:, :2] += self._velocities * elapsed
+        return Detections(
+            boxes=boxes,
+            track_ids=self._ids.copy(),
+            confidences=self._confidences.copy(),
+            frame_seq=frame_seq,
+            capture_time=capture_time,
+        )
@@ -0,0 +1,239 @@
+import time
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .frame_pool import FramePool
+
+
+def is_device_source(source: Union[int, str]) -> bool:
+    """
+    Check whether a capture source is a local camera device.
+
+    Args:
+        source (Union[int, str]): Camera index, device path, file or stream URL
+
+    Returns:
+        bool: True for camera indices (also as strings) and /dev paths
+    """
+    if isinstance(source, int):
+        return True
+    return source.isdigit() or source.startswith("/dev/")
+
+
+class CameraCapture:
+    """
+    Camera reader that always delivers the newest frame and survives device errors.
+
+    In low-latency mode every ``read`` first drains the driver queue with
+    ``grab()``: grabs that return almost immediately were already queued
+    (stale), so grabbing continues until one blocks for a fresh frame or
+    ``max_drain`` frames were skipped. Only that newest frame is decoded with
+    ``retrieve()``. The capture time is the moment its grab returned, and the
+    delay until the frame is handed over is tracked as the capture age.
+
+    Failed reads do not spin: each failure sleeps with exponential backoff,
+    and after ``reconnect_after`` failures in a row the device is released
+    and reopened. A device that cannot be opened is retried on every read,
+    with the same backoff.
+
+    Frames are decoded into a FramePool and returned as read-only views;
+    the caller owns one hold on each frame and must release it to the pool.
+
+    Attributes:
+        source (Union[int, str]): Camera index or stream URL
+        low_latency (bool): Drain queued frames with grab()/retrieve(); always
+            off for files and streams, where draining would drop frames
+        capture_age (float): Smoothed grab-to-handover delay in seconds
+        last_capture_age (float): Grab-to-handover delay of the last frame
+        drained_frames (int): Stale frames skipped so far
+        reconnects (int): Number of reopen attempts
+        failures (int): Consecutive failed reads
+
+    Example:
+        >>> capture = CameraCapture(0)
+        >>> ok, frame, capture_time = capture.read()
+        >>> if ok:
+        ...     print(f"age: {capture.last_capture_age * 1000:.1f} ms")
+        ...     capture.pool.release(frame)
+        >>> capture.release()
+    """
+
+    def __init__(
+        self,
+        source: Union[int, str] = 0,
+        low_latency: bool = True,
+        pool: Optional[FramePool] = None,
+        buffer_size: int = 1,
+        max_drain: int = 8,
+        drain_threshold: float = 0.004,
+        reconnect_after: int = 5,
+        min_backoff: float = 0.05,
+        max_backoff: float = 2.0,
+    ):
+        """
+        Initialize the capture; the device is opened on the first read.
+
+        Args:
+            source (Union[int, str], optional): Camera index or URL. Defaults to 0.
+            low_latency (bool, optional): Drain stale frames; ignored unless
+                                          the source is a camera device.
+                                          Defaults to True.
+            pool (Optional[FramePool], optional): Frame buffer pool.
+                                                  Defaults to a new pool.
+            buffer_size (int, optional): Requested driver queue length.
+                                         Defaults to 1.
+            max_drain (int, optional): Maximum stale frames skipped per read.
+                                       Defaults to 8.
+            drain_threshold (float, optional): Grabs faster than this (seconds)
+                                               count as queued. Defaults to 0.004.
+            reconnect_after (int, optional): Failures before reopening.
+                                             Defaults to 5.
+            min_backoff (float, optional): First retry delay. Defaults to 0.05.
+            max_backoff (float, optional): Maximum retry delay. Defaults to 2.0.
+        """
+        self.source = source
+        self.low_latency = low_latency and is_device_source(source)
+        self.pool = pool if pool is not None else FramePool()
+        self.buffer_size = buffer_size
+        self.max_drain = max_drain
+        self.drain_threshold = drain_threshold
+        self.reconnect_after = reconnect_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self.cap: Optional[cv2.VideoCapture] = None
+        self.capture_age = 0.0
+        self.last_capture_age = 0.0
+        self.drained_frames = 0
+        self.reconnects = 0
+        self.failures = 0
+        self._backoff = min_backoff
+
+    def open(self) -> bool:
+        """
+        Open (or reopen) the device.
+
+        Returns:
+            bool: True if the device is open
+        """
+        self.release()
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        # Not every backend supports this; draining covers the rest
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        self.cap = cap
+        return True
+
+    def is_opened(self) -> bool:
+        """Check whether the device is open."""
+        return self.cap is not None and self.cap.isOpened()
+
+    def release(self) -> None:
+        """Release the device."""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def _grab_latest(self) -> Tuple[bool, float]:
+        """
+        Grab frames until the newest one is reached.
+
+        Returns:
+            Tuple[bool, float]: Success flag and the time the last grab returned
+        """
+        start = time.time()
+        if not self.cap.grab():
+            return False, 0.0
+        grabbed_at = time.time()
+        if not self.low_latency:
+            return True, grabbed_at
+
+        # A grab that returns at once was served from the queue, so the
+        # frame is stale; stop at the first grab that had to wait
+        for _ in range(self.max_drain):
+            if grabbed_at - start >= self.drain_threshold:
+                break
+            start = grabbed_at
+            if not self.cap.grab():
+                return False, 0.0
+            grabbed_at = time.time()
+            self.drained_frames += 1
+        return True, grabbed_at
+
+    def _retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decode the grabbed frame into a pooled buffer."""
+        buffer = self.pool.acquire()
+        if buffer is None:
+            ret, image = self.cap.retrieve()
+        else:
+            ret, image = self.cap.retrieve(image=buffer)
+        if not ret or image is None:
+            if buffer is not None:
+                self.pool.release(buffer)
+            return False, None
+        if image is not buffer:
+            # First frame or a new resolution: the capture allocated the image
+            self.pool.adopt(image)
+        return True, FramePool.freeze(image)
+
+    def _fail(self) -> None:
+        """Back off after a failed read and reconnect if failures persist."""
+        self.failures += 1
+        time.sleep(self._backoff)
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+        if self.is_opened() and self.failures % self.reconnect_after == 0:
+            # The next read reopens the device
+            self.reconnects += 1
+            print(f"Reconnecting camera {self.source} (attempt {self.reconnects})")
+            self.release()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        Read the newest frame.
+
+        On failure this sleeps for the current backoff before returning, so
+        callers can simply retry in a loop.
+
+        Returns:
+            Tuple[bool, Optional[np.ndarray], float]: Success flag, read-only
+                frame (held for the caller, see FramePool.release()) and its
+                capture time
+        """
+        if not self.is_opened() and not self.open():
+            self._fail()
+            return False, None, 0.0
+
+        ok, grabbed_at = self._grab_latest()
+        if ok:
+            ok, frame = self._retrieve()
+        if not ok:
+            self._fail()
+            return False, None, 0.0
+
+        self.failures = 0
+        self._backoff = self.min_backoff
+        self.last_capture_age = time.time() - grabbed_at
+        self.capture_age += 0.1 * (self.last_capture_age - self.capture_age)
+        return True, frame, grabbed_at
+
+
+# Usage example
+if __name__ == "__main__":
+    capture = CameraCapture(0)
+    try:
+        for _ in range(100):
+            ok, frame, capture_time = capture.read()
+            if ok:
+                print(
+                    f"{frame.shape} age={capture.last_capture_age * 1000:.1f} ms "
+                    f"drained={capture.drained_frames}"
+                )
+                capture.pool.release(frame)
+            # Simulate slow processing so frames queue up in the driver
+            time.sleep(0.1)
+    finally:
+        capture.release()
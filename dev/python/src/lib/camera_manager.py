@@ -0,0 +1,315 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Camera whose pipeline backs the legacy routes without a camera id
+DEFAULT_CAMERA_ID = "0"
+
+
+@dataclass
+class CameraConfig:
+    """
+    Configuration of one camera pipeline.
+
+    Attributes:
+        camera_id: Identifier used in routes (the cameras.camera_id column)
+        source: Device index or stream URL passed to cv2.VideoCapture
+        data_dir: Directory holding the camera's homography_data.json and
+            zones.json; None uses the working directory for the default
+            camera and cameras/<camera_id> for the others
+        options: Extra pipeline options: CameraThread keyword arguments plus
+            'motion_gating' and 'idle_rate' for the detection scheduler
+    """
+
+    camera_id: str
+    source: Union[int, str] = 0
+    data_dir: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def resolve_data_dir(self) -> str:
+        """Directory of the camera's calibration and zone files."""
+        if self.data_dir is not None:
+            return self.data_dir
+        if self.camera_id == DEFAULT_CAMERA_ID:
+            return "."
+        return os.path.join("cameras", self.camera_id)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CameraConfig":
+        """
+        Create a config from its JSON representation.
+
+        Digit-only sources are converted to device indices.
+
+        Args:
+            data (Dict[str, Any]): Dict with 'camera_id' and optional 'source',
+                                   'data_dir' and 'options'
+
+        Returns:
+            CameraConfig: Parsed config
+        """
+        source = data.get("source", 0)
+        # "0" in JSON means device 0, not a file named "0"
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        return cls(
+            camera_id=str(data["camera_id"]),
+            source=source,
+            data_dir=data.get("data_dir"),
+            options=dict(data.get("options", {})),
+        )
+
+
+def thread_cpu_time(native_id: Optional[int]) -> Optional[float]:
+    """
+    CPU time (user + system) consumed by a thread of this process.
+
+    Args:
+        native_id (Optional[int]): OS thread id (threading.Thread.native_id)
+
+    Returns:
+        Optional[float]: Seconds of CPU time, None where /proc is unavailable
+    """
+    if native_id is None:
+        return None
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", "r") as f:
+            # Fields after the parenthesized thread name; utime and stime are
+            # fields 14 and 15 of the full line
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class CameraManager:
+    """
+    Starts, stops and hot-reloads independent camera pipelines by camera id.
+
+    Pipelines are created by ``factory`` from a CameraConfig and must provide
+    ``stop()``, ``reload_data()`` and ``stats()``. Every pipeline owns its
+    camera thread, buffers, calibration and zones; the manager only keeps
+    track of them, so cameras can be added or removed while the server runs.
+
+    Attributes:
+        factory (Callable): Creates and starts a pipeline from a CameraConfig
+        configs (Dict[str, CameraConfig]): Configs of the running pipelines
+
+    Example:
+        >>> manager = CameraManager(MainApplication.from_config)
+        >>> manager.start(CameraConfig("entrance", source=1))
+        >>> manager.get("entrance").get_frame()
+        >>> manager.stop_all()
+    """
+
+    def __init__(self, factory: Callable[[CameraConfig], Any]):
+        """
+        Initialize an empty manager.
+
+        Args:
+            factory (Callable[[CameraConfig], Any]): Pipeline factory
+        """
+        self.factory = factory
+        self.configs: Dict[str, CameraConfig] = {}
+        self._pipelines: Dict[str, Any] = {}
+        self._stop_listeners: List[Callable[[str], None]] = []
+        self._lock = threading.RLock()
+
+    def __contains__(self, camera_id: str) -> bool:
+        return camera_id in self._pipelines
+
+    def __len__(self) -> int:
+        return len(self._pipelines)
+
+    @property
+    def camera_ids(self) -> List[str]:
+        """Ids of the running pipelines."""
+        return list(self._pipelines)
+
+    def get(self, camera_id: Optional[str] = None) -> Any:
+        """
+        Get a running pipeline.
+
+        Args:
+            camera_id (Optional[str]): Camera id; None for the default camera
+                                       (or the first one if there is none)
+
+        Returns:
+            Any: The pipeline
+
+        Raises:
+            KeyError: If no such pipeline is running
+        """
+        pipelines = self._pipelines
+        if camera_id is None:
+            camera_id = DEFAULT_CAMERA_ID
+            if camera_id not in pipelines and pipelines:
+                camera_id = next(iter(pipelines))
+        pipeline = pipelines.get(camera_id)
+        if pipeline is None:
+            raise KeyError(f"Unknown camera: {camera_id}")
+        return pipeline
+
+    def start(self, config: CameraConfig) -> Any:
+        """
+        Create and start a pipeline.
+
+        Args:
+            config (CameraConfig): Camera configuration
+
+        Returns:
+            Any: The new pipeline
+
+        Raises:
+            ValueError: If a pipeline with the same id is already running
+        """
+        with self._lock:
+            if config.camera_id in self._pipelines:
+                raise ValueError(f"Camera already running: {config.camera_id}")
+            pipeline = self.factory(config)
+            self._pipelines[config.camera_id] = pipeline
+            self.configs[config.camera_id] = config
+            return pipeline
+
+    def add_stop_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback for removed cameras.
+
+        ``listener(camera_id)`` is called after a pipeline is stopped and
+        forgotten, possibly from a worker thread; not when reload() restarts
+        a pipeline under the same id.
+
+        Args:
+            listener (Callable[[str], None]): Callback taking the camera id
+        """
+        self._stop_listeners.append(listener)
+
+    def stop(self, camera_id: str) -> None:
+        """
+        Stop a pipeline and forget it.
+
+        Args:
+            camera_id (str): Camera id
+
+        Raises:
+            KeyError: If no such pipeline is running
+        """
+        self._detach(camera_id).stop()
+        for listener in list(self._stop_listeners):
+            try:
+                listener(camera_id)
+            except Exception as e:
+                print(f"Error in stop listener of camera {camera_id}: {e}")
+
+    def _detach(self, camera_id: str) -> Any:
+        """Forget a pipeline and return it; the caller stops it."""
+        with self._lock:
+            pipeline = self._pipelines.pop(camera_id)
+            self.configs.pop(camera_id, None)
+        return pipeline
+
+    def stop_all(self) -> None:
+        """Stop every pipeline."""
+        for camera_id in self.camera_ids:
+            try:
+                self.stop(camera_id)
+            except Exception as e:
+                print(f"Error stopping camera {camera_id}: {e}")
+
+    def reload(self, camera_id: str, config: Optional[CameraConfig] = None) -> Any:
+        """
+        Hot-reload a pipeline.
+
+        With an unchanged (or no) config only the calibration and zone files
+        are re-read; a changed config restarts the pipeline. The new pipeline
+        replaces the old one under the lock, but the old one is stopped and
+        joined only after the lock is released, so a slow shutdown does not
+        block the other cameras.
+
+        Args:
+            camera_id (str): Camera id
+            config (Optional[CameraConfig]): New configuration
+
+        Returns:
+            Any: The (possibly new) pipeline
+        """
+        old = None
+        try:
+            with self._lock:
+                if config is None or config == self.configs.get(camera_id):
+                    pipeline = self.get(camera_id)
+                    pipeline.reload_data()
+                    return pipeline
+                old = self._pipelines.pop(camera_id, None)
+                self.configs.pop(camera_id, None)
+                return self.start(config)
+        finally:
+            # The with block has released the lock by now
+            if old is not None:
+                old.stop()
+
+    def sync(self, configs: List[CameraConfig]) -> None:
+        """
+        Make the running pipelines match a list of configs.
+
+        Cameras missing from the list are stopped, new ones are started and
+        existing ones are reloaded.
+
+        Args:
+            configs (List[CameraConfig]): Desired cameras
+        """
+        # No lock around the loop: stop() and reload() join pipelines and
+        # take the lock only to swap them
+        wanted = {config.camera_id: config for config in configs}
+        for camera_id in self.camera_ids:
+            if camera_id not in wanted:
+                try:
+                    self.stop(camera_id)
+                except Exception as e:
+                    print(f"Error stopping camera {camera_id}: {e}")
+        for camera_id, config in wanted.items():
+            try:
+                if camera_id in self._pipelines:
+                    self.reload(camera_id, config)
+                else:
+                    self.start(config)
+            except Exception as e:
+                print(f"Error starting camera {camera_id}: {e}")
+
+    def load(self, path: str) -> None:
+        """
+        Sync the pipelines with a cameras JSON file.
+
+        The file holds ``{"cameras": [{"camera_id": ..., "source": ...}, ...]}``.
+        Without a file a single default camera on device 0 is used.
+
+        Args:
+            path (str): Path to the cameras file
+        """
+        configs = [CameraConfig(DEFAULT_CAMERA_ID)]
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                configs = [CameraConfig.from_dict(c) for c in data.get("cameras", [])]
+            except Exception as e:
+                print(f"Error loading cameras: {e}")
+                return
+        self.sync(configs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Resource usage of every pipeline.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Pipeline stats by camera id
+        """
+        result = {}
+        for camera_id, pipeline in list(self._pipelines.items()):
+            try:
+                result[camera_id] = pipeline.stats()
+            except Exception as e:
+                result[camera_id] = {"error": str(e)}
+        return result
@@ -7,8 +7,18 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 import cv2
 import numpy as np
 
-from .frame_buffer import FrameBuffer
+from .box_tracker import BoxTracker
+from .camera_capture import CameraCapture
+from .detections import Detections
+from .frame_buffer import FrameBuffer, FramePacket
+from .frame_pool import FramePool
+from .inference_scheduler import InferenceScheduler
+from .inference_server import InferenceServer
 from .point import Point
+from .roi import ROI, floor_roi
+from .shared_frame_ring import SharedFrameRing, SharedResultTable
+from .tracking_batch import TrackingBatch
+from .yolo_process import YOLOProcess
 from .yolo_thread import YOLOThread
 
 
@@ -20,12 +30,45 @@ class CameraThread(threading.Thread):
     and homography point selection in a separate thread. It provides callbacks
     for frame updates and coordinate mapping.
 
+    Inference runs either in a YOLOThread inside this process
+    (``inference_mode="thread"``) or in a YOLOProcess fed through a shared
+    memory frame ring (``inference_mode="process"``), which keeps
+    ``model.track()`` from competing with capture for the GIL. With
+    ``inference_mode="server"`` the camera registers with a shared
+    InferenceServer that batches the frames of all cameras through one model.
+
+    With ``roi_mode`` enabled, inference only sees the bounding box of the
+    floor polygon plus a margin. The region follows the homography points
+    automatically, however they are changed.
+
+    With ``interpolate`` enabled, a BoxTracker extrapolates the latest
+    detections to every captured frame, so tracking results and the mapping
+    callback keep running at capture rate while detection runs every
+    ``detect_interval`` frames or as the scheduler allows.
+
+    With ``headless`` enabled, the loop makes no GUI calls at all (no window,
+    ``imshow`` or ``waitKey``) and does not draw annotations. The annotated
+    frame is rendered only when ``get_annotated_frame`` is called, at most
+    once per captured frame.
+
+    Frames are captured into a FramePool of preallocated buffers and passed
+    through the pipeline as read-only views without copying; stages that
+    draw (annotations, rendering) work on their own copy. A buffer is
+    reused once every stage released its hold on the frame's packet.
+
+    With ``low_latency`` enabled, CameraCapture drains frames queued in the
+    driver and decodes only the newest one, so processing never starts on a
+    stale frame. Device errors back off and reconnect in either mode.
+
     Attributes:
         frame_buffer (FrameBuffer): Buffer for frame processing
-        frame_callback (Callable): Callback for processed frames
-        mapping_callback (Optional[Callable]): Callback for coordinate mapping
+        frame_callback (Callable): Callback for processed frames (read-only)
+        mapping_callback (Optional[Callable]): Per-person callback for coordinate mapping
+        batch_callback (Optional[Callable]): Per-frame callback with a TrackingBatch
+        calibration_callback (Optional[Callable]): Callback for homography point changes
         running (bool): Thread control flag
         points (List[Point]): Homography reference points
+        roi (Optional[ROI]): Current inference region, None for the full frame
 
     Example:
         >>> def on_frame(frame, results):
@@ -44,23 +87,72 @@ class CameraThread(threading.Thread):
         self,
         frame_callback: Callable[[np.ndarray, Optional[Any]], None],
         mapping_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        batch_callback: Optional[Callable[[TrackingBatch], None]] = None,
+        calibration_callback: Optional[Callable[[List[Point]], None]] = None,
         camera_id: int = 0,
         model_path: str = "yolov8n.pt",
         save_file: str = "homography_data.json",
+        inference_mode: str = "thread",
+        ring_slots: int = 4,
+        max_detections: int = 100,
+        sync_mode: str = "latest",
+        scheduler: Optional[InferenceScheduler] = None,
+        roi_mode: bool = False,
+        roi_margin: float = 0.2,
+        backend: str = "pytorch",
+        backend_threads: Optional[int] = None,
+        detect_interval: int = 1,
+        interpolate: bool = False,
+        headless: bool = False,
+        low_latency: bool = False,
+        inference_server: Optional[InferenceServer] = None,
     ):
         """
         Initialize camera thread with callbacks and configuration.
 
         Args:
             frame_callback: Called with (frame, results) for each processed frame
-            mapping_callback: Optional callback for coordinate mapping updates
+            mapping_callback: Optional callback invoked once per tracked person
+                with a dict (kept for existing callers)
+            batch_callback: Optional callback invoked once per frame with all
+                tracked people as a TrackingBatch
+            calibration_callback: Optional callback invoked with the new points
+                whenever the homography points change
             camera_id: Camera device ID (default: 0)
             model_path: Path to YOLO model weights (default: 'yolov8n.pt')
             save_file: Path to save homography data (default: 'homography_data.json')
+            inference_mode: 'thread', 'process' or 'server' (default: 'thread')
+            ring_slots: Frame ring slots in process mode (default: 4)
+            max_detections: Result table capacity in process mode (default: 100)
+            sync_mode: 'latest' draws the latest result on the newest frame,
+                'matched' draws it on the frame it was computed on (default: 'latest')
+            scheduler: Optional motion-gated detection scheduler (default: None)
+            roi_mode: Run inference only around the floor polygon (default: False)
+            roi_margin: ROI margin as a fraction of the floor box size (default: 0.2)
+            backend: Inference backend, 'pytorch', 'onnx' or 'openvino'
+                (default: 'pytorch')
+            backend_threads: CPU threads for inference (default: runtime's choice)
+            detect_interval: Run detection at most every N frames (default: 1)
+            interpolate: Extrapolate boxes between detections; only used
+                with sync_mode 'latest' (default: False)
+            headless: Run without a display window; annotated frames are
+                rendered on demand (default: False)
+            low_latency: Skip frames queued in the camera driver; only
+                applies to camera devices, never to files or streams
+                (default: False)
+            inference_server: Shared detector used in 'server' mode; its
+                model and backend replace model_path, backend and
+                backend_threads (default: None)
+
+        Raises:
+            ValueError: If inference_mode or sync_mode is unknown, or 'server'
+                mode is used without an inference_server
         """
         super().__init__()
         self.frame_callback = frame_callback
         self.mapping_callback = mapping_callback
+        self.batch_callback = batch_callback
+        self.calibration_callback = calibration_callback
         self.camera_id = camera_id
         self.save_file = save_file
         self.running = True
@@ -75,12 +167,71 @@ class CameraThread(threading.Thread):
         self.point_color = (0, 0, 255)  # Red
         self.selected_color = (0, 255, 0)  # Green
 
+        if inference_mode not in ("thread", "process", "server"):
+            raise ValueError(f"Unknown inference mode: {inference_mode}")
+        if inference_mode == "server" and inference_server is None:
+            raise ValueError("Server inference mode requires an inference_server")
+        self.inference_mode = inference_mode
+        if sync_mode not in ("latest", "matched"):
+            raise ValueError(f"Unknown sync mode: {sync_mode}")
+        self.sync_mode = sync_mode
+        self.last_tracked_seq = -1
+        self.last_measured_seq = -1
+        self._slots = None
+        self._motion = None
+        self.model_path = model_path
+        self.ring_slots = ring_slots
+        self.max_detections = max_detections
+        self.scheduler = scheduler
+        self.backend = backend
+        self.backend_threads = backend_threads
+        self.detect_interval = detect_interval
+        self.box_tracker = (
+            BoxTracker() if interpolate and sync_mode == "latest" else None
+        )
+        self.roi_mode = roi_mode
+        self.roi_margin = roi_margin
+        self.roi: Optional[ROI] = None
+        self._roi_key = None
+        self.headless = headless
+        # (seq, held packet, batch, fps) of the newest frame and its rendered image
+        self._annotation = None
+        self._annotated = None
+        self._annotation_lock = threading.Lock()
+
         # Initialize frame buffer and YOLO thread
-        self.frame_buffer = FrameBuffer()
-        self.yolo_thread = YOLOThread(
-            frame_buffer=self.frame_buffer, model_path=model_path
+        self.frame_pool = FramePool()
+        self.capture = CameraCapture(
+            camera_id, low_latency=low_latency, pool=self.frame_pool
         )
-        self.yolo_thread.daemon = True
+        # Recent frames are only needed to match results that arrive without
+        # their frame, i.e. from the inference process
+        matches_by_seq = inference_mode == "process" and sync_mode == "matched"
+        self.frame_buffer = FrameBuffer(
+            max_frames=4 if matches_by_seq else 1,
+            queue_for_detector=inference_mode == "thread",
+        )
+        self.yolo_thread = None
+        if inference_mode == "thread":
+            self.yolo_thread = YOLOThread(
+                frame_buffer=self.frame_buffer,
+                model_path=model_path,
+                scheduler=scheduler,
+                backend=backend,
+                threads=backend_threads,
+                detect_interval=detect_interval,
+            )
+            self.yolo_thread.daemon = True
+
+        # Server mode: registered while the capture loop runs
+        self.inference_server = inference_server
+        self.inference_client = None
+
+        # Process mode: shared memory is allocated once the frame size is known
+        self.yolo_process = None
+        self.frame_ring = None
+        self.result_table = None
+        self.last_result_seq = 0
 
         # Performance monitoring
         self.fps_start_time = time.time()
@@ -106,11 +257,53 @@ class CameraThread(threading.Thread):
                 print(f"Error loading data: {e}")
 
     def save_data(self) -> None:
-        """Save homography points to file."""
-        data = {"points": [point.to_dict() for point in self.points]}
+        """
+        Save homography points to file.
+
+        Only the "points" entry is replaced, so distances and lens parameters
+        stored in the same file are kept.
+        """
+        data = {}
+        if os.path.exists(self.save_file):
+            try:
+                with open(self.save_file, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+        data["points"] = [point.to_dict() for point in self.points]
         with open(self.save_file, "w") as f:
             json.dump(data, f)
 
+    def notify_points_changed(self) -> None:
+        """Notify the calibration callback that the homography points changed."""
+        if self.calibration_callback is None:
+            return
+        try:
+            self.calibration_callback(list(self.points))
+        except Exception as e:
+            print(f"Error in calibration callback: {e}")
+
+    def update_roi(self) -> None:
+        """
+        Recompute the inference region when the homography points changed.
+
+        Called once per captured frame; the points are compared by value, so
+        any kind of change (mouse, set_point, direct assignment) is picked up.
+        Uses the full frame until at least 3 points are set.
+        """
+        key = tuple(point.coord for point in self.points) if self.roi_mode else None
+        if key == self._roi_key:
+            return
+        self._roi_key = key
+
+        self.roi = floor_roi(key, self.roi_margin) if key else None
+        if self.yolo_thread is not None:
+            self.yolo_thread.set_roi(self.roi)
+        if self.inference_client is not None:
+            self.inference_client.set_roi(self.roi)
+        if self.yolo_process is not None:
+            self.yolo_process.set_roi(self.roi)
+
     def mouse_callback(
         self, event: int, x: int, y: int, flags: int, param: Any
     ) -> None:
@@ -133,6 +326,7 @@ class CameraThread(threading.Thread):
                 )
                 self.points.append(new_point)
                 self.save_data()
+                self.notify_points_changed()
             else:
                 # Select existing point
                 for point in self.points:
@@ -156,83 +350,130 @@ class CameraThread(threading.Thread):
             self.fps = 30 / (current_time - self.fps_start_time)
             self.fps_start_time = current_time
 
+    def start_inference_process(self, frame_shape: Tuple[int, ...]) -> None:
+        """
+        Allocate the shared frame ring and result table and start YOLOProcess.
+
+        Args:
+            frame_shape: Shape of the captured frames
+        """
+        lock = YOLOProcess.create_lock()
+        self.frame_ring = SharedFrameRing.create(frame_shape, self.ring_slots, lock)
+        self.result_table = SharedResultTable.create(self.max_detections, lock)
+        self.last_result_seq = 0
+        self.yolo_process = YOLOProcess(
+            self.frame_ring,
+            self.result_table,
+            lock,
+            model_path=self.model_path,
+            scheduler=self.scheduler,
+            backend=self.backend,
+            threads=self.backend_threads,
+            detect_interval=self.detect_interval,
+        )
+        self.yolo_process.set_roi(self.roi)
+        self.yolo_process.start()
+
+    def stop_inference_process(self) -> None:
+        """Stop YOLOProcess and free the shared memory."""
+        if self.yolo_process is not None:
+            self.yolo_process.stop()
+            self.yolo_process.join(timeout=5)
+            self.yolo_process = None
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
+        if self.result_table is not None:
+            self.result_table.close()
+            self.result_table = None
+
+    def exchange_with_inference_process(self, packet: FramePacket) -> None:
+        """
+        Publish a frame to YOLOProcess and collect its newest result.
+
+        The ring is sized for one frame shape; when the shape changes (a
+        reconnected camera or a stream switching resolution) the ring is
+        recreated and the worker restarted. Errors are logged so they do not
+        end the camera thread.
+
+        Args:
+            packet: Captured frame with sequence number and capture time
+        """
+        shape = packet.frame.shape
+        if self.frame_ring is not None and self.frame_ring.shape != shape:
+            print(
+                f"Frame shape changed from {self.frame_ring.shape} to {shape}, "
+                "restarting inference process"
+            )
+            self.stop_inference_process()
+        if self.frame_ring is None:
+            self.start_inference_process(shape)
+
+        try:
+            self.frame_ring.write(packet.frame, packet.seq, packet.capture_time)
+            self.last_result_seq, detections = self.result_table.read(
+                self.last_result_seq
+            )
+        except (ValueError, RuntimeError) as e:
+            print(f"Error exchanging frame with inference process: {e}")
+            return
+        if detections is not None:
+            self.frame_buffer.put_result(detections)
+
     def process_tracking_results(
-        self, frame: np.ndarray, results: Any
-    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        self, frame: np.ndarray, results: Optional[Detections]
+    ) -> Tuple[np.ndarray, TrackingBatch]:
         """
         Process YOLO tracking results and update frame visualization.
 
+        All boxes are handled as arrays: bottom centers are computed in one
+        step, and position history and the Kalman filters of all tracks are
+        updated in one batch per detector result, using the capture time of
+        the frame the result was computed on.
+
         Args:
             frame: Input frame to process
-            results: YOLO tracking results
+            results: Latest tracking result
 
         Returns:
             Tuple containing:
                 - Processed frame with visualizations
-                - List of tracking data dictionaries
+                - Columnar tracking data of this frame
         """
-        draw_frame = frame.copy()
-        tracking_data = []
-
-        if results is not None and results[0].boxes.id is not None:
-            boxes = results[0].boxes.xywh.cpu()
-            track_ids = results[0].boxes.id.int().cpu().tolist()
-            current_time = time.time()
+        batch = self.build_tracking_batch(results)
+        return self.draw_annotations(frame, batch), batch
 
-            for box, track_id in zip(boxes, track_ids):
-                x, y, w, h = box
-
-                # Calculate bottom center
-                bottom_center_x = x
-                bottom_center_y = y + h / 2
-                current_pos = (float(bottom_center_x), float(bottom_center_y))
-
-                # Update position history
-                self.frame_buffer.update_position_history(
-                    track_id, current_pos, current_time
-                )
+    def build_tracking_batch(self, results: Optional[Detections]) -> TrackingBatch:
+        """
+        Build the TrackingBatch of a frame without drawing anything.
 
-                # Get prediction
-                next_pos = self.frame_buffer.predict_next_position(
-                    track_id, current_pos, current_time
-                )
+        Args:
+            results: Latest tracking result
 
-                # Draw tracking visualization
-                cv2.rectangle(
-                    draw_frame,
-                    (int(x - w / 2), int(y - h / 2)),
-                    (int(x + w / 2), int(y + h / 2)),
-                    (0, 255, 0),
-                    2,
-                )
+        Returns:
+            TrackingBatch: Columnar tracking data, empty if there are no results
+        """
+        if results is None or len(results) == 0:
+            return TrackingBatch()
+        return self._build_tracking_batch(results)
 
-                cv2.arrowedLine(
-                    draw_frame,
-                    (int(bottom_center_x), int(bottom_center_y)),
-                    (int(next_pos[0]), int(next_pos[1])),
-                    (0, 0, 255),
-                    2,
-                )
+    def draw_annotations(
+        self, frame: np.ndarray, batch: TrackingBatch, fps: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Draw boxes, predictions, homography points and hints on a copy of a frame.
 
-                cv2.putText(
-                    draw_frame,
-                    f"ID: {track_id}",
-                    (int(x - w / 2), int(y - h / 2) - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (0, 255, 0),
-                    2,
-                )
+        Args:
+            frame: Captured frame (not modified)
+            batch: Tracking data of the frame
+            fps: Frame rate to print, if given
 
-                # Collect tracking data
-                tracking_data.append(
-                    {
-                        "coord": (float(x), float(y)),
-                        "mapped": (float(bottom_center_x), float(bottom_center_y)),
-                        "track_id": track_id,
-                        "size": (float(w), float(h)),
-                    }
-                )
+        Returns:
+            np.ndarray: Annotated copy of the frame
+        """
+        draw_frame = frame.copy()
+        if len(batch) > 0:
+            self._draw_tracking_batch(draw_frame, batch)
 
         # Draw homography points
         for point in self.points:
@@ -261,13 +502,139 @@ class CameraThread(threading.Thread):
                 2,
             )
 
-        return draw_frame, tracking_data
+        if fps is not None:
+            cv2.putText(
+                draw_frame,
+                f"FPS: {fps:.1f}",
+                (10, 60),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.8,
+                (0, 255, 0),
+                2,
+            )
+
+        return draw_frame
+
+    def get_annotated_frame(self) -> Optional[np.ndarray]:
+        """
+        Get the newest frame with tracking annotations.
+
+        In headless mode the annotations are drawn on the first call for
+        each captured frame; later calls for the same frame reuse the image.
+
+        Returns:
+            Optional[np.ndarray]: Annotated frame, None before the first frame
+        """
+        with self._annotation_lock:
+            annotation = self._annotation
+            if annotation is None:
+                return None
+            seq, packet, batch, fps = annotation
+            annotated = self._annotated
+            if annotated is not None and annotated[0] == seq:
+                return annotated[1]
+            packet.retain()
+        try:
+            image = self.draw_annotations(packet.frame, batch, fps)
+        finally:
+            packet.release()
+        self._annotated = (seq, image)
+        return image
+
+    def _set_annotation(self, annotation: Optional[tuple]) -> None:
+        """Replace the (seq, held packet, batch, fps) to annotate on demand."""
+        with self._annotation_lock:
+            previous, self._annotation = self._annotation, annotation
+        if previous is not None:
+            previous[1].release()
+
+    def _build_tracking_batch(self, results: Detections) -> TrackingBatch:
+        """
+        Turn a tracking result into a TrackingBatch with motion predictions.
+
+        Args:
+            results: Non-empty tracking result
+
+        Returns:
+            TrackingBatch: Columnar tracking data
+        """
+        current_time = results.capture_time or time.time()
+        boxes = results.boxes.astype(np.float64)
+
+        # Bottom centers of all boxes
+        positions = boxes[:, 0:2].copy()
+        positions[:, 1] += boxes[:, 3] / 2
+
+        # Update motion filters with detector measurements only; boxes
+        # extrapolated by the BoxTracker are never fed back
+        measurement = results
+        if self.box_tracker is not None and self.box_tracker.detection is not None:
+            measurement = self.box_tracker.detection
+        if measurement.frame_seq != self.last_measured_seq or self._slots is None:
+            self.last_measured_seq = measurement.frame_seq
+            measured = measurement.boxes[:, 0:2].astype(np.float64)
+            measured[:, 1] += measurement.boxes[:, 3] / 2
+            self._slots = self.frame_buffer.update_tracks(
+                measurement.track_ids.tolist(),
+                measured,
+                measurement.capture_time or time.time(),
+            )
+            self._motion = None
+
+        # Predict all tracks once per frame
+        if results.frame_seq != self.last_tracked_seq or self._motion is None:
+            self.last_tracked_seq = results.frame_seq
+            slots = self._slots
+            motion = self.frame_buffer.motion_model
+            self._motion = (
+                self.frame_buffer.predict_positions(slots, current_time),
+                motion.velocity(slots),
+                motion.uncertainty(slots),
+            )
+        predicted, velocities, uncertainties = self._motion
+
+        return TrackingBatch(
+            track_ids=results.track_ids,
+            coords=boxes[:, 0:2],
+            positions=positions,
+            sizes=boxes[:, 2:4],
+            predicted=predicted,
+            velocities=velocities,
+            uncertainties=uncertainties,
+            frame_seq=results.frame_seq,
+            capture_time=results.capture_time,
+        )
+
+    def _draw_tracking_batch(
+        self, draw_frame: np.ndarray, batch: TrackingBatch
+    ) -> None:
+        """Draw boxes, ids and prediction arrows of a TrackingBatch."""
+        top_left = (batch.coords - batch.sizes / 2).astype(np.int32).tolist()
+        bottom_right = (batch.coords + batch.sizes / 2).astype(np.int32).tolist()
+        positions = batch.positions.astype(np.int32).tolist()
+        predicted = batch.predicted.astype(np.int32).tolist()
+
+        for track_id, tl, br, position, next_pos in zip(
+            batch.track_ids.tolist(), top_left, bottom_right, positions, predicted
+        ):
+            cv2.rectangle(draw_frame, tl, br, (0, 255, 0), 2)
+            cv2.arrowedLine(draw_frame, position, next_pos, (0, 0, 255), 2)
+            cv2.putText(
+                draw_frame,
+                f"ID: {track_id}",
+                (tl[0], tl[1] - 10),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (0, 255, 0),
+                2,
+            )
 
     def set_point(self, points: List[Point]) -> None:
-        """_summary_
+        """
+        Replace the homography points and notify the calibration callback.
 
         Args:
-            points (List[Any]): _description_
+            points (List[Point]): New homography reference points
         """
 
         # 初期化
@@ -280,26 +647,35 @@ class CameraThread(threading.Thread):
                 color=p.color,
             )
             self.points.append(new_point)
-            self.save_data()
+        self.save_data()
+        self.notify_points_changed()
 
     def run(self) -> None:
         """Main camera capture and processing loop."""
         # Start YOLO thread
-        self.yolo_thread.start()
+        if self.yolo_thread is not None:
+            self.yolo_thread.start()
+        if self.inference_mode == "server":
+            self.inference_client = self.inference_server.register(
+                str(self.camera_id),
+                self.frame_buffer,
+                scheduler=self.scheduler,
+                detect_interval=self.detect_interval,
+            )
+            self.inference_client.set_roi(self.roi)
 
-        # Initialize camera
-        cap = cv2.VideoCapture(self.camera_id)
-        if not cap.isOpened():
-            print(f"Cannot access camera {self.camera_id}")
-            return
+        # Initialize camera; read() keeps retrying with backoff if this fails
+        if not self.capture.open():
+            print(f"Cannot access camera {self.camera_id}, retrying")
 
         # Setup display window
-        cv2.namedWindow("Homography Setup")
-        cv2.setMouseCallback("Homography Setup", self.mouse_callback)
+        if not self.headless:
+            cv2.namedWindow("Homography Setup")
+            cv2.setMouseCallback("Homography Setup", self.mouse_callback)
 
         try:
             while self.running:
-                ret, frame = cap.read()
+                ret, frame, capture_time = self.capture.read()
                 if not ret:
                     continue
 
@@ -307,66 +683,101 @@ class CameraThread(threading.Thread):
                 self.calculate_fps()
 
                 # Process frame
-                self.frame_buffer.put_frame(frame.copy())
-                results = self.frame_buffer.get_result()
+                self.update_roi()
+                packet = self.frame_buffer.put_frame(
+                    frame, capture_time, self.frame_pool
+                )
+                if self.inference_mode == "process":
+                    self.exchange_with_inference_process(packet)
+
+                # The packet shown with the results, held for lazy annotation
+                shown = None
+                if self.sync_mode == "matched":
+                    shown, results = self.frame_buffer.get_matched_pair()
+                else:
+                    results = self.frame_buffer.get_result()
+                    if self.box_tracker is not None:
+                        self.box_tracker.update(results)
+                        results = self.box_tracker.predict(packet.seq, capture_time)
 
                 # Process tracking results
-                processed_frame, tracking_data = self.process_tracking_results(
-                    frame, results
-                )
+                self.frame_buffer.clean_old_tracks(capture_time)
+                batch = self.build_tracking_batch(results)
+                if shown is None:
+                    shown = packet.retain()
+                frame = shown.frame
+                self._set_annotation((packet.seq, shown, batch, self.fps))
 
-                # Draw FPS
-                cv2.putText(
-                    processed_frame,
-                    f"FPS: {self.fps:.1f}",
-                    (10, 60),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.8,
-                    (0, 255, 0),
-                    2,
-                )
+                if not self.headless:
+                    processed_frame = self.get_annotated_frame()
 
-                # 文字を表示したframeを保存する
-                self.frame_buffer.put_result_frame(processed_frame.copy())
+                    # 文字を表示したframeを保存する
+                    self.frame_buffer.put_result_frame(processed_frame)
 
-                # Show frame
-                cv2.imshow("Homography Setup", processed_frame)
+                    # Show frame
+                    cv2.imshow("Homography Setup", processed_frame)
 
                 # Handle callbacks
                 try:
                     self.frame_callback(frame, results)
+                    if self.batch_callback:
+                        self.batch_callback(batch)
                     if self.mapping_callback:
-                        for data in tracking_data:
+                        for data in batch.to_dicts():
                             self.mapping_callback(data)
                 except Exception as e:
                     print(f"Error in callbacks: {e}")
 
                 # Handle key events
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord("q"):
+                if not self.headless and not self.handle_key(cv2.waitKey(1) & 0xFF):
                     break
-                elif key == ord("c"):
-                    self.points = []
-                    self.selected_point = None
-                    self.point_counter = 0
-                    self.save_data()
-                elif key == ord("p") and self.selected_point:
-                    self.points.remove(self.selected_point)
-                    self.selected_point = None
-                    self.save_data()
 
         finally:
             # Cleanup
-            self.yolo_thread.stop()
-            self.yolo_thread.join()
-            cap.release()
-            cv2.destroyAllWindows()
+            if self.yolo_thread is not None:
+                self.yolo_thread.stop()
+                self.yolo_thread.join()
+            self.stop_inference_process()
+            if self.inference_client is not None:
+                self.inference_server.unregister(self.inference_client)
+                self.inference_client = None
+            self._set_annotation(None)
+            self.capture.release()
+            if not self.headless:
+                cv2.destroyAllWindows()
+
+    def handle_key(self, key: int) -> bool:
+        """
+        Handle a key press in the display window.
+
+        Args:
+            key: Key code from cv2.waitKey
+
+        Returns:
+            bool: False if the loop should stop ('q')
+        """
+        if key == ord("q"):
+            return False
+        elif key == ord("c"):
+            self.points = []
+            self.selected_point = None
+            self.point_counter = 0
+            self.save_data()
+            self.notify_points_changed()
+        elif key == ord("p") and self.selected_point:
+            self.points.remove(self.selected_point)
+            self.selected_point = None
+            self.save_data()
+            self.notify_points_changed()
+        return True
 
     def stop(self) -> None:
         """Stop camera capture thread gracefully."""
         self.running = False
-        if self.yolo_thread.is_alive():
+        if self.yolo_thread is not None and self.yolo_thread.is_alive():
             self.yolo_thread.stop()
+        if self.yolo_process is not None:
+            self.yolo_process.stop()
 
 
 # Usage example
@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import Any, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+@dataclass
+class Detections:
+    """
+    Compact, array-backed tracking result for a single frame.
+
+    Detection and tracking results are kept as plain numpy arrays so they can
+    be copied through shared memory and processed without touching torch
+    tensors or ultralytics objects.
+
+    Attributes:
+        boxes: Bounding boxes as (N, 4) float32 array of (center x, center y, w, h)
+        track_ids: Track identifiers as (N,) int32 array
+        confidences: Detection confidences as (N,) float32 array
+        frame_seq: Sequence number of the frame the result belongs to (-1 if unknown)
+        capture_time: Capture timestamp of that frame (0.0 if unknown)
+    """
+
+    boxes: NDArray = field(default_factory=lambda: np.zeros((0, 4), np.float32))
+    track_ids: NDArray = field(default_factory=lambda: np.zeros(0, np.int32))
+    confidences: NDArray = field(default_factory=lambda: np.zeros(0, np.float32))
+    frame_seq: int = -1
+    capture_time: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    @classmethod
+    def from_yolo(
+        cls,
+        results: Any,
+        frame_seq: int = -1,
+        capture_time: float = 0.0,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> "Detections":
+        """
+        Convert ultralytics tracking results into Detections.
+
+        Only tracked boxes are kept; if the tracker assigned no ids the result
+        is empty.
+
+        Args:
+            results (Any): Results returned by ``YOLO.track()``
+            frame_seq (int, optional): Source frame sequence number. Defaults to -1.
+            capture_time (float, optional): Source frame capture time. Defaults to 0.0.
+            offset (Tuple[int, int], optional): (x, y) position of the inferred
+                image in the full frame, added to the box centers when
+                inference ran on a crop. Defaults to (0, 0).
+
+        Returns:
+            Detections: Array-backed copy of the tracking result
+
+        Example:
+            >>> detections = Detections.from_yolo(model.track(frame, persist=True))
+        """
+        if not results or results[0].boxes.id is None:
+            return cls(frame_seq=frame_seq, capture_time=capture_time)
+
+        boxes = results[0].boxes
+        xywh = boxes.xywh.cpu().numpy().astype(np.float32)
+        xywh[:, 0] += offset[0]
+        xywh[:, 1] += offset[1]
+        return cls(
+            boxes=xywh,
+            track_ids=boxes.id.int().cpu().numpy().astype(np.int32, copy=False),
+            confidences=boxes.conf.cpu().numpy().astype(np.float32, copy=False),
+            frame_seq=frame_seq,
+            capture_time=capture_time,
+        )
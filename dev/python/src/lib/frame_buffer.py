@@ -1,11 +1,51 @@
 import queue
+import threading
 import time
-from collections import defaultdict
-from typing import Any, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
 from numpy.typing import NDArray
 
+from .detections import Detections
+from .frame_pool import FramePool
+from .motion_model import KalmanFilterBank
+from .track_store import TrackStore
+
+
+@dataclass
+class FramePacket:
+    """
+    A captured frame tagged with its sequence number and capture time.
+
+    A pooled frame is only valid while its packet is held: stages keeping
+    the frame beyond a call take a hold with ``retain()`` and give it back
+    with ``release()``.
+
+    Attributes:
+        seq: Monotonically increasing frame sequence number (starting at 1)
+        capture_time: Capture timestamp (seconds since epoch)
+        frame: Captured image
+        pool: FramePool the frame belongs to, None for unpooled frames
+    """
+
+    seq: int
+    capture_time: float
+    frame: NDArray
+    pool: Optional[FramePool] = field(default=None, repr=False, compare=False)
+
+    def retain(self) -> "FramePacket":
+        """Take a hold on the frame; returns the packet for chaining."""
+        if self.pool is not None:
+            self.pool.retain(self.frame)
+        return self
+
+    def release(self) -> None:
+        """Give back a hold taken by retain() or handed over with the packet."""
+        if self.pool is not None:
+            self.pool.release(self.frame)
+
 
 class FrameBuffer:
     """
@@ -14,41 +54,129 @@ class FrameBuffer:
     This class provides a thread-safe queue for managing camera frames and tracking results,
     along with position history tracking and motion prediction functionality.
 
+    Every frame is tagged with a sequence number and capture time when it
+    enters the buffer, and tracking results carry the sequence number of the
+    frame they were computed on. Consumers can therefore either pair the
+    latest frame with the latest result (``get_latest_pair``) or look up the
+    exact frame a result belongs to (``get_matched_pair``), and can measure
+    how stale a result is.
+
+    ``frame_queue`` has a single consumer, the detector thread, and is only
+    filled when ``queue_for_detector`` is set. Everything else (snapshots,
+    rendering) reads the newest frame through ``retain_latest``, which any
+    number of readers can call without taking frames away from the
+    detector.
+
+    Pooled frames are recycled through explicit holds (see FramePool): the
+    buffer holds the frames in ``recent_frames``, in ``frame_queue`` and the
+    frame of the latest result, and releases them when they drop out.
+    Only ``max_frames`` recent frames are kept; they are needed only to
+    match results that do not come with their frame (process mode).
+
     Attributes:
-        frame_queue (Queue): Thread-safe queue for storing camera frames
+        frame_queue (Queue): Thread-safe queue of FramePackets for the detector
+        queue_for_detector (bool): Whether put_frame fills frame_queue
+        latest_frame (Optional[FramePacket]): Newest frame, readable by many
+        recent_frames (deque): Most recent FramePackets for result matching
         latest_result: Most recent tracking result
-        position_history (defaultdict): Track position history for motion prediction
+        result_frame (Optional[FramePacket]): Frame of the latest result, if
+            it was still available when the result arrived
+        result_latency (float): Capture-to-result latency of the latest result
+        track_store (TrackStore): Track position history for motion prediction
+        motion_model (KalmanFilterBank): Kalman filters indexed by track store slot
         max_history (int): Maximum number of historical positions to keep per track
     """
 
-    def __init__(self, maxsize: int = 2, max_history: int = 2):
+    def __init__(
+        self,
+        maxsize: int = 2,
+        max_history: int = 2,
+        max_frames: int = 1,
+        queue_for_detector: bool = True,
+    ):
         """
         Initialize frame buffer with specified capacity.
 
         Args:
             maxsize (int, optional): Maximum size of frame queue. Defaults to 32.
             max_history (int, optional): Maximum positions to keep per track. Defaults to 10.
+            max_frames (int, optional): Recent frames kept for matching results
+                                        to frames. Defaults to 1.
+            queue_for_detector (bool, optional): Queue frames for a detector
+                                                 thread; without one, queued
+                                                 frames would only pin pooled
+                                                 buffers. Defaults to True.
 
         Example:
             >>> buffer = FrameBuffer(maxsize=64, max_history=15)
         """
         self.frame_queue = queue.Queue(maxsize=maxsize)
+        self.queue_for_detector = queue_for_detector
         self.latest_result = None
-        self.position_history = defaultdict(list)
+        self.result_latency = 0.0
+        self.max_frames = max(max_frames, 1)
+        self.recent_frames: deque = deque()
+        self.latest_frame: Optional[FramePacket] = None
+        self.result_frame: Optional[FramePacket] = None
+        self._seq = 0
+        self._frames_lock = threading.RLock()
         self.max_history = max_history
+        self.track_store = TrackStore(history=max_history)
+        self.motion_model = KalmanFilterBank(capacity=self.track_store.capacity)
 
         # 追加
         self.result_frame_queue = queue.Queue(maxsize=maxsize)
 
+    def update_tracks(
+        self, track_ids: Sequence[int], positions: NDArray, timestamp: float
+    ) -> NDArray:
+        """
+        Record positions of several tracks and update their motion filters.
+
+        Args:
+            track_ids (Sequence[int]): Track identifiers (unique)
+            positions (NDArray): (N, 2) positions
+            timestamp (float): Observation time
+
+        Returns:
+            NDArray: (N,) track store slots of the tracks
+
+        Example:
+            >>> slots = buffer.update_tracks([1, 2], np.array([[10, 20], [30, 40]]), now)
+        """
+        slots = self.track_store.append_many(track_ids, positions, timestamp)
+        self.motion_model.update(slots, positions, timestamp)
+        return slots
+
+    def predict_positions(self, slots: NDArray, current_time: float) -> NDArray:
+        """
+        Predict where tracks are heading with an adaptive look-ahead.
+
+        Faster tracks are predicted further ahead (speed / 100 seconds,
+        clamped to 0.1-2 seconds).
+
+        Args:
+            slots (NDArray): Track store slots
+            current_time (float): Current timestamp
+
+        Returns:
+            NDArray: (N, 2) predicted positions
+        """
+        speed = np.linalg.norm(self.motion_model.velocity(slots), axis=1)
+        look_ahead = np.clip(speed / 100, 0.1, 2.0)
+        predicted, _ = self.motion_model.predict(slots, current_time + look_ahead)
+        return predicted
+
     def predict_next_position(
         self, track_id: int, current_pos: Tuple[float, float], current_time: float
     ) -> Tuple[float, float]:
         """
-        Predict next position based on tracking history using velocity-based prediction.
+        Predict next position of a single track from its motion filter.
 
         Args:
             track_id (int): Identifier for tracked object
-            current_pos (Tuple[float, float]): Current position (x, y)
+            current_pos (Tuple[float, float]): Current position (x, y), returned
+                                               for unknown tracks
             current_time (float): Current timestamp
 
         Returns:
@@ -58,56 +186,142 @@ class FrameBuffer:
             >>> buffer = FrameBuffer()
             >>> buffer.update_position_history(1, (100, 100), 0.0)
             >>> buffer.update_position_history(1, (110, 110), 0.1)
-            >>> next_pos = buffer.predict_next_position(1, (120, 120), 0.2)
+            >>> next_pos = buffer.predict_next_position(1, (110, 110), 0.1)
         """
-        history = self.position_history[track_id]
-        if len(history) < 2:
+        if track_id not in self.track_store:
             return current_pos
-
-        last_pos, last_time = history[-1]
-        dt = current_time - last_time
-
-        # Avoid division by very small numbers
-        if dt < 0.0001:
-            return current_pos
-
-        # Calculate velocity vector
-        velocity_x = (current_pos[0] - last_pos[0]) / dt
-        velocity_y = (current_pos[1] - last_pos[1]) / dt
-
-        # Adaptive look-ahead based on velocity magnitude
-        magnitude = np.sqrt(velocity_x**2 + velocity_y**2)
-        look_ahead = min(max(magnitude / 100, 0.1), 2.0)  # between 0.1 and 2 seconds
-
-        # Predict future position
-        next_x = current_pos[0] + velocity_x * look_ahead
-        next_y = current_pos[1] + velocity_y * look_ahead
-
-        return (next_x, next_y)
-
-    def put_frame(self, frame: NDArray) -> None:
+        slot = self.track_store.slot(track_id)
+        next_x, next_y = self.predict_positions(np.array([slot]), current_time)[0]
+        return (float(next_x), float(next_y))
+
+    def put_frame(
+        self,
+        frame: NDArray,
+        capture_time: Optional[float] = None,
+        pool: Optional[FramePool] = None,
+    ) -> FramePacket:
         """
         Add new frame to buffer, dropping oldest if full.
 
+        The frame is stored without copying, so it must not be modified
+        afterwards; CameraThread passes read-only views of pooled buffers.
+        The caller's hold on a pooled frame is handed over to the buffer.
+
         Args:
             frame (NDArray): Camera frame to buffer
+            capture_time (Optional[float]): Capture timestamp. Defaults to now.
+            pool (Optional[FramePool]): Pool of the frame. Defaults to None.
+
+        Returns:
+            FramePacket: The frame tagged with its sequence number
 
         Example:
             >>> import numpy as np
             >>> buffer = FrameBuffer()
             >>> frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            >>> buffer.put_frame(frame)
+            >>> packet = buffer.put_frame(frame)
         """
+        if capture_time is None:
+            capture_time = time.time()
+
+        with self._frames_lock:
+            self._seq += 1
+            packet = FramePacket(self._seq, capture_time, frame, pool)
+            self.recent_frames.append(packet)
+            self.latest_frame = packet
+            evicted = []
+            while len(self.recent_frames) > self.max_frames:
+                evicted.append(self.recent_frames.popleft())
+        for old in evicted:
+            old.release()
+
+        if not self.queue_for_detector:
+            return packet
         if self.frame_queue.full():
             try:
-                self.frame_queue.get_nowait()
+                self.frame_queue.get_nowait().release()
             except queue.Empty:
                 pass
-        self.frame_queue.put(frame)
+        self.frame_queue.put(packet.retain())
+        return packet
+
+    def get_frame_packet(self) -> Optional[FramePacket]:
+        """
+        Take the next frame for detection, with its sequence number and capture time.
+
+        The frame is removed from the detection queue; only the detector
+        should call this. Use ``retain_latest`` to read frames. The queue's
+        hold is handed over: release the packet when done with the frame.
+
+        Returns:
+            Optional[FramePacket]: Packet if available, None otherwise
+
+        Example:
+            >>> packet = buffer.get_frame_packet()
+            >>> if packet is not None:
+            ...     print(packet.seq, packet.capture_time)
+            ...     packet.release()
+        """
+        try:
+            return self.frame_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def get_latest_frame_packet(self) -> Optional[FramePacket]:
+        """
+        Get the newest frame without consuming it.
+
+        The packet is not held, so its frame may be recycled at any time; use
+        this for the metadata and ``retain_latest`` to read the frame.
+
+        Returns:
+            Optional[FramePacket]: Newest packet, None before the first frame
+
+        Example:
+            >>> packet = buffer.get_latest_frame_packet()
+            >>> if packet is not None and packet.seq != last_seq:
+            ...     show(packet.frame)
+        """
+        return self.latest_frame
+
+    def retain_latest(self) -> Optional[FramePacket]:
+        """
+        Get the newest frame with a hold on it, without consuming it.
+
+        Returns:
+            Optional[FramePacket]: Held newest packet (release it when done),
+                None before the first frame
+
+        Example:
+            >>> packet = buffer.retain_latest()
+            >>> if packet is not None:
+            ...     try:
+            ...         show(packet.frame)
+            ...     finally:
+            ...         packet.release()
+        """
+        with self._frames_lock:
+            packet = self.latest_frame
+            return packet.retain() if packet is not None else None
+
+    def get_latest_frame(self) -> Optional[NDArray]:
+        """
+        Get a copy of the newest frame image without consuming it.
+
+        Returns:
+            Optional[NDArray]: Newest frame, None before the first frame
+        """
+        packet = self.retain_latest()
+        if packet is None:
+            return None
+        try:
+            return packet.frame.copy()
+        finally:
+            packet.release()
 
     def get_frame(self) -> Optional[NDArray]:
         """
-        Get next frame from buffer.
+        Take a copy of the next frame from the detection queue.
 
         Returns:
             Optional[NDArray]: Frame if available, None otherwise
@@ -118,10 +332,61 @@ class FrameBuffer:
             >>> if frame is not None:
             ...     process_frame(frame)
         """
-        try:
-            return self.frame_queue.get_nowait()
-        except queue.Empty:
+        packet = self.get_frame_packet()
+        if packet is None:
             return None
+        try:
+            return packet.frame.copy()
+        finally:
+            packet.release()
+
+    def find_frame(self, seq: int) -> Optional[FramePacket]:
+        """
+        Look up a recent frame by sequence number.
+
+        The packet is not held; it stays valid only while it is in
+        ``recent_frames``.
+
+        Args:
+            seq (int): Frame sequence number
+
+        Returns:
+            Optional[FramePacket]: Packet if still buffered, None otherwise
+        """
+        with self._frames_lock:
+            for packet in reversed(self.recent_frames):
+                if packet.seq == seq:
+                    return packet
+        return None
+
+    def get_latest_pair(self) -> Tuple[Optional[FramePacket], Optional[Detections]]:
+        """
+        Get the newest frame together with the newest result.
+
+        The result may belong to an older frame; compare ``frame_seq`` with
+        the packet's ``seq`` to see how far behind it is.
+
+        Returns:
+            Tuple[Optional[FramePacket], Optional[Detections]]: Latest frame
+                (held, release it when done) and result
+        """
+        return self.retain_latest(), self.latest_result
+
+    def get_matched_pair(
+        self,
+    ) -> Tuple[Optional[FramePacket], Optional[Detections]]:
+        """
+        Get the newest result together with the frame it was computed on.
+
+        Returns:
+            Tuple[Optional[FramePacket], Optional[Detections]]: Matching frame
+                (held, release it when done) and result, or (None, result) if
+                the frame was no longer available when the result arrived
+        """
+        with self._frames_lock:
+            packet = self.result_frame
+            result = self.latest_result
+            return (packet.retain() if packet is not None else None), result
 
     def put_result_frame(self, frame: NDArray) -> None:
         """
@@ -149,26 +414,43 @@ class FrameBuffer:
         except queue.Empty:
             return None
 
-    def put_result(self, result: Any) -> None:
+    def put_result(
+        self, result: Detections, packet: Optional[FramePacket] = None
+    ) -> None:
         """
-        Update latest tracking result.
+        Update latest tracking result and its capture-to-result latency.
+
+        The frame the result was computed on is held for get_matched_pair().
+        Detectors that still hold that frame pass it in; otherwise it is
+        looked up in ``recent_frames`` by the result's ``frame_seq``.
 
         Args:
-            result (Any): YOLO tracking result
+            result (Detections): Tracking result
+            packet (Optional[FramePacket]): Frame of the result, held by the
+                                            caller. Defaults to None.
 
         Example:
             >>> buffer = FrameBuffer()
             >>> # Assuming 'results' is from YOLO model
-            >>> buffer.put_result(results)
+            >>> buffer.put_result(results, packet)
         """
-        self.latest_result = result
-
-    def get_result(self) -> Any:
+        if result is not None and result.capture_time > 0:
+            self.result_latency = time.time() - result.capture_time
+        with self._frames_lock:
+            if packet is None and result is not None:
+                packet = self.find_frame(result.frame_seq)
+            previous = self.result_frame
+            self.result_frame = packet.retain() if packet is not None else None
+            self.latest_result = result
+        if previous is not None:
+            previous.release()
+
+    def get_result(self) -> Optional[Detections]:
         """
         Get latest tracking result.
 
         Returns:
-            Any: Latest YOLO tracking result
+            Optional[Detections]: Latest tracking result
 
         Example:
             >>> buffer = FrameBuffer()
@@ -178,6 +460,21 @@ class FrameBuffer:
         """
         return self.latest_result
 
+    def get_result_age(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Get the age of the latest result measured from its frame capture time.
+
+        Args:
+            now (Optional[float]): Reference time. Defaults to current time.
+
+        Returns:
+            Optional[float]: Age in seconds, None if there is no timed result
+        """
+        result = self.latest_result
+        if result is None or result.capture_time <= 0:
+            return None
+        return (time.time() if now is None else now) - result.capture_time
+
     def update_position_history(
         self, track_id: int, position: Tuple[float, float], timestamp: float
     ) -> None:
@@ -193,17 +490,15 @@ class FrameBuffer:
             >>> buffer = FrameBuffer()
             >>> buffer.update_position_history(1, (100, 100), time.time())
         """
-        history = self.position_history[track_id]
-        history.append((position, timestamp))
-
-        # Keep only recent history
-        if len(history) > self.max_history:
-            history.pop(0)
+        slot = self.track_store.append(track_id, position, timestamp)
+        self.motion_model.update([slot], np.array([position]), timestamp)
 
     def clean_old_tracks(self, current_time: float, max_age: float = 2.0) -> None:
         """
         Remove tracking history for objects not seen recently.
 
+        Called once per captured frame by CameraThread.
+
         Args:
             current_time (float): Current timestamp
             max_age (float, optional): Maximum age in seconds before dropping track.
@@ -214,10 +509,8 @@ class FrameBuffer:
             >>> # After some tracking...
             >>> buffer.clean_old_tracks(time.time())
         """
-        for track_id in list(self.position_history.keys()):
-            history = self.position_history[track_id]
-            if history and (current_time - history[-1][1]) > max_age:
-                del self.position_history[track_id]
+        self.track_store.max_age = max_age
+        self.motion_model.reset(self.track_store.evict(current_time))
 
 
 # Usage example
@@ -235,7 +528,7 @@ if __name__ == "__main__":
     buffer.update_position_history(1, (110, 110), current_time + 0.1)
 
     # Test prediction
-    next_pos = buffer.predict_next_position(1, (120, 120), current_time + 0.2)
+    next_pos = buffer.predict_next_position(1, (110, 110), current_time + 0.1)
     print(f"Predicted next position: {next_pos}")
 
     # Clean up old tracks
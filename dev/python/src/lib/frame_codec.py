@@ -0,0 +1,263 @@
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+# Binary frame header (little-endian):
+#   magic        2s   b"KF"
+#   version      B    protocol version
+#   flags        B    bit0: is_hit, bit1: is_pred_hit
+#   seq          I    frame sequence number
+#   capture_time d    capture timestamp (seconds since epoch)
+#   render_time  d    render timestamp (seconds since epoch)
+#   hit_id       i    track id of the zone hit, -1 if none
+#   pred_hit_id  i    track id of the predicted zone hit, -1 if none
+#   track_count  H    number of track ids that follow
+# followed by track_count int32 track ids and then the raw JPEG bytes. The
+# JPEG part is empty when no image is available yet (uncalibrated camera);
+# such frames carry only the flags.
+FRAME_MAGIC = b"KF"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<2sBBIddiiH")
+FLAG_HIT = 0x01
+FLAG_PRED_HIT = 0x02
+
+
+@dataclass(frozen=True)
+class StreamProfile:
+    """
+    Per-stream encoding settings.
+
+    Streams with equal profiles share the same encoded payload, so each
+    distinct profile is encoded exactly once per frame.
+
+    Attributes:
+        binary (bool): Send binary frames instead of base64 JSON
+        quality (int): JPEG quality (1-100)
+        max_width (Optional[int]): Downscale frames wider than this, if set
+    """
+
+    binary: bool = False
+    quality: int = 95
+    max_width: Optional[int] = None
+
+
+@dataclass
+class RenderedFrame:
+    """
+    A rendered (warped and annotated) frame together with its metadata.
+
+    Attributes:
+        image: Rendered BGR image, or None for a flags-only frame
+        seq: Frame sequence number
+        capture_time: Capture timestamp of the source frame
+        render_time: Time the frame finished rendering
+        is_hit: True if a tracked point is inside a zone
+        is_hit_id: Track id of the zone hit
+        is_pred_hit: True if a predicted point is inside a zone
+        is_pred_hit_id: Track id of the predicted zone hit
+        track_ids: Ids of all tracks drawn on the frame
+    """
+
+    image: Optional[NDArray]
+    seq: int
+    capture_time: float
+    render_time: float
+    is_hit: bool = False
+    is_hit_id: Optional[int] = None
+    is_pred_hit: bool = False
+    is_pred_hit_id: Optional[int] = None
+    track_ids: List[int] = field(default_factory=list)
+
+
+def encode_jpeg(
+    image: NDArray, quality: int = 95, max_width: Optional[int] = None
+) -> bytes:
+    """
+    Encode an image to JPEG, optionally downscaling it first.
+
+    Args:
+        image (NDArray): BGR image
+        quality (int, optional): JPEG quality. Defaults to 95.
+        max_width (Optional[int], optional): Maximum output width. Defaults to None.
+
+    Returns:
+        bytes: JPEG data
+
+    Raises:
+        ValueError: If the image could not be encoded
+    """
+    height, width = image.shape[:2]
+    if max_width is not None and 0 < max_width < width:
+        new_height = max(1, int(round(height * max_width / width)))
+        image = cv2.resize(image, (max_width, new_height), interpolation=cv2.INTER_AREA)
+
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buffer.tobytes()
+
+
+class JpegCache:
+    """
+    Small LRU cache of encoded JPEGs keyed by frame identity.
+
+    Keys identify the image content, e.g. ``("raw", seq)`` for a camera
+    frame or ``("warp", seq, calibration_version)`` for a warped one, so
+    repeated requests for the same frame reuse the encoded bytes.
+
+    Attributes:
+        maxsize (int): Number of entries kept
+
+    Example:
+        >>> cache = JpegCache()
+        >>> jpeg = cache.get(("raw", packet.seq), packet.frame)
+    """
+
+    def __init__(self, maxsize: int = 8):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int, optional): Number of entries kept. Defaults to 8.
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        image: NDArray,
+        quality: int = 95,
+        max_width: Optional[int] = None,
+    ) -> bytes:
+        """
+        Get the JPEG of an image, encoding it on the first request.
+
+        Args:
+            key (Hashable): Identity of the image content
+            image (NDArray): BGR image, only encoded on a cache miss
+            quality (int, optional): JPEG quality. Defaults to 95.
+            max_width (Optional[int], optional): Maximum output width.
+                                                 Defaults to None.
+
+        Returns:
+            bytes: JPEG data
+        """
+        entry_key = (key, quality, max_width)
+        with self._lock:
+            jpeg = self._entries.get(entry_key)
+            if jpeg is not None:
+                self._entries.move_to_end(entry_key)
+                return jpeg
+
+        jpeg = encode_jpeg(image, quality=quality, max_width=max_width)
+        with self._lock:
+            self._entries[entry_key] = jpeg
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return jpeg
+
+    def clear(self) -> None:
+        """Drop every cached JPEG."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _track_id_or_none(track_id) -> int:
+    """Convert an optional track id to the -1 sentinel used on the wire."""
+    try:
+        return int(track_id)
+    except (TypeError, ValueError):
+        return -1
+
+
+def pack_frame(jpeg: bytes, frame: RenderedFrame) -> bytes:
+    """
+    Build a binary WebSocket message from JPEG data and frame metadata.
+
+    Args:
+        jpeg (bytes): Encoded JPEG image
+        frame (RenderedFrame): Metadata source
+
+    Returns:
+        bytes: Header, track ids and JPEG bytes
+
+    Example:
+        >>> message = pack_frame(encode_jpeg(frame.image), frame)
+    """
+    flags = 0
+    if frame.is_hit:
+        flags |= FLAG_HIT
+    if frame.is_pred_hit:
+        flags |= FLAG_PRED_HIT
+
+    track_ids = np.asarray([_track_id_or_none(t) for t in frame.track_ids], dtype="<i4")
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC,
+        FRAME_VERSION,
+        flags,
+        frame.seq & 0xFFFFFFFF,
+        frame.capture_time,
+        frame.render_time,
+        -1 if frame.is_hit_id is None else _track_id_or_none(frame.is_hit_id),
+        -1 if frame.is_pred_hit_id is None else _track_id_or_none(frame.is_pred_hit_id),
+        len(track_ids),
+    )
+    return b"".join((header, track_ids.tobytes(), jpeg))
+
+
+def unpack_frame(message: bytes) -> RenderedFrame:
+    """
+    Parse a binary WebSocket message produced by pack_frame().
+
+    Args:
+        message (bytes): Binary message
+
+    Returns:
+        RenderedFrame: Parsed metadata with the decoded image (None if the
+            message carries no image)
+
+    Raises:
+        ValueError: If the message is not a valid frame
+    """
+    if len(message) < FRAME_HEADER.size:
+        raise ValueError("Message too short")
+    (
+        magic,
+        version,
+        flags,
+        seq,
+        capture_time,
+        render_time,
+        hit_id,
+        pred_hit_id,
+        track_count,
+    ) = FRAME_HEADER.unpack_from(message)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Unsupported frame format")
+
+    ids_end = FRAME_HEADER.size + 4 * track_count
+    track_ids = np.frombuffer(message[FRAME_HEADER.size : ids_end], dtype="<i4")
+    image = None
+    if len(message) > ids_end:
+        image = cv2.imdecode(
+            np.frombuffer(message, np.uint8, offset=ids_end), cv2.IMREAD_COLOR
+        )
+    return RenderedFrame(
+        image=image,
+        seq=seq,
+        capture_time=capture_time,
+        render_time=render_time,
+        is_hit=bool(flags & FLAG_HIT),
+        is_hit_id=None if hit_id < 0 else hit_id,
+        is_pred_hit=bool(flags & FLAG_PRED_HIT),
+        is_pred_hit_id=None if pred_hit_id < 0 else pred_hit_id,
+        track_ids=track_ids.tolist(),
+    )
@@ -0,0 +1,179 @@
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class FramePool:
+    """
+    Pool of preallocated frame buffers recycled through explicit holds.
+
+    Capture reads straight into a pooled buffer, and the pipeline only ever
+    sees read-only views of it (``freeze``). Every pooled buffer has a hold
+    count: ``acquire`` hands out a buffer with one hold for the caller, each
+    stage that keeps the frame beyond a call takes its own hold with
+    ``retain`` and gives it back with ``release``. Once the count drops to
+    zero the next ``acquire`` reuses the buffer, whatever views may still
+    exist, so a frame must not be read after its hold was released. Stages
+    that need to draw make their own copy (copy-on-write), because writing
+    into a view raises an error.
+
+    The pool grows to the number of frames held at the same time, up to
+    ``max_buffers``. Beyond that, ``acquire`` hands out unpooled arrays,
+    for which retain and release do nothing.
+
+    Attributes:
+        max_buffers (int): Maximum number of pooled buffers
+        shape (Optional[Tuple[int, ...]]): Frame shape, None until the first frame
+
+    Example:
+        >>> pool = FramePool()
+        >>> buffer = pool.acquire()
+        >>> ret, image = cap.read() if buffer is None else cap.read(image=buffer)
+        >>> if image is not buffer:
+        ...     pool.adopt(image)
+        >>> frame = FramePool.freeze(image)
+        >>> pool.release(frame)  # when the last stage is done with it
+    """
+
+    def __init__(self, max_buffers: int = 32):
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_buffers (int, optional): Maximum number of pooled buffers.
+                                         Defaults to 32.
+        """
+        self.max_buffers = max_buffers
+        self.shape: Optional[Tuple[int, ...]] = None
+        self.dtype = np.uint8
+        self._buffers: List[NDArray] = []
+        self._holds: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the pooled buffers in bytes."""
+        return sum(buffer.nbytes for buffer in self._buffers)
+
+    def in_use(self) -> int:
+        """
+        Count the buffers currently held.
+
+        Returns:
+            int: Number of busy buffers
+        """
+        with self._lock:
+            return sum(holds > 0 for holds in self._holds)
+
+    def acquire(self) -> Optional[NDArray]:
+        """
+        Get a writable buffer nobody holds, with one hold for the caller.
+
+        Returns:
+            Optional[NDArray]: Free (or newly allocated) buffer, None until
+                the frame shape is known
+        """
+        with self._lock:
+            if self.shape is None:
+                return None
+            for i, holds in enumerate(self._holds):
+                if holds == 0:
+                    self._holds[i] = 1
+                    return self._buffers[i]
+
+            buffer = np.empty(self.shape, self.dtype)
+            if len(self._buffers) < self.max_buffers:
+                self._buffers.append(buffer)
+                self._holds.append(1)
+            return buffer
+
+    def adopt(self, image: NDArray) -> None:
+        """
+        Take over an image allocated outside the pool as a pooled buffer.
+
+        Used for the first frame and whenever the frame size changes; buffers
+        of a different shape are dropped. The caller keeps one hold on the
+        image, as with acquire().
+
+        Args:
+            image (NDArray): Writable, contiguous image
+        """
+        with self._lock:
+            if image.shape != self.shape or image.dtype != self.dtype:
+                self.shape = image.shape
+                self.dtype = image.dtype
+                self._buffers = []
+                self._holds = []
+            if len(self._buffers) < self.max_buffers:
+                self._buffers.append(image)
+                self._holds.append(1)
+
+    def _index(self, frame: NDArray) -> int:
+        """Index of the pooled buffer behind a frame (or view), -1 if unpooled."""
+        buffer = frame if frame.base is None else frame.base
+        for i, pooled in enumerate(self._buffers):
+            if pooled is buffer:
+                return i
+        return -1
+
+    def retain(self, frame: NDArray) -> None:
+        """
+        Take another hold on the buffer behind a frame.
+
+        Only valid while the caller (or the stage it got the frame from)
+        still holds the buffer.
+
+        Args:
+            frame (NDArray): Pooled buffer or a view from freeze()
+        """
+        with self._lock:
+            i = self._index(frame)
+            if i >= 0:
+                self._holds[i] += 1
+
+    def release(self, frame: NDArray) -> None:
+        """
+        Give back a hold; the buffer is reused once no hold is left.
+
+        Args:
+            frame (NDArray): Pooled buffer or a view from freeze()
+        """
+        with self._lock:
+            i = self._index(frame)
+            if i >= 0 and self._holds[i] > 0:
+                self._holds[i] -= 1
+
+    @staticmethod
+    def freeze(buffer: NDArray) -> NDArray:
+        """
+        Create a read-only view of a buffer for sharing between stages.
+
+        Args:
+            buffer (NDArray): Pooled buffer
+
+        Returns:
+            NDArray: Read-only view; copy it before drawing
+        """
+        view = buffer.view()
+        view.flags.writeable = False
+        return view
+
+
+# Usage example
+if __name__ == "__main__":
+    pool = FramePool()
+    image = np.zeros((480, 640, 3), np.uint8)
+    pool.adopt(image)
+    pool.release(image)
+
+    # Two frames in flight, then the first one is released
+    first = FramePool.freeze(pool.acquire())
+    second = FramePool.freeze(pool.acquire())
+    print(f"Buffers: {len(pool)}, in use: {pool.in_use()}")
+    pool.release(first)
+    print(f"Buffers: {len(pool)}, in use: {pool.in_use()}")
@@ -0,0 +1,148 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+Polygon = Sequence[Tuple[float, float]]
+
+
+class PolygonSet:
+    """
+    Packed set of polygons for vectorized point-in-polygon queries.
+
+    Edges of all polygons are stored in padded (zones, max_edges) arrays
+    together with each polygon's bounding box and the inverse slope of every
+    edge. ``contains`` first keeps only (point, zone) pairs whose bounding
+    box contains the point and then runs a crossing-number test on all edges
+    of all remaining pairs at once, so the cost is a handful of numpy calls
+    regardless of the number of zones.
+
+    Closing vertices (last == first) are allowed; the resulting zero-length
+    edges never cross the test ray.
+
+    Attributes:
+        bboxes (NDArray): (Z, 4) bounding boxes as (min x, min y, max x, max y)
+
+    Example:
+        >>> polygons = PolygonSet([[(0, 0), (100, 0), (100, 100), (0, 100)]])
+        >>> polygons.contains(np.array([[50, 50], [150, 50]]))
+        array([[ True],
+               [False]])
+    """
+
+    def __init__(self, polygons: Sequence[Polygon]):
+        """
+        Pack polygons.
+
+        Args:
+            polygons (Sequence[Polygon]): Polygons as vertex lists
+        """
+        count = len(polygons)
+        max_edges = max((len(polygon) for polygon in polygons), default=0)
+
+        self._x1 = np.zeros((count, max_edges))
+        self._y1 = np.zeros((count, max_edges))
+        self._y2 = np.zeros((count, max_edges))
+        self._inv_slope = np.zeros((count, max_edges))
+        # Padding edges are horizontal (y1 == y2) so they never cross the ray
+        self.bboxes = np.zeros((count, 4))
+
+        for i, polygon in enumerate(polygons):
+            vertices = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+            following = np.roll(vertices, -1, axis=0)
+            n = len(vertices)
+            dy = following[:, 1] - vertices[:, 1]
+            dx = following[:, 0] - vertices[:, 0]
+
+            self._x1[i, :n] = vertices[:, 0]
+            self._y1[i, :n] = vertices[:, 1]
+            self._y2[i, :n] = following[:, 1]
+            np.divide(dx, dy, out=self._inv_slope[i, :n], where=dy != 0)
+            self.bboxes[i] = (*vertices.min(axis=0), *vertices.max(axis=0))
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def contains(self, points: NDArray) -> NDArray:
+        """
+        Test which polygons contain each point.
+
+        Args:
+            points (NDArray): (M, 2) points
+
+        Returns:
+            NDArray: (M, Z) bool, True where polygon z contains point m
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.zeros((len(points), len(self)), dtype=bool)
+        if result.size == 0:
+            return result
+
+        # Bounding box prefilter
+        x = points[:, 0:1]
+        y = points[:, 1:2]
+        candidates = (
+            (x >= self.bboxes[:, 0])
+            & (x <= self.bboxes[:, 2])
+            & (y >= self.bboxes[:, 1])
+            & (y <= self.bboxes[:, 3])
+        )
+        point_index, zone_index = np.nonzero(candidates)
+        if len(point_index) == 0:
+            return result
+
+        # Crossing number over all edges of all candidate pairs
+        px = points[point_index, 0:1]
+        py = points[point_index, 1:2]
+        y1 = self._y1[zone_index]
+        y2 = self._y2[zone_index]
+        straddles = (y1 > py) != (y2 > py)
+        x_cross = self._x1[zone_index] + (py - y1) * self._inv_slope[zone_index]
+        crossings = np.count_nonzero(straddles & (px < x_cross), axis=1)
+
+        result[point_index, zone_index] = crossings % 2 == 1
+        return result
+
+
+def points_in_polygon(points: NDArray, polygon: Polygon) -> NDArray:
+    """
+    Test which points lie inside a single polygon.
+
+    Args:
+        points (NDArray): (M, 2) points
+        polygon (Polygon): Polygon vertices
+
+    Returns:
+        NDArray: (M,) bool
+    """
+    return PolygonSet([polygon]).contains(points)[:, 0]
+
+
+def point_in_polygon(point: Tuple[float, float], polygon: Polygon) -> bool:
+    """
+    Test whether a point lies inside a polygon.
+
+    Args:
+        point (Tuple[float, float]): Point (x, y)
+        polygon (Polygon): Polygon vertices
+
+    Returns:
+        bool: True if the point is inside
+
+    Example:
+        >>> point_in_polygon((50, 50), [(0, 0), (100, 0), (100, 100), (0, 100)])
+        True
+    """
+    return bool(points_in_polygon(np.array([point]), polygon)[0])
+
+
+# Usage example
+if __name__ == "__main__":
+    polygons = PolygonSet(
+        [
+            [(0, 0), (100, 0), (100, 100), (0, 100)],
+            [(50, 50), (150, 50), (100, 150)],
+        ]
+    )
+    points = np.array([[25, 25], [75, 75], [120, 80], [300, 300]])
+    print(polygons.contains(points))
@@ -0,0 +1,521 @@
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from .detections import Detections
+from .roi import reset_yolo_tracks
+
+# COCO class id of "person"
+PERSON_CLASS = 0
+
+# Detection confidence threshold: ByteTrack's low threshold, so its second
+# association stage still sees the low-score boxes (the YOLO.track() default)
+TRACK_CONF = 0.1
+
+
+@dataclass
+class _TrackerInput:
+    """
+    Minimal stand-in for ultralytics ``Boxes`` accepted by BYTETracker.update().
+
+    Attributes:
+        xywh: (N, 4) center-format boxes
+        conf: (N,) confidences
+        cls: (N,) class ids
+    """
+
+    xywh: NDArray
+    conf: NDArray
+    cls: NDArray
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, index: Any) -> "_TrackerInput":
+        return _TrackerInput(self.xywh[index], self.conf[index], self.cls[index])
+
+
+class ByteTrackTracker:
+    """
+    ByteTrack multi-object tracker fed with plain Detections.
+
+    Wraps the ultralytics BYTETracker so exported models get the same
+    tracker and settings (``bytetrack.yaml``) as ``YOLO.track()``.
+
+    Example:
+        >>> tracker = ByteTrackTracker()
+        >>> tracked = tracker.update(backend.detect([frame])[0])
+    """
+
+    def __init__(self, frame_rate: int = 30, config: str = "bytetrack.yaml"):
+        """
+        Initialize tracker.
+
+        Args:
+            frame_rate (int, optional): Expected detection rate, used to scale
+                                        the track buffer. Defaults to 30.
+            config (str, optional): Ultralytics tracker config.
+                                    Defaults to 'bytetrack.yaml'.
+        """
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
+
+        args = IterableSimpleNamespace(**yaml_load(check_yaml(config)))
+        self._tracker = BYTETracker(args, frame_rate=frame_rate)
+
+    def update(self, detections: Detections) -> Detections:
+        """
+        Associate detections with existing tracks.
+
+        Args:
+            detections (Detections): Untracked detections of one frame
+
+        Returns:
+            Detections: Confirmed tracks with their ids
+        """
+        tracks = self._tracker.update(
+            _TrackerInput(
+                detections.boxes,
+                detections.confidences,
+                np.full(len(detections.confidences), PERSON_CLASS, np.float32),
+            )
+        )
+        if len(tracks) == 0:
+            return Detections(
+                frame_seq=detections.frame_seq, capture_time=detections.capture_time
+            )
+
+        # Rows are (x1, y1, x2, y2, track_id, score, cls, index)
+        tracks = np.asarray(tracks, dtype=np.float32)
+        x1, y1, x2, y2 = tracks[:, 0], tracks[:, 1], tracks[:, 2], tracks[:, 3]
+        return Detections(
+            boxes=np.stack(
+                [(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], axis=1
+            ).astype(np.float32),
+            track_ids=tracks[:, 4].astype(np.int32),
+            confidences=tracks[:, 5].astype(np.float32),
+            frame_seq=detections.frame_seq,
+            capture_time=detections.capture_time,
+        )
+
+    def reset(self) -> None:
+        """Drop all tracks."""
+        self._tracker.reset()
+
+
+class InferenceBackend(ABC):
+    """
+    Base class of person detection backends.
+
+    ``detect()`` runs the detector on a batch of frames and returns untracked
+    Detections (track id -1). ``track()`` detects and tracks a single stream.
+
+    Example:
+        >>> backend = create_backend("onnx", "yolov8n.pt", threads=4)
+        >>> detections = backend.track(frame, frame_seq=packet.seq)
+    """
+
+    @abstractmethod
+    def detect(self, frames: Sequence[NDArray]) -> List[Detections]:
+        """
+        Detect people in a batch of frames.
+
+        Args:
+            frames (Sequence[NDArray]): BGR frames
+
+        Returns:
+            List[Detections]: Untracked detections per frame
+        """
+
+    @abstractmethod
+    def track(
+        self,
+        frame: NDArray,
+        frame_seq: int = -1,
+        capture_time: float = 0.0,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> Detections:
+        """
+        Detect and track people in the next frame of a stream.
+
+        Args:
+            frame (NDArray): BGR frame (or crop of it)
+            frame_seq (int, optional): Source frame sequence number. Defaults to -1.
+            capture_time (float, optional): Source frame capture time. Defaults to 0.0.
+            offset (Tuple[int, int], optional): Position of ``frame`` in the
+                full frame. Defaults to (0, 0).
+
+        Returns:
+            Detections: Tracked detections in full-frame coordinates
+        """
+
+
+class UltralyticsBackend(InferenceBackend):
+    """
+    PyTorch backend using ``ultralytics.YOLO`` directly.
+
+    Attributes:
+        model (YOLO): YOLO model instance
+        conf (float): Confidence threshold of detect()
+    """
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        threads: Optional[int] = None,
+        conf: float = TRACK_CONF,
+    ):
+        """
+        Load the model.
+
+        Args:
+            model_path (str, optional): Model weights. Defaults to 'yolov8n.pt'.
+            threads (Optional[int], optional): torch intra-op threads.
+                                               Defaults to torch's choice.
+            conf (float, optional): Confidence threshold of detect().
+                                    Defaults to TRACK_CONF.
+        """
+        from ultralytics import YOLO
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self.model = YOLO(model_path, verbose=False)
+        self.conf = conf
+        self._track_offset: Tuple[int, int] = (0, 0)
+
+    def detect(self, frames: Sequence[NDArray]) -> List[Detections]:
+        results = self.model.predict(
+            list(frames), classes=[PERSON_CLASS], conf=self.conf, verbose=False
+        )
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            detections.append(
+                Detections(
+                    boxes=boxes.xywh.cpu().numpy().astype(np.float32),
+                    track_ids=np.full(len(boxes), -1, np.int32),
+                    confidences=boxes.conf.cpu().numpy().astype(np.float32),
+                )
+            )
+        return detections
+
+    def track(
+        self,
+        frame: NDArray,
+        frame_seq: int = -1,
+        capture_time: float = 0.0,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> Detections:
+        # Tracks are kept in crop coordinates; drop them if the crop moved
+        if offset != self._track_offset:
+            reset_yolo_tracks(self.model)
+            self._track_offset = offset
+
+        # Run detection and tracking on people only (class 0)
+        results = self.model.track(
+            frame,
+            persist=True,  # Enable tracking
+            classes=[PERSON_CLASS],  # Track people only
+            verbose=False,  # Suppress progress output
+        )
+        return Detections.from_yolo(results, frame_seq, capture_time, offset)
+
+
+class ExportedBackend(InferenceBackend):
+    """
+    Base class of backends running an exported YOLOv8 model.
+
+    Handles the parts ultralytics does for PyTorch models: letterbox
+    preprocessing, decoding of the (batch, 4 + classes, anchors) output,
+    non-maximum suppression and ByteTrack tracking. Subclasses only
+    implement ``_infer()``.
+
+    Attributes:
+        imgsz (int): Square network input size
+        conf (float): Confidence threshold
+        iou (float): NMS IoU threshold
+        batch_size (Optional[int]): Fixed batch size of the model, None if dynamic
+    """
+
+    def __init__(self, imgsz: int = 640, conf: float = TRACK_CONF, iou: float = 0.7):
+        """
+        Initialize shared pre- and post-processing settings.
+
+        Args:
+            imgsz (int, optional): Network input size. Defaults to 640.
+            conf (float, optional): Confidence threshold.
+                                    Defaults to TRACK_CONF.
+            iou (float, optional): NMS IoU threshold. Defaults to 0.7.
+        """
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.batch_size: Optional[int] = None
+        self._tracker: Optional[ByteTrackTracker] = None
+
+    @staticmethod
+    def export(model_path: str, format: str, imgsz: int = 640) -> str:
+        """
+        Export a PyTorch model once and reuse the cached export afterwards.
+
+        Args:
+            model_path (str): Path to ``.pt`` weights
+            format (str): Ultralytics export format ('onnx' or 'openvino')
+            imgsz (int, optional): Export input size. Defaults to 640.
+
+        Returns:
+            str: Path of the exported model
+        """
+        stem, _ = os.path.splitext(model_path)
+        if format == "onnx":
+            exported = f"{stem}.onnx"
+        else:
+            exported = f"{stem}_{format}_model"
+        if os.path.exists(exported):
+            return exported
+
+        from ultralytics import YOLO
+
+        print(f"Exporting {model_path} to {format}...")
+        # Dynamic axes so several frames can be batched into one call
+        return YOLO(model_path).export(format=format, imgsz=imgsz, dynamic=True)
+
+    @abstractmethod
+    def _infer(self, batch: NDArray) -> NDArray:
+        """
+        Run the network.
+
+        Args:
+            batch (NDArray): (B, 3, imgsz, imgsz) float32 RGB input in [0, 1]
+
+        Returns:
+            NDArray: (B, 4 + classes, anchors) raw output
+        """
+
+    def _letterbox(self, frame: NDArray) -> Tuple[NDArray, float, Tuple[float, float]]:
+        """Resize keeping aspect ratio and pad to a square network input."""
+        height, width = frame.shape[:2]
+        scale = min(self.imgsz / height, self.imgsz / width)
+        new_w, new_h = round(width * scale), round(height * scale)
+        pad_x, pad_y = (self.imgsz - new_w) / 2, (self.imgsz - new_h) / 2
+
+        resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        left, top = round(pad_x - 0.1), round(pad_y - 0.1)
+        padded = cv2.copyMakeBorder(
+            resized,
+            top,
+            self.imgsz - new_h - top,
+            left,
+            self.imgsz - new_w - left,
+            cv2.BORDER_CONSTANT,
+            value=(114, 114, 114),
+        )
+        return padded, scale, (left, top)
+
+    def _decode(
+        self, output: NDArray, scale: float, pad: Tuple[float, float]
+    ) -> Detections:
+        """Filter, un-letterbox and NMS the raw output of one image."""
+        predictions = output.T  # (anchors, 4 + classes)
+        scores = predictions[:, 4 + PERSON_CLASS]
+        keep = scores > self.conf
+        boxes = predictions[keep, :4].astype(np.float32)
+        scores = scores[keep].astype(np.float32)
+
+        boxes[:, 0] = (boxes[:, 0] - pad[0]) / scale
+        boxes[:, 1] = (boxes[:, 1] - pad[1]) / scale
+        boxes[:, 2:4] /= scale
+
+        if len(boxes):
+            top_left = boxes.copy()
+            top_left[:, :2] -= boxes[:, 2:4] / 2
+            indices = cv2.dnn.NMSBoxes(
+                top_left.tolist(), scores.tolist(), self.conf, self.iou
+            )
+            indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+            boxes, scores = boxes[indices], scores[indices]
+
+        return Detections(
+            boxes=boxes,
+            track_ids=np.full(len(scores), -1, np.int32),
+            confidences=scores,
+        )
+
+    def detect(self, frames: Sequence[NDArray]) -> List[Detections]:
+        inputs, scales, pads = [], [], []
+        for frame in frames:
+            padded, scale, pad = self._letterbox(frame)
+            inputs.append(padded)
+            scales.append(scale)
+            pads.append(pad)
+
+        batch = cv2.dnn.blobFromImages(inputs, 1 / 255.0, swapRB=True)
+
+        # Models exported with a fixed batch size run one chunk at a time
+        chunk = self.batch_size or len(batch)
+        outputs = np.concatenate(
+            [self._infer(batch[i : i + chunk]) for i in range(0, len(batch), chunk)]
+        )
+        return [
+            self._decode(output, scale, pad)
+            for output, scale, pad in zip(outputs, scales, pads)
+        ]
+
+    def track(
+        self,
+        frame: NDArray,
+        frame_seq: int = -1,
+        capture_time: float = 0.0,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> Detections:
+        if self._tracker is None:
+            self._tracker = ByteTrackTracker()
+
+        # Track in full-frame coordinates so moving the crop keeps the ids
+        detections = self.detect([frame])[0]
+        detections.boxes[:, 0] += offset[0]
+        detections.boxes[:, 1] += offset[1]
+        tracked = self._tracker.update(detections)
+        tracked.frame_seq = frame_seq
+        tracked.capture_time = capture_time
+        return tracked
+
+
+class OnnxBackend(ExportedBackend):
+    """
+    ONNX Runtime CPU backend.
+
+    Example:
+        >>> backend = OnnxBackend("yolov8n.pt", threads=4)
+    """
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        threads: Optional[int] = None,
+        imgsz: int = 640,
+    ):
+        """
+        Export (if needed) and load the model.
+
+        Args:
+            model_path (str, optional): ``.pt`` weights or an ``.onnx`` file.
+                                        Defaults to 'yolov8n.pt'.
+            threads (Optional[int], optional): Intra-op threads.
+                                               Defaults to ONNX Runtime's choice.
+            imgsz (int, optional): Network input size. Defaults to 640.
+        """
+        import onnxruntime as ort
+
+        super().__init__(imgsz=imgsz)
+        if not model_path.endswith(".onnx"):
+            model_path = self.export(model_path, "onnx", imgsz)
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        if isinstance(model_input.shape[0], int):
+            self.batch_size = model_input.shape[0]
+
+    def _infer(self, batch: NDArray) -> NDArray:
+        return self.session.run(None, {self._input_name: batch})[0]
+
+
+class OpenVINOBackend(ExportedBackend):
+    """
+    OpenVINO CPU backend.
+
+    Example:
+        >>> backend = OpenVINOBackend("yolov8n.pt", threads=4)
+    """
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        threads: Optional[int] = None,
+        imgsz: int = 640,
+    ):
+        """
+        Export (if needed) and compile the model.
+
+        Args:
+            model_path (str, optional): ``.pt`` weights or an OpenVINO model
+                                        directory. Defaults to 'yolov8n.pt'.
+            threads (Optional[int], optional): Inference threads.
+                                               Defaults to OpenVINO's choice.
+            imgsz (int, optional): Network input size. Defaults to 640.
+        """
+        import openvino as ov
+
+        super().__init__(imgsz=imgsz)
+        if not os.path.isdir(model_path):
+            model_path = self.export(model_path, "openvino", imgsz)
+        xml = next(
+            os.path.join(model_path, name)
+            for name in sorted(os.listdir(model_path))
+            if name.endswith(".xml")
+        )
+
+        config: Dict[str, Any] = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        core = ov.Core()
+        # Memory-map the IR weights: processes loading the same model share
+        # them through the page cache instead of each reading a private copy
+        core.set_property({"ENABLE_MMAP": True})
+        self.compiled_model = core.compile_model(core.read_model(xml), "CPU", config)
+        batch = self.compiled_model.input(0).get_partial_shape()[0]
+        if batch.is_static:
+            self.batch_size = batch.get_length()
+
+    def _infer(self, batch: NDArray) -> NDArray:
+        return self.compiled_model(batch)[0]
+
+
+BACKENDS = {
+    "pytorch": UltralyticsBackend,
+    "onnx": OnnxBackend,
+    "openvino": OpenVINOBackend,
+}
+
+
+def create_backend(
+    name: str = "pytorch",
+    model_path: str = "yolov8n.pt",
+    threads: Optional[int] = None,
+) -> InferenceBackend:
+    """
+    Create an inference backend by name.
+
+    Args:
+        name (str, optional): 'pytorch', 'onnx' or 'openvino'. Defaults to 'pytorch'.
+        model_path (str, optional): Model weights. Defaults to 'yolov8n.pt'.
+        threads (Optional[int], optional): CPU threads used for inference.
+                                           Defaults to the runtime's choice.
+
+    Returns:
+        InferenceBackend: Ready-to-use backend
+
+    Raises:
+        ValueError: If the backend name is unknown
+
+    Example:
+        >>> backend = create_backend(os.getenv("INFERENCE_BACKEND", "pytorch"))
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}")
+    return BACKENDS[name](model_path=model_path, threads=threads)
@@ -0,0 +1,167 @@
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+
+class MotionDetector:
+    """
+    Cheap motion detector based on downscaled frame differencing.
+
+    Each frame is shrunk to a small grayscale thumbnail and compared with the
+    previous thumbnail. Motion is reported when the fraction of changed pixels
+    exceeds a threshold. This costs a tiny fraction of one YOLO inference.
+
+    Attributes:
+        width (int): Thumbnail width in pixels
+        pixel_threshold (int): Gray level change counted as motion
+        min_changed_ratio (float): Fraction of changed pixels reported as motion
+        changed_ratio (float): Changed pixel fraction of the last frame
+
+    Example:
+        >>> detector = MotionDetector()
+        >>> if detector.update(frame):
+        ...     print("Something moved")
+    """
+
+    def __init__(
+        self,
+        width: int = 160,
+        pixel_threshold: int = 25,
+        min_changed_ratio: float = 0.002,
+    ):
+        """
+        Initialize motion detector.
+
+        Args:
+            width (int, optional): Thumbnail width. Defaults to 160.
+            pixel_threshold (int, optional): Gray level change counted as motion.
+                                             Defaults to 25.
+            min_changed_ratio (float, optional): Changed pixel fraction reported
+                                                 as motion. Defaults to 0.002.
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.changed_ratio = 0.0
+        self._previous: Optional[NDArray] = None
+
+    def update(self, frame: NDArray) -> bool:
+        """
+        Compare a frame with the previous one.
+
+        Args:
+            frame (NDArray): BGR frame
+
+        Returns:
+            bool: True if motion was detected (always True for the first frame)
+        """
+        height, width = frame.shape[:2]
+        size = (self.width, max(1, int(height * self.width / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            self.changed_ratio = 1.0
+            return True
+
+        diff = cv2.absdiff(gray, previous)
+        changed = np.count_nonzero(diff > self.pixel_threshold)
+        self.changed_ratio = changed / diff.size
+        return self.changed_ratio >= self.min_changed_ratio
+
+    def reset(self) -> None:
+        """Forget the previous frame."""
+        self._previous = None
+        self.changed_ratio = 0.0
+
+
+class InferenceScheduler:
+    """
+    Decides when to run detection based on scene activity.
+
+    While the scene is active (motion detected or tracks present within the
+    last ``hold_time`` seconds) detection runs at ``active_rate``; otherwise
+    it drops to ``idle_rate``. The first moving frame switches back to the
+    active rate immediately.
+
+    Attributes:
+        motion_detector (MotionDetector): Motion detector used as the gate
+        active_rate (Optional[float]): Detections per second when active,
+            None for as fast as possible
+        idle_rate (float): Detections per second when the scene is static
+        hold_time (float): Seconds to stay active after the last activity
+        skipped_frames (int): Number of frames skipped by the gate
+
+    Example:
+        >>> scheduler = InferenceScheduler(MotionDetector(), idle_rate=1.0)
+        >>> if scheduler.should_run(frame, active_tracks=len(result)):
+        ...     result = model.track(frame)
+    """
+
+    def __init__(
+        self,
+        motion_detector: Optional[MotionDetector] = None,
+        active_rate: Optional[float] = None,
+        idle_rate: float = 1.0,
+        hold_time: float = 2.0,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            motion_detector (Optional[MotionDetector]): Motion detector.
+                                                        Defaults to a new MotionDetector.
+            active_rate (Optional[float]): Rate when active. Defaults to unlimited.
+            idle_rate (float): Rate floor when static. Defaults to 1.0.
+            hold_time (float): Activity hold time in seconds. Defaults to 2.0.
+        """
+        self.motion_detector = motion_detector or MotionDetector()
+        self.active_rate = active_rate
+        self.idle_rate = idle_rate
+        self.hold_time = hold_time
+        self.skipped_frames = 0
+
+        self._last_activity = float("-inf")
+        self._last_run = float("-inf")
+
+    def is_active(self, now: float) -> bool:
+        """Check whether the scene counts as active at the given time."""
+        return now - self._last_activity < self.hold_time
+
+    def should_run(
+        self, frame: NDArray, active_tracks: int = 0, now: Optional[float] = None
+    ) -> bool:
+        """
+        Decide whether detection should run on this frame.
+
+        Args:
+            frame (NDArray): Candidate frame
+            active_tracks (int, optional): Number of currently tracked objects.
+                                           Defaults to 0.
+            now (Optional[float]): Current time. Defaults to time.monotonic().
+
+        Returns:
+            bool: True if detection should run; the run is recorded
+        """
+        if now is None:
+            now = time.monotonic()
+
+        moving = self.motion_detector.update(frame)
+        if moving or active_tracks > 0:
+            self._last_activity = now
+
+        if self.is_active(now):
+            rate = self.active_rate
+        else:
+            rate = self.idle_rate
+        interval = 1.0 / rate if rate else 0.0
+
+        if now - self._last_run < interval:
+            self.skipped_frames += 1
+            return False
+        self._last_run = now
+        return True
@@ -0,0 +1,272 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .frame_buffer import FrameBuffer, FramePacket
+from .inference_backend import ByteTrackTracker, InferenceBackend, create_backend
+from .inference_scheduler import InferenceScheduler
+from .roi import ROI, crop_to_roi
+
+
+class InferenceClient:
+    """
+    One camera registered with an InferenceServer.
+
+    Holds the camera's frame buffer, its own ByteTrack tracker (so track ids
+    are independent per camera) and the per-camera detection settings.
+
+    Attributes:
+        name (str): Camera name used in stats
+        frame_buffer (FrameBuffer): Source of frames and sink of results
+        scheduler (Optional[InferenceScheduler]): Motion-gated detection scheduler
+        detect_interval (int): Minimum captured frames between detections
+        roi (Optional[ROI]): Inference region, None for the full frame
+        tracker (ByteTrackTracker): Tracker of this camera
+    """
+
+    def __init__(
+        self,
+        name: str,
+        frame_buffer: FrameBuffer,
+        scheduler: Optional[InferenceScheduler] = None,
+        detect_interval: int = 1,
+    ):
+        """
+        Initialize a client.
+
+        Args:
+            name (str): Camera name
+            frame_buffer (FrameBuffer): Frame buffer of the camera
+            scheduler (Optional[InferenceScheduler], optional): Detection
+                scheduler. Defaults to None.
+            detect_interval (int, optional): Run detection at most every N
+                                             captured frames. Defaults to 1.
+        """
+        self.name = name
+        self.frame_buffer = frame_buffer
+        self.scheduler = scheduler
+        self.detect_interval = detect_interval
+        self.roi: Optional[ROI] = None
+        self.tracker = ByteTrackTracker()
+        self.last_seq = 0
+        self._last_detect_seq = -detect_interval
+
+    def set_roi(self, roi: Optional[ROI]) -> None:
+        """
+        Restrict inference to a region of the frame.
+
+        Args:
+            roi (Optional[ROI]): Region (x0, y0, x1, y1), None for the full frame
+        """
+        self.roi = roi
+
+    def has_new_frame(self) -> bool:
+        """Check whether a frame newer than the last one taken is available."""
+        packet = self.frame_buffer.get_latest_frame_packet()
+        return packet is not None and packet.seq > self.last_seq
+
+    def take_frame(self) -> Optional[FramePacket]:
+        """
+        Take the newest frame if it is due for detection.
+
+        Returns:
+            Optional[FramePacket]: Held packet to detect on (release it when
+                done), None if the frame is skipped by the interval or the
+                scheduler
+        """
+        packet = self.frame_buffer.retain_latest()
+        if packet is None:
+            return None
+        if packet.seq <= self.last_seq or not self._due(packet):
+            packet.release()
+            return None
+        self._last_detect_seq = packet.seq
+        return packet
+
+    def _due(self, packet: FramePacket) -> bool:
+        """Check the interval and the scheduler for a new frame."""
+        self.last_seq = packet.seq
+        if packet.seq - self._last_detect_seq < self.detect_interval:
+            return False
+        if self.scheduler is None:
+            return True
+        latest = self.frame_buffer.get_result()
+        active_tracks = len(latest) if latest is not None else 0
+        image, _ = crop_to_roi(packet.frame, self.roi)
+        return self.scheduler.should_run(image, active_tracks)
+
+
+class InferenceServer(threading.Thread):
+    """
+    Shared detector that runs the frames of all cameras as one batch.
+
+    Cameras register their FrameBuffer. Whenever a camera has a new frame,
+    the server waits up to ``batch_window`` seconds for the other cameras'
+    next frames, then runs the newest frame of every ready camera through
+    a single ``backend.detect()`` call. Detections are handed to each
+    camera's own tracker and stored in its FrameBuffer, exactly like
+    YOLOThread does for a single camera. The model is loaded only once.
+
+    Attributes:
+        backend (InferenceBackend): Shared detection backend
+        batch_window (float): Seconds to wait for more cameras after the first
+            frame of a batch arrives
+        max_batch (int): Maximum frames per batch
+        batches (int): Number of batches run
+        batched_frames (int): Number of frames detected
+
+    Example:
+        >>> server = InferenceServer("yolov8n.pt", backend="onnx")
+        >>> server.start()
+        >>> client = server.register("entrance", camera.frame_buffer)
+        >>> server.unregister(client)
+        >>> server.stop()
+    """
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        backend: str = "pytorch",
+        threads: Optional[int] = None,
+        batch_window: float = 0.01,
+        max_batch: int = 8,
+    ):
+        """
+        Load the model.
+
+        Args:
+            model_path (str, optional): Model weights. Defaults to 'yolov8n.pt'.
+            backend (str, optional): Inference backend, 'pytorch', 'onnx' or
+                                     'openvino'. Defaults to 'pytorch'.
+            threads (Optional[int], optional): CPU threads for inference.
+                                               Defaults to the runtime's choice.
+            batch_window (float, optional): Batch collection window in seconds.
+                                            Defaults to 0.01.
+            max_batch (int, optional): Maximum frames per batch. Defaults to 8.
+        """
+        super().__init__(daemon=True)
+        self.backend: InferenceBackend = create_backend(backend, model_path, threads)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.running = True
+        self.batches = 0
+        self.batched_frames = 0
+        self.last_batch_time = 0.0
+
+        self._clients: List[InferenceClient] = []
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        frame_buffer: FrameBuffer,
+        scheduler: Optional[InferenceScheduler] = None,
+        detect_interval: int = 1,
+    ) -> InferenceClient:
+        """
+        Add a camera.
+
+        Args:
+            name (str): Camera name
+            frame_buffer (FrameBuffer): Frame buffer of the camera
+            scheduler (Optional[InferenceScheduler], optional): Detection
+                scheduler. Defaults to None.
+            detect_interval (int, optional): Run detection at most every N
+                                             captured frames. Defaults to 1.
+
+        Returns:
+            InferenceClient: Handle for set_roi() and unregister()
+        """
+        client = InferenceClient(name, frame_buffer, scheduler, detect_interval)
+        with self._lock:
+            self._clients.append(client)
+        return client
+
+    def unregister(self, client: InferenceClient) -> None:
+        """
+        Remove a camera.
+
+        Args:
+            client (InferenceClient): Handle returned by register()
+        """
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def _collect(self) -> List[InferenceClient]:
+        """Wait for a first new frame, then for more cameras within the window."""
+        deadline = None
+        while self.running:
+            with self._lock:
+                clients = list(self._clients)
+            ready = [client for client in clients if client.has_new_frame()]
+            now = time.monotonic()
+            if ready and deadline is None:
+                deadline = now + self.batch_window
+            if ready and (
+                len(ready) == len(clients)
+                or len(ready) >= self.max_batch
+                or now >= deadline
+            ):
+                return ready[: self.max_batch]
+            time.sleep(0.001)
+        return []
+
+    def run(self) -> None:
+        """Collect, batch, detect and dispatch until stopped."""
+        while self.running:
+            packets: Dict[InferenceClient, FramePacket] = {}
+            for client in self._collect():
+                packet = client.take_frame()
+                if packet is not None:
+                    packets[client] = packet
+            if not packets:
+                continue
+            try:
+                self._run_batch(packets)
+            finally:
+                for packet in packets.values():
+                    packet.release()
+
+    def _run_batch(self, packets: Dict[InferenceClient, FramePacket]) -> None:
+        """Detect on held frames of several cameras and dispatch the results."""
+        crops = [crop_to_roi(p.frame, c.roi) for c, p in packets.items()]
+        started = time.time()
+        try:
+            results = self.backend.detect([image for image, _ in crops])
+        except Exception as e:
+            print(f"Error in batched inference: {e}")
+            return
+        self.last_batch_time = time.time() - started
+        self.batches += 1
+        self.batched_frames += len(results)
+
+        for (client, packet), (_, offset), detections in zip(
+            packets.items(), crops, results
+        ):
+            # Track in full-frame coordinates so moving the crop keeps the ids
+            detections.boxes[:, 0] += offset[0]
+            detections.boxes[:, 1] += offset[1]
+            tracked = client.tracker.update(detections)
+            tracked.frame_seq = packet.seq
+            tracked.capture_time = packet.capture_time
+            client.frame_buffer.put_result(tracked, packet)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Batching statistics.
+
+        Returns:
+            Dict[str, float]: Batch count, mean batch size, last batch time
+                and number of cameras
+        """
+        return {
+            "cameras": len(self._clients),
+            "batches": self.batches,
+            "mean_batch_size": self.batched_frames / max(self.batches, 1),
+            "last_batch_time": self.last_batch_time,
+        }
+
+    def stop(self) -> None:
+        """Stop the server thread."""
+        self.running = False
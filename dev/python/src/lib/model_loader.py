@@ -0,0 +1,181 @@
+import gc
+import json
+import multiprocessing
+import os
+from typing import Dict, Optional, Tuple
+
+from .inference_backend import InferenceBackend, create_backend
+
+# Environment variable carrying the model the worker fork server preloads
+PRELOAD_ENV = "KODOMORI_PRELOAD_MODEL"
+
+# Backends loaded in this process, keyed by (backend, model_path, threads)
+_backends: Dict[Tuple[str, str, Optional[int]], InferenceBackend] = {}
+
+
+def worker_context():
+    """
+    Multiprocessing context for inference workers.
+
+    Workers are forked from a fork server: a clean, single-threaded process
+    started on demand, so forking is safe even though the parent already
+    runs camera and API threads. Platforms without fork servers spawn
+    fresh interpreters instead.
+
+    Returns:
+        multiprocessing.context.BaseContext: Worker start context
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def load_backend(
+    backend: str = "pytorch",
+    model_path: str = "yolov8n.pt",
+    threads: Optional[int] = None,
+) -> InferenceBackend:
+    """
+    Get the backend for a model, loading it only on the first call.
+
+    In a worker forked after ``preload`` this returns the inherited model,
+    whose weights are shared copy-on-write with the fork server.
+
+    Args:
+        backend (str, optional): 'pytorch', 'onnx' or 'openvino'.
+                                 Defaults to 'pytorch'.
+        model_path (str, optional): Model weights. Defaults to 'yolov8n.pt'.
+        threads (Optional[int], optional): CPU threads used for inference.
+                                           Defaults to the runtime's choice.
+
+    Returns:
+        InferenceBackend: Loaded backend
+    """
+    key = (backend, model_path, threads)
+    if key not in _backends:
+        _backends[key] = create_backend(backend, model_path, threads)
+    return _backends[key]
+
+
+def preload(
+    backend: str = "pytorch",
+    model_path: str = "yolov8n.pt",
+    threads: Optional[int] = None,
+) -> InferenceBackend:
+    """
+    Load a model so that processes forked afterwards share its weights.
+
+    PyTorch models are fused up front; otherwise every worker would fuse
+    (and thereby copy) the weights on its first prediction. Everything
+    allocated so far is then moved out of the garbage collector's reach
+    with ``gc.freeze()``, so collections in the workers do not write to
+    the shared pages.
+
+    Args:
+        backend (str, optional): Backend name. Defaults to 'pytorch'.
+        model_path (str, optional): Model weights. Defaults to 'yolov8n.pt'.
+        threads (Optional[int], optional): CPU threads. Defaults to None.
+
+    Returns:
+        InferenceBackend: Loaded backend
+    """
+    loaded = load_backend(backend, model_path, threads)
+    model = getattr(loaded, "model", None)
+    if model is not None and hasattr(model, "fuse"):
+        model.fuse()
+    gc.collect()
+    gc.freeze()
+    return loaded
+
+
+def share_with_workers(
+    backend: str = "pytorch",
+    model_path: str = "yolov8n.pt",
+    threads: Optional[int] = None,
+) -> bool:
+    """
+    Make inference workers started from now on inherit one preloaded model.
+
+    The fork server loads the model once when it starts and every worker
+    forked from it reuses that copy. Must be called before the first worker
+    starts. Only the PyTorch backend is preloaded: ONNX Runtime and
+    OpenVINO create thread pools while loading, which do not survive a
+    fork. OpenVINO memory-maps its weights instead.
+
+    Args:
+        backend (str, optional): Backend name. Defaults to 'pytorch'.
+        model_path (str, optional): Model weights. Defaults to 'yolov8n.pt'.
+        threads (Optional[int], optional): CPU threads. Defaults to None.
+
+    Returns:
+        bool: True if the model will be preloaded
+
+    Example:
+        >>> share_with_workers("pytorch", "yolov8n.pt")
+        >>> worker = YOLOProcess(ring, table, lock, model_path="yolov8n.pt")
+    """
+    context = worker_context()
+    if backend != "pytorch" or context.get_start_method() != "forkserver":
+        return False
+    os.environ[PRELOAD_ENV] = json.dumps([backend, model_path, threads])
+    context.set_forkserver_preload([f"{__package__}.model_preload"])
+    return True
+
+
+def preload_from_env() -> None:
+    """Preload the model named in PRELOAD_ENV, if any (fork server side)."""
+    spec = os.environ.get(PRELOAD_ENV)
+    if not spec:
+        return
+    try:
+        backend, model_path, threads = json.loads(spec)
+        preload(backend, model_path, threads)
+    except Exception as e:
+        print(f"Error preloading model: {e}")
+
+
+def memory_usage(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Memory of a process in bytes, from /proc/<pid>/smaps_rollup.
+
+    ``pss`` splits shared pages between the processes sharing them, so the
+    PSS of all workers adds up to their real footprint; ``rss`` counts
+    shared weights in every worker.
+
+    Args:
+        pid (Optional[int]): Process id. Defaults to the current process.
+
+    Returns:
+        Dict[str, int]: 'rss', 'pss', 'shared' and 'private' bytes, or only
+            'rss' on kernels without smaps_rollup; empty if unavailable
+    """
+    proc = f"/proc/{pid if pid is not None else 'self'}"
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"{proc}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        try:
+            with open(f"{proc}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return {"rss": int(line.split()[1]) * 1024}
+        except OSError:
+            pass
+        return {}
+
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+# Usage example
+if __name__ == "__main__":
+    print(f"Worker start method: {worker_context().get_start_method()}")
+    print(f"Memory of this process: {memory_usage()}")
@@ -0,0 +1,6 @@
+# Imported only by the inference worker fork server (see
+# model_loader.share_with_workers): loads the shared model once, before any
+# worker is forked.
+from .model_loader import preload_from_env
+
+preload_from_env()
@@ -0,0 +1,246 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Number of spatial axes (x, y)
+_AXES = 2
+
+
+class KalmanFilterBank:
+    """
+    Constant-velocity (or constant-acceleration) Kalman filters for many tracks.
+
+    Filters live in dense slots (see TrackStore), and the state of all slots
+    is kept in stacked numpy arrays, so a frame with N tracks costs one
+    batched predict/update instead of N Python-level filter steps. Each
+    slot has its own timestamp, so tracks that were missed for a few frames
+    are propagated over the right interval.
+
+    The state is laid out as [x, y, vx, vy] for ``order=2`` and
+    [x, y, vx, vy, ax, ay] for ``order=3``.
+
+    Attributes:
+        order (int): 2 for constant velocity, 3 for constant acceleration
+        process_noise (float): Std of the random highest derivative
+            (acceleration for order 2, jerk for order 3) in units per second^k
+        measurement_noise (float): Std of a position measurement
+        capacity (int): Number of allocated slots
+
+    Example:
+        >>> bank = KalmanFilterBank()
+        >>> slots = store.append_many(track_ids, positions, now)
+        >>> bank.update(slots, positions, now)
+        >>> predicted, covariance = bank.predict(slots, now + 0.5)
+    """
+
+    def __init__(
+        self,
+        order: int = 2,
+        process_noise: float = 300.0,
+        measurement_noise: float = 5.0,
+        initial_velocity_std: float = 200.0,
+        capacity: int = 32,
+    ):
+        """
+        Initialize an empty filter bank.
+
+        Args:
+            order (int, optional): 2 (constant velocity) or 3 (constant
+                                   acceleration). Defaults to 2.
+            process_noise (float, optional): Process noise std. Defaults to 300.0.
+            measurement_noise (float, optional): Measurement noise std.
+                                                 Defaults to 5.0.
+            initial_velocity_std (float, optional): Std of the unknown initial
+                                                    velocity. Defaults to 200.0.
+            capacity (int, optional): Initial slot count. Defaults to 32.
+
+        Raises:
+            ValueError: If order is not 2 or 3
+        """
+        if order not in (2, 3):
+            raise ValueError(f"Unsupported motion model order: {order}")
+        self.order = order
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.initial_velocity_std = initial_velocity_std
+        self.capacity = 0
+
+        size = order * _AXES
+        self._state = np.zeros((0, size), np.float64)
+        self._covariance = np.zeros((0, size, size), np.float64)
+        self._time = np.zeros(0, np.float64)
+        self._initialized = np.zeros(0, bool)
+
+        # Measurement model: positions are the first two state entries
+        self._H = np.eye(_AXES, size)
+        self._R = np.eye(_AXES) * measurement_noise**2
+        self.ensure_capacity(capacity)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """
+        Grow the slot arrays so that slots below ``capacity`` are valid.
+
+        Args:
+            capacity (int): Required slot count
+        """
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2)
+        extra = capacity - self.capacity
+        size = self.order * _AXES
+        self._state = np.concatenate([self._state, np.zeros((extra, size))])
+        self._covariance = np.concatenate(
+            [self._covariance, np.zeros((extra, size, size))]
+        )
+        self._time = np.concatenate([self._time, np.zeros(extra)])
+        self._initialized = np.concatenate([self._initialized, np.zeros(extra, bool)])
+        self.capacity = capacity
+
+    def _transition(self, dt: NDArray) -> Tuple[NDArray, NDArray]:
+        """
+        Build batched transition and process noise matrices.
+
+        Args:
+            dt (NDArray): (N,) time steps
+
+        Returns:
+            Tuple[NDArray, NDArray]: (N, S, S) transition and noise matrices
+        """
+        n = len(dt)
+        per_axis = np.broadcast_to(np.eye(self.order), (n, self.order, self.order))
+        per_axis = per_axis.copy()
+        per_axis[:, 0, 1] = dt
+        if self.order == 3:
+            per_axis[:, 0, 2] = dt**2 / 2
+            per_axis[:, 1, 2] = dt
+
+        # Discrete white noise on the highest derivative
+        if self.order == 2:
+            gain = np.stack([dt**2 / 2, dt], axis=1)
+        else:
+            gain = np.stack([dt**3 / 6, dt**2 / 2, dt], axis=1)
+        noise = gain[:, :, None] * gain[:, None, :] * self.process_noise**2
+
+        # Expand per-axis blocks to the interleaved [x, y, vx, vy, ...] layout
+        eye = np.eye(_AXES)
+        size = self.order * _AXES
+        F = np.einsum("nij,kl->nikjl", per_axis, eye).reshape(n, size, size)
+        Q = np.einsum("nij,kl->nikjl", noise, eye).reshape(n, size, size)
+        return F, Q
+
+    def _propagate(self, slots: NDArray, timestamp: float) -> Tuple[NDArray, NDArray]:
+        """Propagate the given slots to ``timestamp`` without storing the result."""
+        dt = np.maximum(timestamp - self._time[slots], 0.0)
+        F, Q = self._transition(dt)
+        state = np.einsum("nij,nj->ni", F, self._state[slots])
+        covariance = F @ self._covariance[slots] @ F.transpose(0, 2, 1) + Q
+        return state, covariance
+
+    def update(
+        self, slots: Sequence[int], measurements: NDArray, timestamp: float
+    ) -> None:
+        """
+        Fold one position measurement per slot into the filters.
+
+        Slots that were never updated (or were reset) are initialized at the
+        measured position with zero velocity.
+
+        Args:
+            slots (Sequence[int]): Slots of the measured tracks (unique)
+            measurements (NDArray): (N, 2) measured positions
+            timestamp (float): Measurement time
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        measurements = np.asarray(measurements, dtype=np.float64)
+        self.ensure_capacity(int(slots.max()) + 1)
+
+        fresh = ~self._initialized[slots]
+        if fresh.any():
+            new = slots[fresh]
+            variances = np.full(self.order * _AXES, self.initial_velocity_std**2)
+            variances[:_AXES] = self.measurement_noise**2
+            self._state[new] = 0.0
+            self._state[new, :_AXES] = measurements[fresh]
+            self._covariance[new] = np.diag(variances)
+            self._time[new] = timestamp
+            self._initialized[new] = True
+
+        known = ~fresh
+        if not known.any():
+            return
+        slots = slots[known]
+        z = measurements[known]
+
+        state, covariance = self._propagate(slots, timestamp)
+
+        H, R = self._H, self._R
+        innovation = z - state[:, :_AXES]
+        S = H @ covariance @ H.T + R
+        K = covariance @ H.T @ np.linalg.inv(S)
+        state = state + np.einsum("nij,nj->ni", K, innovation)
+        covariance = (np.eye(self.order * _AXES) - K @ H) @ covariance
+
+        self._state[slots] = state
+        self._covariance[slots] = covariance
+        self._time[slots] = timestamp
+
+    def predict(
+        self, slots: Sequence[int], timestamp: NDArray
+    ) -> Tuple[NDArray, NDArray]:
+        """
+        Predict positions at a future time without changing the filters.
+
+        Args:
+            slots (Sequence[int]): Slots to predict
+            timestamp (NDArray): Target time, scalar or (N,) per slot
+
+        Returns:
+            Tuple[NDArray, NDArray]: (N, 2) positions and (N, 2, 2) position
+                covariances
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        state, covariance = self._propagate(slots, timestamp)
+        return state[:, :_AXES], covariance[:, :_AXES, :_AXES]
+
+    def position(self, slots: Sequence[int]) -> NDArray:
+        """Filtered (N, 2) positions at each slot's last update."""
+        return self._state[np.asarray(slots, dtype=np.int64), :_AXES].copy()
+
+    def velocity(self, slots: Sequence[int]) -> NDArray:
+        """Filtered (N, 2) velocities in units per second."""
+        return self._state[np.asarray(slots, dtype=np.int64), _AXES : 2 * _AXES].copy()
+
+    def uncertainty(self, slots: Sequence[int]) -> NDArray:
+        """Position standard deviations (N, 2) at each slot's last update."""
+        slots = np.asarray(slots, dtype=np.int64)
+        variances = np.diagonal(self._covariance[slots], axis1=1, axis2=2)
+        return np.sqrt(variances[:, :_AXES])
+
+    def reset(self, slots: Sequence[int]) -> None:
+        """
+        Forget the filters of the given slots, e.g. after TrackStore eviction.
+
+        Args:
+            slots (Sequence[int]): Slots to reset
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        slots = slots[slots < self.capacity]
+        self._initialized[slots] = False
+
+
+# Usage example
+if __name__ == "__main__":
+    bank = KalmanFilterBank()
+
+    # Two tracks moving right at 100 and 50 units per second
+    for step in range(10):
+        t = step * 0.1
+        bank.update([0, 1], np.array([[100 * t, 0.0], [50 * t, 20.0]]), t)
+
+    predicted, covariance = bank.predict([0, 1], 1.4)
+    print(f"Velocities: {bank.velocity([0, 1])}")
+    print(f"Predicted at t=1.4: {predicted}")
+    print(f"Position std: {np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))}")
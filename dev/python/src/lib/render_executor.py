@@ -0,0 +1,73 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class RenderExecutor:
+    """
+    Dedicated executor for frame rendering work with an awaitable API.
+
+    Warping, zone drawing and JPEG encoding are CPU heavy and would block the
+    asyncio event loop if called directly from a route. This class runs them on
+    a private thread pool instead (OpenCV releases the GIL for the heavy parts),
+    so HTTP routes and other sockets keep being served while a frame renders.
+
+    With the default single worker, jobs run one at a time in submission
+    order, which also serializes access to non thread-safe pipeline state.
+
+    Attributes:
+        max_workers (int): Number of render threads
+
+    Example:
+        >>> executor = RenderExecutor()
+        >>> frame = await executor.run(main_app.next)
+        >>> executor.shutdown()
+    """
+
+    def __init__(self, max_workers: int = 1, thread_name_prefix: str = "render"):
+        """
+        Initialize the render thread pool.
+
+        Args:
+            max_workers (int, optional): Number of render threads. Defaults to 1.
+            thread_name_prefix (str, optional): Name prefix for worker threads.
+                                                Defaults to 'render'.
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a render function on the executor and await its result.
+
+        Args:
+            func (Callable): Function to execute
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Any: Return value of func
+
+        Raises:
+            RuntimeError: If the executor has been shut down
+        """
+        if self._executor is None:
+            raise RuntimeError("RenderExecutor has been shut down")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting jobs and release the worker threads.
+
+        Args:
+            wait (bool, optional): Wait for running jobs to finish. Defaults to True.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,97 @@
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# (x0, y0, x1, y1) in full-frame pixel coordinates, end exclusive
+ROI = Tuple[int, int, int, int]
+
+
+def floor_roi(
+    coords: Sequence[Tuple[float, float]],
+    margin: float = 0.2,
+    top_margin: float = 0.6,
+) -> Optional[ROI]:
+    """
+    Compute an inference region of interest around the floor polygon.
+
+    The bounding box of the floor points is grown by ``margin`` times its size
+    on each side. The top is grown by ``top_margin`` instead, because people
+    standing near the far edge of the floor extend above it in the image.
+
+    Args:
+        coords (Sequence[Tuple[float, float]]): Floor polygon vertices
+        margin (float, optional): Side and bottom margin as a fraction of the
+                                  box size. Defaults to 0.2.
+        top_margin (float, optional): Top margin as a fraction of the box
+                                      height. Defaults to 0.6.
+
+    Returns:
+        Optional[ROI]: Region (x0, y0, x1, y1), or None for fewer than 3 points
+
+    Example:
+        >>> floor_roi([(100, 100), (300, 100), (300, 200), (100, 200)])
+        (60, 40, 340, 220)
+    """
+    if len(coords) < 3:
+        return None
+
+    points = np.asarray(coords, dtype=np.float64)
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    width, height = x1 - x0, y1 - y0
+
+    return (
+        int(np.floor(x0 - width * margin)),
+        int(np.floor(y0 - height * top_margin)),
+        int(np.ceil(x1 + width * margin)),
+        int(np.ceil(y1 + height * margin)),
+    )
+
+
+def crop_to_roi(frame: NDArray, roi: Optional[ROI]) -> Tuple[NDArray, Tuple[int, int]]:
+    """
+    Crop a frame to a region of interest, clamped to the frame bounds.
+
+    Args:
+        frame (NDArray): Full frame
+        roi (Optional[ROI]): Region to crop, None for the full frame
+
+    Returns:
+        Tuple[NDArray, Tuple[int, int]]: Cropped view and the (x, y) offset of
+            the crop in the full frame
+    """
+    if roi is None:
+        return frame, (0, 0)
+
+    height, width = frame.shape[:2]
+    x0 = min(max(roi[0], 0), width)
+    y0 = min(max(roi[1], 0), height)
+    x1 = min(max(roi[2], x0), width)
+    y1 = min(max(roi[3], y0), height)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return frame, (0, 0)
+    return frame[y0:y1, x0:x1], (x0, y0)
+
+
+def reset_yolo_tracks(model: Any) -> None:
+    """
+    Drop the tracks of an Ultralytics model's persistent tracker.
+
+    The tracker runs on the cropped image, so its track states are relative
+    to the crop origin. When the region moves they no longer line up with
+    new detections and would be matched to the wrong people. Track ids keep
+    counting up, so dropped tracks are never confused with new ones.
+
+    Args:
+        model (Any): Ultralytics YOLO model used with ``track(persist=True)``
+
+    Example:
+        >>> if offset != last_offset:
+        ...     reset_yolo_tracks(model)
+    """
+    predictor = getattr(model, "predictor", None)
+    for tracker in getattr(predictor, "trackers", None) or []:
+        tracker.tracked_stracks = []
+        tracker.lost_stracks = []
+        tracker.removed_stracks = []
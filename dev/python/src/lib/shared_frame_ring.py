@@ -0,0 +1,382 @@
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .detections import Detections
+
+# Columns of the per-slot metadata table
+_SEQ = 0
+_CAPTURE_TIME = 1
+_PINNED = 2
+_META_COLUMNS = 3
+
+# Layout of the result table header
+_RESULT_SEQ = 0
+_FRAME_SEQ = 1
+_RESULT_CAPTURE_TIME = 2
+_COUNT = 3
+_HEADER_SIZE = 4
+
+# Columns of a result row: x, y, w, h, track_id, confidence
+_ROW_COLUMNS = 6
+
+_ALIGNMENT = 64
+
+
+def _aligned(size: int) -> int:
+    """Round a byte size up to the cache line alignment."""
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing shared memory block without taking ownership.
+
+    Only the creating process may unlink the block, so the attaching side is
+    removed from the resource tracker to keep it from unlinking the block (or
+    warning about a leak) when it exits.
+    """
+    shm = shared_memory.SharedMemory(name=name, create=False)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+@dataclass
+class RingFrame:
+    """
+    A frame pinned in a SharedFrameRing.
+
+    Attributes:
+        slot: Ring slot holding the frame
+        seq: Frame sequence number
+        capture_time: Capture timestamp
+        image: Read-only zero-copy view into shared memory
+    """
+
+    slot: int
+    seq: int
+    capture_time: float
+    image: NDArray
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of frames in shared memory for cross-process hand-off.
+
+    A single writer copies each captured frame into a free slot and tags it
+    with its sequence number and capture time. Readers in other processes pin the newest slot and
+    get a zero-copy numpy view of it; the writer never overwrites pinned
+    slots, so a reader can use the view for as long as inference takes.
+    Metadata updates are serialized by a shared lock, frame copies are not.
+
+    Attributes:
+        name (str): Shared memory block name
+        shape (Tuple[int, ...]): Frame shape
+        slots (int): Number of frame slots
+
+    Example:
+        >>> lock = multiprocessing.Lock()
+        >>> ring = SharedFrameRing.create((480, 640, 3), slots=4, lock=lock)
+        >>> ring.write(packet.frame, packet.seq, packet.capture_time)
+        >>> # In another process
+        >>> reader = SharedFrameRing.attach(ring.name, ring.shape, ring.slots, lock)
+        >>> pinned = reader.acquire_latest()
+        >>> process(pinned.image)
+        >>> reader.release(pinned)
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        shape: Tuple[int, ...],
+        slots: int,
+        lock: Any,
+        owner: bool,
+    ):
+        """
+        Wrap a shared memory block. Use create() or attach() instead.
+
+        Args:
+            shm (SharedMemory): Backing shared memory block
+            shape (Tuple[int, ...]): Frame shape
+            slots (int): Number of frame slots
+            lock (Any): Shared multiprocessing lock
+            owner (bool): True if this instance created the block
+        """
+        self._shm = shm
+        self.name = shm.name
+        self.shape = tuple(shape)
+        self.slots = slots
+        self._lock = lock
+        self._owner = owner
+
+        meta_bytes = _aligned(slots * _META_COLUMNS * 8)
+        self._meta = np.ndarray((slots, _META_COLUMNS), np.float64, shm.buf, 0)
+        self._frames = np.ndarray((slots, *self.shape), np.uint8, shm.buf, meta_bytes)
+
+    @staticmethod
+    def required_size(shape: Tuple[int, ...], slots: int) -> int:
+        """Bytes needed for a ring with the given frame shape and slot count."""
+        return _aligned(slots * _META_COLUMNS * 8) + slots * int(np.prod(shape))
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], slots: int, lock: Any) -> "SharedFrameRing":
+        """
+        Allocate a new ring.
+
+        Args:
+            shape (Tuple[int, ...]): Frame shape, e.g. (480, 640, 3)
+            slots (int): Number of slots (at least 3 so the writer always
+                         finds a free slot while a reader holds one)
+            lock (Any): Shared multiprocessing lock
+
+        Returns:
+            SharedFrameRing: Owning ring instance
+
+        Raises:
+            ValueError: If fewer than 3 slots are requested
+        """
+        if slots < 3:
+            raise ValueError("SharedFrameRing needs at least 3 slots")
+        shm = shared_memory.SharedMemory(
+            create=True, size=cls.required_size(shape, slots)
+        )
+        ring = cls(shm, shape, slots, lock, owner=True)
+        ring._meta[:] = 0
+        ring._meta[:, _SEQ] = -1
+        return ring
+
+    @classmethod
+    def attach(
+        cls, name: str, shape: Tuple[int, ...], slots: int, lock: Any
+    ) -> "SharedFrameRing":
+        """
+        Attach to a ring created by another process.
+
+        Args:
+            name (str): Shared memory block name
+            shape (Tuple[int, ...]): Frame shape
+            slots (int): Number of slots
+            lock (Any): The lock passed to create()
+
+        Returns:
+            SharedFrameRing: Non-owning ring instance
+        """
+        return cls(_attach_shared_memory(name), shape, slots, lock, owner=False)
+
+    def write(self, frame: NDArray, seq: int, capture_time: float) -> None:
+        """
+        Copy a frame into the oldest unpinned slot.
+
+        Args:
+            frame (NDArray): Frame matching the ring shape
+            seq (int): Frame sequence number (positive, increasing)
+            capture_time (float): Capture timestamp
+
+        Raises:
+            ValueError: If the frame shape does not match the ring
+            RuntimeError: If every slot is pinned
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match {self.shape}")
+
+        with self._lock:
+            free = np.flatnonzero(self._meta[:, _PINNED] == 0)
+            if len(free) == 0:
+                raise RuntimeError("No free slot in SharedFrameRing")
+            slot = int(free[np.argmin(self._meta[free, _SEQ])])
+            self._meta[slot, _SEQ] = -1  # being written
+
+        np.copyto(self._frames[slot], frame)
+
+        with self._lock:
+            self._meta[slot, _CAPTURE_TIME] = capture_time
+            self._meta[slot, _SEQ] = seq
+
+    def acquire_latest(self, after_seq: int = 0) -> Optional[RingFrame]:
+        """
+        Pin the newest frame if it is newer than after_seq.
+
+        Args:
+            after_seq (int, optional): Last sequence number already consumed.
+                                       Defaults to 0.
+
+        Returns:
+            Optional[RingFrame]: Pinned frame, or None if nothing new is available
+        """
+        with self._lock:
+            slot = int(np.argmax(self._meta[:, _SEQ]))
+            seq = int(self._meta[slot, _SEQ])
+            if seq <= after_seq:
+                return None
+            self._meta[slot, _PINNED] += 1
+            capture_time = float(self._meta[slot, _CAPTURE_TIME])
+
+        image = self._frames[slot].view()
+        image.flags.writeable = False
+        return RingFrame(slot=slot, seq=seq, capture_time=capture_time, image=image)
+
+    def release(self, frame: RingFrame) -> None:
+        """
+        Unpin a frame returned by acquire_latest().
+
+        Args:
+            frame (RingFrame): Pinned frame
+        """
+        with self._lock:
+            self._meta[frame.slot, _PINNED] -= 1
+
+    def close(self) -> None:
+        """Detach from the shared memory and free it if this instance owns it."""
+        self._meta = None
+        self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with the process
+            pass
+        if self._owner:
+            self._shm.unlink()
+
+
+class SharedResultTable:
+    """
+    Latest tracking result in shared memory.
+
+    The inference process writes each result as a fixed-capacity table of
+    (x, y, w, h, track_id, confidence) rows plus a small header holding the
+    result sequence, source frame sequence, capture time and row count.
+
+    Attributes:
+        name (str): Shared memory block name
+        max_detections (int): Row capacity
+
+    Example:
+        >>> table = SharedResultTable.create(max_detections=100, lock=lock)
+        >>> table.write(detections)
+        >>> result_seq, latest = table.read()
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        max_detections: int,
+        lock: Any,
+        owner: bool,
+    ):
+        """
+        Wrap a shared memory block. Use create() or attach() instead.
+
+        Args:
+            shm (SharedMemory): Backing shared memory block
+            max_detections (int): Row capacity
+            lock (Any): Shared multiprocessing lock
+            owner (bool): True if this instance created the block
+        """
+        self._shm = shm
+        self.name = shm.name
+        self.max_detections = max_detections
+        self._lock = lock
+        self._owner = owner
+
+        self._header = np.ndarray((_HEADER_SIZE,), np.float64, shm.buf, 0)
+        self._rows = np.ndarray(
+            (max_detections, _ROW_COLUMNS),
+            np.float32,
+            shm.buf,
+            _aligned(_HEADER_SIZE * 8),
+        )
+
+    @classmethod
+    def create(cls, max_detections: int, lock: Any) -> "SharedResultTable":
+        """
+        Allocate a new result table.
+
+        Args:
+            max_detections (int): Maximum detections stored per result
+            lock (Any): Shared multiprocessing lock
+
+        Returns:
+            SharedResultTable: Owning table instance
+        """
+        size = _aligned(_HEADER_SIZE * 8) + max_detections * _ROW_COLUMNS * 4
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        table = cls(shm, max_detections, lock, owner=True)
+        table._header[:] = 0
+        return table
+
+    @classmethod
+    def attach(cls, name: str, max_detections: int, lock: Any) -> "SharedResultTable":
+        """
+        Attach to a table created by another process.
+
+        Args:
+            name (str): Shared memory block name
+            max_detections (int): Row capacity
+            lock (Any): The lock passed to create()
+
+        Returns:
+            SharedResultTable: Non-owning table instance
+        """
+        return cls(_attach_shared_memory(name), max_detections, lock, owner=False)
+
+    def write(self, detections: Detections) -> None:
+        """
+        Publish a tracking result. Detections beyond capacity are dropped.
+
+        Args:
+            detections (Detections): Result to publish
+        """
+        count = min(len(detections), self.max_detections)
+        with self._lock:
+            rows = self._rows[:count]
+            rows[:, 0:4] = detections.boxes[:count]
+            rows[:, 4] = detections.track_ids[:count]
+            rows[:, 5] = detections.confidences[:count]
+            self._header[_FRAME_SEQ] = detections.frame_seq
+            self._header[_RESULT_CAPTURE_TIME] = detections.capture_time
+            self._header[_COUNT] = count
+            self._header[_RESULT_SEQ] += 1
+
+    def read(self, after_seq: int = 0) -> Tuple[int, Optional[Detections]]:
+        """
+        Copy out the latest result if it is newer than after_seq.
+
+        Args:
+            after_seq (int, optional): Last result sequence already consumed.
+                                       Defaults to 0.
+
+        Returns:
+            Tuple[int, Optional[Detections]]: Result sequence and the result,
+                or None if there is nothing new
+        """
+        with self._lock:
+            result_seq = int(self._header[_RESULT_SEQ])
+            if result_seq <= after_seq:
+                return result_seq, None
+            count = int(self._header[_COUNT])
+            rows = self._rows[:count].copy()
+            frame_seq = int(self._header[_FRAME_SEQ])
+            capture_time = float(self._header[_RESULT_CAPTURE_TIME])
+
+        return result_seq, Detections(
+            boxes=rows[:, 0:4],
+            track_ids=rows[:, 4].astype(np.int32),
+            confidences=rows[:, 5],
+            frame_seq=frame_seq,
+            capture_time=capture_time,
+        )
+
+    def close(self) -> None:
+        """Detach from the shared memory and free it if this instance owns it."""
+        self._header = None
+        self._rows = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
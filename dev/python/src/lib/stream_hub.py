@@ -0,0 +1,154 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+
+class StreamHub:
+    """
+    Single-producer broadcast hub for camera streams.
+
+    One producer task renders each output frame once and fans the same
+    encoded payload out to every subscriber. Subscribers register with a
+    profile (any hashable encoding setting); the producer asks ``render``
+    for one payload per distinct profile, so clients sharing a profile
+    share the same bytes. Each subscriber owns a bounded
+    queue; when a slow client falls behind, its oldest frames are dropped so
+    that it never stalls the producer or the other clients.
+
+    The producer only runs while at least one client is subscribed. Pacing is
+    driven by completed renders: the next render starts as soon as the
+    previous one finished and at least ``frame_interval`` seconds have passed
+    since it started, so slow renders are not followed by an extra sleep.
+
+    Attributes:
+        render (Callable): Coroutine function taking the set of active profiles
+            and returning a payload per profile (empty if no frame is ready)
+        client_queue_size (int): Maximum number of pending payloads per client
+        frame_interval (float): Minimum time between render starts in seconds
+        dropped_frames (int): Total payloads dropped for slow clients
+
+    Example:
+        >>> async def render(profiles):
+        ...     return await executor.run(build_payloads, profiles)
+        >>> hub = StreamHub(render=render)
+        >>> queue = await hub.subscribe(profile)
+        >>> payload = await queue.get()
+        >>> hub.unsubscribe(queue)
+    """
+
+    def __init__(
+        self,
+        render: Callable[[Set[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        client_queue_size: int = 2,
+        frame_interval: float = 0.03,
+    ):
+        """
+        Initialize the hub.
+
+        Args:
+            render (Callable): Coroutine function producing a payload per profile
+            client_queue_size (int, optional): Pending payloads kept per client.
+                                               Defaults to 2.
+            frame_interval (float, optional): Minimum seconds between render starts.
+                                              Defaults to 0.03.
+        """
+        self.render = render
+        self.client_queue_size = client_queue_size
+        self.frame_interval = frame_interval
+        self.dropped_frames = 0
+
+        self._subscribers: Dict[asyncio.Queue, Hashable] = {}
+        self._producer: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of currently connected subscribers."""
+        return len(self._subscribers)
+
+    @property
+    def profiles(self) -> Set[Hashable]:
+        """Distinct profiles of the current subscribers."""
+        return set(self._subscribers.values())
+
+    async def subscribe(self, profile: Hashable = None) -> asyncio.Queue:
+        """
+        Register a new subscriber and start the producer if needed.
+
+        Args:
+            profile (Hashable, optional): Encoding profile of the subscriber.
+                                          Defaults to None.
+
+        Returns:
+            asyncio.Queue: Queue receiving the broadcast payloads
+        """
+        queue = asyncio.Queue(maxsize=self.client_queue_size)
+        self._subscribers[queue] = profile
+        if self._producer is None or self._producer.done():
+            self._producer = asyncio.create_task(self._produce())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """
+        Remove a subscriber. The producer stops once nobody is subscribed.
+
+        Args:
+            queue (asyncio.Queue): Queue returned by subscribe()
+        """
+        self._subscribers.pop(queue, None)
+
+    async def close(self) -> None:
+        """
+        Drop all subscribers and stop the producer task.
+
+        Every subscriber receives ``None`` as its last payload, so clients
+        waiting on their queue can disconnect.
+        """
+        subscribers = list(self._subscribers)
+        self._subscribers.clear()
+        for queue in subscribers:
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(None)
+        if self._producer is not None:
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
+            self._producer = None
+
+    def publish(self, payloads: Dict[Hashable, Any]) -> None:
+        """
+        Hand each subscriber the payload of its profile, dropping the oldest
+        pending payload when its queue is full.
+
+        Args:
+            payloads (Dict[Hashable, Any]): Encoded frame per profile
+        """
+        for queue, profile in list(self._subscribers.items()):
+            if profile not in payloads:
+                continue
+            payload = payloads[profile]
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                    self.dropped_frames += 1
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(payload)
+
+    async def _produce(self) -> None:
+        """Render frames once and broadcast them while subscribers exist."""
+        while self._subscribers:
+            started = time.monotonic()
+            try:
+                payloads = await self.render(self.profiles)
+                if payloads:
+                    self.publish(payloads)
+            except Exception as e:
+                print(f"Error rendering stream frame: {e}")
+            remaining = self.frame_interval - (time.monotonic() - started)
+            await asyncio.sleep(max(remaining, 0))
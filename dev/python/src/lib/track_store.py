@@ -0,0 +1,222 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+# Columns of a history entry
+_X = 0
+_Y = 1
+_T = 2
+
+
+class TrackStore:
+    """
+    Bounded, array-backed position history for tracked objects.
+
+    Track ids are remapped to dense slots. Each slot owns a fixed-length ring
+    of (x, y, t) rows in one preallocated numpy array, so appending is O(1)
+    and memory only grows with the number of tracks alive at the same time,
+    not with the number of ids ever seen. Slots of tracks that have not been
+    updated for ``max_age`` seconds are freed by ``evict()``.
+
+    Attributes:
+        history (int): Positions kept per track
+        max_age (float): Seconds without updates before a track is evicted
+        capacity (int): Number of allocated slots
+
+    Example:
+        >>> store = TrackStore(history=8)
+        >>> store.append_many(track_ids, positions, now)
+        >>> ids, slots, positions, times = store.active()
+        >>> store.evict(now)
+    """
+
+    def __init__(self, history: int = 2, max_age: float = 2.0, capacity: int = 32):
+        """
+        Initialize an empty store.
+
+        Args:
+            history (int, optional): Positions kept per track. Defaults to 2.
+            max_age (float, optional): Eviction age in seconds. Defaults to 2.0.
+            capacity (int, optional): Initial slot count; doubled when full.
+                                      Defaults to 32.
+        """
+        self.history = history
+        self.max_age = max_age
+        self.capacity = 0
+
+        self._slot_of: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._ids = np.zeros(0, np.int64)
+        self._rows = np.zeros((0, history, 3), np.float64)
+        self._head = np.zeros(0, np.int64)
+        self._count = np.zeros(0, np.int64)
+        self._grow(capacity)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._slot_of
+
+    def _grow(self, capacity: int) -> None:
+        """Enlarge the slot arrays to the given capacity."""
+        extra = capacity - self.capacity
+        self._ids = np.concatenate([self._ids, np.full(extra, -1, np.int64)])
+        self._rows = np.concatenate(
+            [self._rows, np.zeros((extra, self.history, 3), np.float64)]
+        )
+        self._head = np.concatenate([self._head, np.zeros(extra, np.int64)])
+        self._count = np.concatenate([self._count, np.zeros(extra, np.int64)])
+        # Pop from the end so low slots are reused first
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def slot(self, track_id: int) -> int:
+        """
+        Get the slot of a track, allocating one for unknown ids.
+
+        Args:
+            track_id (int): Track identifier
+
+        Returns:
+            int: Dense slot index
+        """
+        slot = self._slot_of.get(track_id)
+        if slot is None:
+            if not self._free:
+                self._grow(self.capacity * 2)
+            slot = self._free.pop()
+            self._slot_of[track_id] = slot
+            self._ids[slot] = track_id
+            self._head[slot] = 0
+            self._count[slot] = 0
+        return slot
+
+    def slots(self, track_ids: Sequence[int]) -> NDArray:
+        """
+        Get the slots of several tracks, allocating slots for unknown ids.
+
+        Args:
+            track_ids (Sequence[int]): Track identifiers
+
+        Returns:
+            NDArray: (N,) slot indices
+        """
+        return np.fromiter(
+            (self.slot(track_id) for track_id in track_ids),
+            dtype=np.int64,
+            count=len(track_ids),
+        )
+
+    def append(
+        self, track_id: int, position: Tuple[float, float], timestamp: float
+    ) -> int:
+        """
+        Record one position.
+
+        Args:
+            track_id (int): Track identifier
+            position (Tuple[float, float]): (x, y) position
+            timestamp (float): Observation time
+
+        Returns:
+            int: Slot of the track
+        """
+        slot = self.slot(track_id)
+        self._rows[slot, self._head[slot]] = (position[0], position[1], timestamp)
+        self._head[slot] = (self._head[slot] + 1) % self.history
+        self._count[slot] = min(self._count[slot] + 1, self.history)
+        return slot
+
+    def append_many(
+        self, track_ids: Sequence[int], positions: NDArray, timestamp: float
+    ) -> NDArray:
+        """
+        Record positions of several tracks observed at the same time.
+
+        Args:
+            track_ids (Sequence[int]): Track identifiers (unique)
+            positions (NDArray): (N, 2) positions
+            timestamp (float): Observation time
+
+        Returns:
+            NDArray: (N,) slots of the tracks
+        """
+        slots = self.slots(track_ids)
+        heads = self._head[slots]
+        self._rows[slots, heads, _X] = positions[:, 0]
+        self._rows[slots, heads, _Y] = positions[:, 1]
+        self._rows[slots, heads, _T] = timestamp
+        self._head[slots] = (heads + 1) % self.history
+        self._count[slots] = np.minimum(self._count[slots] + 1, self.history)
+        return slots
+
+    def get_history(self, track_id: int) -> NDArray:
+        """
+        Get the recorded positions of a track, oldest first.
+
+        Args:
+            track_id (int): Track identifier
+
+        Returns:
+            NDArray: (n, 3) rows of (x, y, t); empty for unknown tracks
+        """
+        slot = self._slot_of.get(track_id)
+        if slot is None:
+            return np.zeros((0, 3), np.float64)
+        count = self._count[slot]
+        order = (self._head[slot] - count + np.arange(count)) % self.history
+        return self._rows[slot, order]
+
+    def active(self) -> Tuple[NDArray, NDArray, NDArray, NDArray]:
+        """
+        Get the newest state of every active track.
+
+        Returns:
+            Tuple[NDArray, NDArray, NDArray, NDArray]: Track ids (N,), slots
+                (N,), last positions (N, 2) and last update times (N,)
+        """
+        slots = np.flatnonzero(self._count > 0)
+        last = self._rows[slots, (self._head[slots] - 1) % self.history]
+        return self._ids[slots], slots, last[:, :2], last[:, _T]
+
+    def evict(self, now: float) -> NDArray:
+        """
+        Free the slots of tracks not updated within ``max_age``.
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            NDArray: Evicted slots, so callers can reset per-slot state
+        """
+        ids, slots, _, times = self.active()
+        stale = now - times > self.max_age
+        evicted = slots[stale]
+        for track_id, slot in zip(ids[stale].tolist(), evicted.tolist()):
+            del self._slot_of[track_id]
+            self._free.append(slot)
+        self._ids[evicted] = -1
+        self._count[evicted] = 0
+        return evicted
+
+    def clear(self) -> None:
+        """Drop every track."""
+        self.evict(float("inf"))
+
+
+# Usage example
+if __name__ == "__main__":
+    import time
+
+    store = TrackStore(history=4)
+    now = time.time()
+    store.append_many([3, 7], np.array([[100.0, 200.0], [300.0, 50.0]]), now)
+    store.append(3, (104.0, 202.0), now + 0.1)
+
+    print(store.get_history(3))
+    print(store.active())
+
+    # Track 7 was last seen at `now`, track 3 a little later
+    print(f"Evicted slots: {store.evict(now + 2.05)}")
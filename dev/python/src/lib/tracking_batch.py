@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def _empty(columns: int = 2) -> NDArray:
+    return np.zeros((0, columns), np.float64)
+
+
+@dataclass
+class TrackingBatch:
+    """
+    Columnar tracking data of one frame.
+
+    One row per tracked person; all columns share the same row order. This
+    replaces the per-person dicts of the mapping callback, so per-frame
+    processing can stay vectorized no matter how many people are in view.
+
+    Attributes:
+        track_ids: (N,) int32 track identifiers
+        coords: (N, 2) box centers in image coordinates
+        positions: (N, 2) box bottom centers (the floor contact point)
+        sizes: (N, 2) box width and height
+        predicted: (N, 2) predicted bottom centers
+        velocities: (N, 2) bottom center velocities in pixels per second
+        uncertainties: (N, 2) position standard deviations
+        frame_seq: Sequence number of the source frame (-1 if unknown)
+        capture_time: Capture time of the source frame (0.0 if unknown)
+
+    Example:
+        >>> batch = camera.process_tracking_results(frame, results)[1]
+        >>> for track_id, (x, y) in zip(batch.track_ids, batch.positions):
+        ...     print(track_id, x, y)
+    """
+
+    track_ids: NDArray = field(default_factory=lambda: np.zeros(0, np.int32))
+    coords: NDArray = field(default_factory=_empty)
+    positions: NDArray = field(default_factory=_empty)
+    sizes: NDArray = field(default_factory=_empty)
+    predicted: NDArray = field(default_factory=_empty)
+    velocities: NDArray = field(default_factory=_empty)
+    uncertainties: NDArray = field(default_factory=_empty)
+    frame_seq: int = -1
+    capture_time: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Convert to the per-person dicts used by the legacy mapping callback.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per row with the keys 'coord',
+                'mapped', 'track_id', 'size', 'predicted', 'velocity',
+                'uncertainty', 'frame_seq' and 'capture_time'
+        """
+        rows = zip(
+            self.track_ids.tolist(),
+            self.coords.tolist(),
+            self.positions.tolist(),
+            self.sizes.tolist(),
+            self.predicted.tolist(),
+            self.velocities.tolist(),
+            self.uncertainties.tolist(),
+        )
+        return [
+            {
+                "coord": tuple(coord),
+                "mapped": tuple(position),
+                "track_id": track_id,
+                "size": tuple(size),
+                "predicted": tuple(predicted),
+                "velocity": tuple(velocity),
+                "uncertainty": tuple(uncertainty),
+                "frame_seq": self.frame_seq,
+                "capture_time": self.capture_time,
+            }
+            for (
+                track_id,
+                coord,
+                position,
+                size,
+                predicted,
+                velocity,
+                uncertainty,
+            ) in rows
+        ]
@@ -1,10 +1,16 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
+from numpy.typing import NDArray
 from scipy.optimize import minimize
 
+from .geometry import PolygonSet, point_in_polygon
+
+if TYPE_CHECKING:
+    from .tracking_batch import TrackingBatch
+
 
 @dataclass
 class ProcessedTrackingResult:
@@ -26,6 +32,31 @@ class ProcessedTrackingResult:
     zones: List[int] = None
 
 
+@dataclass
+class ProcessedTrackingBatch:
+    """
+    Columnar tracking results of one frame after homography transformation
+
+    Attributes:
+        track_ids: (N,) tracking identifiers
+        original_coords: (N, 2) coordinates in image space
+        transformed_coords: (N, 2) coordinates after homography transform
+        predictions: (N, 2) predicted positions after homography transform
+        zones: (N, Z) bool, True where a point lies in a zone
+        prediction_zones: (N, Z) bool, True where a prediction lies in a zone
+    """
+
+    track_ids: NDArray
+    original_coords: NDArray
+    transformed_coords: NDArray
+    predictions: NDArray
+    zones: NDArray
+    prediction_zones: NDArray
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+
 class VisionProcessor:
     """
     Handles computer vision processing including homography, tracking, and zone detection.
@@ -36,8 +67,19 @@ class VisionProcessor:
     - Predicting future positions
     - Detecting zone intersections
 
+    Homography results are cached per calibration. The matrices and output
+    dimensions are only recomputed when the reference points or distances
+    change, and every recomputation bumps ``calibration_version`` so that
+    dependent caches can detect stale data.
+
+    Frames are warped with ``cv2.remap`` through fixed-point lookup tables
+    built once per calibration. If lens intrinsics are set, undistortion is
+    folded into the same tables, so a distorted camera frame is mapped onto
+    the floor plane in a single pass.
+
     Attributes:
         scale_factor (float): Scale factor for real-world coordinates (pixels per meter)
+        calibration_version (int): Incremented whenever the calibration changes
     """
 
     def __init__(self, scale_factor: float = 100):
@@ -54,6 +96,43 @@ class VisionProcessor:
         self._matrix = None
         self._inverse_matrix = None
         self._output_dimensions = None
+        self._calibration_key = None
+        self.calibration_version = 0
+        self._camera_matrix = None
+        self._dist_coeffs = None
+        self._warp_maps = None
+        self._warp_maps_version = None
+
+    def set_lens(
+        self, camera_matrix: Optional[NDArray], dist_coeffs: Optional[NDArray] = None
+    ) -> None:
+        """
+        Set the camera intrinsics used to undistort frames and points.
+
+        Reference points and tracked positions are given in distorted image
+        coordinates; they are undistorted before the homography is applied.
+        Changing the lens invalidates the calibration.
+
+        Args:
+            camera_matrix (Optional[NDArray]): 3x3 intrinsic matrix, or None
+                                               to disable undistortion
+            dist_coeffs (Optional[NDArray]): OpenCV distortion coefficients.
+                                             Defaults to None (no distortion).
+
+        Example:
+            >>> processor.set_lens(K, np.array([-0.3, 0.1, 0.0, 0.0, 0.0]))
+        """
+        if camera_matrix is None:
+            self._camera_matrix = None
+            self._dist_coeffs = None
+        else:
+            self._camera_matrix = np.asarray(camera_matrix, np.float64).reshape(3, 3)
+            self._dist_coeffs = (
+                None
+                if dist_coeffs is None
+                else np.asarray(dist_coeffs, np.float64).ravel()
+            )
+        self.invalidate_calibration()
 
     def calculate_homography(
         self, points: List["Point"], distances: Dict[str, float]
@@ -61,6 +140,9 @@ class VisionProcessor:
         """
         Compute homography matrix from point correspondences and real-world distances.
 
+        The result is cached: calling this again with the same point coordinates
+        and distances returns immediately without re-solving the geometry.
+
         Args:
             points (List[Point]): Four points defining the homography
             distances (Dict[str, float]): Real-world distances between points
@@ -75,7 +157,11 @@ class VisionProcessor:
             raise ValueError("Exactly 4 points required for homography calculation")
 
         sorted_points = sorted(points, key=lambda x: x.id)
-        src_points = np.float32([p.coord for p in sorted_points])
+        calibration_key = self._make_calibration_key(sorted_points, distances)
+        if calibration_key == self._calibration_key and self._matrix is not None:
+            return
+
+        src_points = self.undistort_points(np.float32([p.coord for p in sorted_points]))
         dst_points = self._calculate_real_points(sorted_points, distances)
 
         # Scale to reasonable pixel dimensions
@@ -92,6 +178,31 @@ class VisionProcessor:
             int(np.max(dst_points[:, 0]) - np.min(dst_points[:, 0])),
             int(np.max(dst_points[:, 1]) - np.min(dst_points[:, 1])),
         )
+        self._calibration_key = calibration_key
+        self.calibration_version += 1
+
+    def invalidate_calibration(self) -> None:
+        """
+        Drop the cached homography so the next calculation starts from scratch.
+
+        Example:
+            >>> processor.invalidate_calibration()
+            >>> processor.calculate_homography(new_points, new_distances)
+        """
+        self._matrix = None
+        self._inverse_matrix = None
+        self._output_dimensions = None
+        self._calibration_key = None
+        self.calibration_version += 1
+
+    def is_calibrated(self) -> bool:
+        """
+        Check whether a homography is currently available.
+
+        Returns:
+            bool: True if the homography matrix has been computed
+        """
+        return self._matrix is not None
 
     def process_tracking_result(
         self, track_data: Dict[str, Any], zones: List[List[Tuple[float, float]]]
@@ -115,27 +226,20 @@ class VisionProcessor:
         if self._matrix is None:
             raise ValueError("Homography matrix not computed")
 
-        # Transform coordinates
-        src_pts = np.float32([[track_data["mapped"][0], track_data["mapped"][1]]])
-        dst_pts = cv2.perspectiveTransform(src_pts.reshape(-1, 1, 2), self._matrix)
-        transformed = tuple(dst_pts[0][0])
-
-        # Process prediction if available
-        prediction = None
+        # Transform current and predicted coordinates in one call
+        points = [track_data["mapped"]]
         if "predicted" in track_data:
-            pred_pts = np.float32(
-                [[track_data["predicted"][0], track_data["predicted"][1]]]
-            )
-            pred_dst = cv2.perspectiveTransform(
-                pred_pts.reshape(-1, 1, 2), self._matrix
-            )
-            prediction = tuple(pred_dst[0][0])
+            points.append(track_data["predicted"])
+        transformed_points = self.transform_points(np.array(points))
+        transformed = tuple(transformed_points[0])
+        prediction = None
+        if len(transformed_points) > 1:
+            prediction = tuple(transformed_points[1])
 
         # Check zone intersections
-        active_zones = []
-        for i, zone in enumerate(zones):
-            if self._point_in_polygon(transformed, zone):
-                active_zones.append(i)
+        active_zones = np.flatnonzero(
+            PolygonSet(zones).contains(np.array([transformed]))[0]
+        ).tolist()
 
         return ProcessedTrackingResult(
             original_coord=track_data["mapped"],
@@ -145,6 +249,184 @@ class VisionProcessor:
             zones=active_zones,
         )
 
+    def process_tracking_batch(
+        self,
+        batch: "TrackingBatch",
+        zones: List[List[Tuple[float, float]]],
+        zone_lookup: Optional[Callable[[NDArray], NDArray]] = None,
+    ) -> ProcessedTrackingBatch:
+        """
+        Process all tracking results of a frame with homography and zone detection.
+
+        Current and predicted positions of every track go through a single
+        perspective transform, and zone membership is computed for the whole
+        batch at once.
+
+        Args:
+            batch (TrackingBatch): Tracking data of one frame
+            zones (List[List[Tuple[float, float]]]): List of polygon zones
+            zone_lookup (Optional[Callable[[NDArray], NDArray]]): Maps (M, 2)
+                warped points to (M, Z) zone membership, e.g.
+                ZoneManager.zones_at. Defaults to polygon tests on ``zones``.
+
+        Returns:
+            ProcessedTrackingBatch: Columnar processed tracking information
+
+        Raises:
+            ValueError: If homography matrix not computed
+
+        Example:
+            >>> result = processor.process_tracking_batch(batch, defined_zones)
+            >>> in_any_zone = result.zones.any(axis=1)
+        """
+        if self._matrix is None:
+            raise ValueError("Homography matrix not computed")
+
+        count = len(batch)
+        transformed = self.transform_points(
+            np.concatenate([batch.positions, batch.predicted])
+        )
+        current, predicted = transformed[:count], transformed[count:]
+
+        if zone_lookup is not None:
+            zone_hits = zone_lookup(transformed)
+        else:
+            zone_hits = PolygonSet(zones).contains(transformed)
+
+        return ProcessedTrackingBatch(
+            track_ids=batch.track_ids,
+            original_coords=batch.positions,
+            transformed_coords=current,
+            predictions=predicted,
+            zones=zone_hits[:count],
+            prediction_zones=zone_hits[count:],
+        )
+
+    def transform_points(self, points: NDArray, inverse: bool = False) -> NDArray:
+        """
+        Transform many points using homography matrix in one call.
+
+        Args:
+            points (NDArray): (N, 2) points to transform
+            inverse (bool): If True, use inverse transform. Defaults to False.
+
+        Returns:
+            NDArray: (N, 2) transformed points
+
+        Raises:
+            ValueError: If homography matrix not computed
+
+        Example:
+            >>> floor_positions = processor.transform_points(batch.positions)
+        """
+        if self._matrix is None:
+            raise ValueError("Homography matrix not computed")
+
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        if len(points) == 0:
+            return np.zeros((0, 2), np.float32)
+        if inverse:
+            points = cv2.perspectiveTransform(points, self._inverse_matrix)
+            return self.distort_points(points)
+        points = self.undistort_points(points).reshape(-1, 1, 2)
+        return cv2.perspectiveTransform(points, self._matrix).reshape(-1, 2)
+
+    def undistort_points(self, points: NDArray) -> NDArray:
+        """
+        Remove lens distortion from image points.
+
+        Args:
+            points (NDArray): (N, 2) points in the camera image
+
+        Returns:
+            NDArray: (N, 2) points in the undistorted image; unchanged if no
+                lens is set
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        if self._camera_matrix is None or len(points) == 0:
+            return points.reshape(-1, 2)
+        K = self._camera_matrix
+        return cv2.undistortPoints(points, K, self._dist_coeffs, P=K).reshape(-1, 2)
+
+    def distort_points(self, points: NDArray) -> NDArray:
+        """
+        Apply lens distortion to undistorted image points.
+
+        Args:
+            points (NDArray): (N, 2) points in the undistorted image
+
+        Returns:
+            NDArray: (N, 2) points in the camera image; unchanged if no lens
+                is set
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        if self._camera_matrix is None or len(points) == 0:
+            return points
+        K = self._camera_matrix
+        normalized = cv2.undistortPoints(points.reshape(-1, 1, 2), K, None)
+        rays = cv2.convertPointsToHomogeneous(normalized).astype(np.float64)
+        projected, _ = cv2.projectPoints(
+            rays, np.zeros(3), np.zeros(3), K, self._dist_coeffs
+        )
+        return projected.reshape(-1, 2).astype(np.float32)
+
+    def get_warp_maps(self) -> Optional[Tuple[NDArray, NDArray]]:
+        """
+        Get the fixed-point remap tables for the floor warp.
+
+        For every output pixel the tables hold the source pixel in the camera
+        image, i.e. the inverse homography followed by the lens distortion.
+        They are built with ``cv2.initUndistortRectifyMap`` (the homography
+        takes the place of the rectification) in the packed CV_16SC2 format
+        and cached until the calibration changes.
+
+        Returns:
+            Optional[Tuple[NDArray, NDArray]]: Integer coordinates and
+                interpolation table for ``cv2.remap``, or None if not calibrated
+        """
+        if self._matrix is None:
+            return None
+        if self._warp_maps_version != self.calibration_version:
+            if self._camera_matrix is None:
+                K = np.eye(3)
+                dist_coeffs = None
+            else:
+                K = self._camera_matrix
+                dist_coeffs = self._dist_coeffs
+            # initUndistortRectifyMap maps output pixel p to
+            # K * distort(R^-1 * p); with R = H * K this is the source pixel
+            # of the floor point p
+            self._warp_maps = cv2.initUndistortRectifyMap(
+                K,
+                dist_coeffs,
+                self._matrix @ K,
+                np.eye(3),
+                self._output_dimensions,
+                cv2.CV_16SC2,
+            )
+            self._warp_maps_version = self.calibration_version
+        return self._warp_maps
+
+    def warp(self, frame: NDArray) -> Optional[NDArray]:
+        """
+        Warp a camera frame onto the floor plane.
+
+        Args:
+            frame (NDArray): Camera frame
+
+        Returns:
+            Optional[NDArray]: Warped frame of ``get_output_dimensions()`` size,
+                or None if not calibrated
+
+        Example:
+            >>> processor.calculate_homography(points, distances)
+            >>> warped = processor.warp(frame)
+        """
+        maps = self.get_warp_maps()
+        if maps is None:
+            return None
+        return cv2.remap(frame, maps[0], maps[1], cv2.INTER_LINEAR)
+
     def transform_point(
         self, point: Tuple[float, float], inverse: bool = False
     ) -> Tuple[float, float]:
@@ -164,13 +446,7 @@ class VisionProcessor:
         Example:
             >>> real_world_pos = processor.transform_point((100, 200))
         """
-        if self._matrix is None:
-            raise ValueError("Homography matrix not computed")
-
-        matrix = self._inverse_matrix if inverse else self._matrix
-        pts = np.float32([[point[0], point[1]]])
-        transformed = cv2.perspectiveTransform(pts.reshape(-1, 1, 2), matrix)
-        return tuple(transformed[0][0])
+        return tuple(self.transform_points(np.array([point]), inverse)[0])
 
     def get_output_dimensions(self) -> Optional[Tuple[int, int]]:
         """
@@ -184,6 +460,25 @@ class VisionProcessor:
         """
         return self._output_dimensions
 
+    @staticmethod
+    def _make_calibration_key(
+        sorted_points: List["Point"], distances: Dict[str, float]
+    ) -> Tuple:
+        """
+        Build a hashable key identifying a calibration input.
+
+        Args:
+            sorted_points (List[Point]): Points ordered by id
+            distances (Dict[str, float]): Distance measurements
+
+        Returns:
+            Tuple: Key made of point ids/coordinates and distances
+        """
+        return (
+            tuple((p.id, float(p.coord[0]), float(p.coord[1])) for p in sorted_points),
+            tuple(sorted((k, float(v)) for k, v in distances.items())),
+        )
+
     def _calculate_real_points(
         self, sorted_points: List["Point"], distances: Dict[str, float]
     ) -> np.ndarray:
@@ -260,23 +555,7 @@ class VisionProcessor:
         Example:
             >>> inside = processor._point_in_polygon((10, 20), zone_vertices)
         """
-        x, y = point
-        n = len(polygon)
-        inside = False
-
-        p1x, p1y = polygon[0]
-        for i in range(n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-
-        return inside
+        return point_in_polygon(point, polygon)
 
 
 # Usage example
@@ -285,7 +564,7 @@ if __name__ == "__main__":
     processor = VisionProcessor(scale_factor=100)
 
     # Example points and distances
-    from point import Point
+    from .point import Point
 
     points = [
         Point((0, 0), 0),
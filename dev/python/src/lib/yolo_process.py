@@ -0,0 +1,219 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .inference_backend import InferenceBackend
+from .inference_scheduler import InferenceScheduler
+from .model_loader import load_backend, memory_usage, worker_context
+from .roi import ROI, crop_to_roi
+from .shared_frame_ring import SharedFrameRing, SharedResultTable
+
+# Forking a process that already runs camera and torch threads is unsafe, so
+# workers are forked from a clean fork server (or spawned where there is none).
+# See model_loader.share_with_workers() to preload the model there once.
+_context = worker_context()
+
+
+class YOLOProcess(_context.Process):
+    """
+    Process-based YOLO detection and tracking worker.
+
+    The worker reads the newest frame from a SharedFrameRing, runs the
+    inference backend on a zero-copy view of it and publishes the result to a
+    SharedResultTable. Running inference in its own interpreter keeps
+    inference from holding the GIL of the capture and API threads.
+    The inference region can be changed from the parent with set_roi().
+
+    Attributes:
+        ring_name (str): Shared memory name of the frame ring
+        frame_shape (Tuple[int, ...]): Frame shape of the ring
+        ring_slots (int): Number of ring slots
+        table_name (str): Shared memory name of the result table
+        max_detections (int): Capacity of the result table
+        model_path (str): Path to YOLO model weights
+        scheduler (Optional[InferenceScheduler]): Motion-gated detection scheduler
+        backend (str): Inference backend name, loaded in the worker unless the
+            fork server preloaded it (model_loader.share_with_workers())
+        threads (Optional[int]): CPU threads for inference
+        detect_interval (int): Minimum captured frames between detections
+
+    Example:
+        >>> lock = YOLOProcess.create_lock()
+        >>> ring = SharedFrameRing.create(frame.shape, slots=4, lock=lock)
+        >>> table = SharedResultTable.create(max_detections=100, lock=lock)
+        >>> worker = YOLOProcess(ring, table, lock, model_path="yolov8n.pt")
+        >>> worker.start()
+        >>> # Frames written to the ring are processed in the worker
+        >>> worker.stop()
+        >>> worker.join()
+    """
+
+    def __init__(
+        self,
+        ring: SharedFrameRing,
+        table: SharedResultTable,
+        lock: Any,
+        model_path: str = "yolov8n.pt",
+        scheduler: Optional[InferenceScheduler] = None,
+        backend: str = "pytorch",
+        threads: Optional[int] = None,
+        detect_interval: int = 1,
+    ):
+        """
+        Initialize the worker from the shared buffers it should attach to.
+
+        Args:
+            ring (SharedFrameRing): Frame ring created by the capture side
+            table (SharedResultTable): Result table created by the capture side
+            lock (Any): Lock shared by ring and table (see create_lock())
+            model_path (str, optional): Path to YOLO model weights.
+                                        Defaults to 'yolov8n.pt'.
+            scheduler (Optional[InferenceScheduler], optional): Detection
+                scheduler; detection runs on every frame if None.
+            backend (str, optional): Inference backend, 'pytorch', 'onnx' or
+                                     'openvino'. Defaults to 'pytorch'.
+            threads (Optional[int], optional): CPU threads for inference.
+                                               Defaults to the runtime's choice.
+            detect_interval (int, optional): Run detection at most every N
+                                             captured frames. Defaults to 1.
+        """
+        super().__init__(daemon=True)
+        self.ring_name = ring.name
+        self.frame_shape: Tuple[int, ...] = ring.shape
+        self.ring_slots = ring.slots
+        self.table_name = table.name
+        self.max_detections = table.max_detections
+        self.model_path = model_path
+        self.scheduler = scheduler
+        self.backend = backend
+        self.threads = threads
+        self.detect_interval = detect_interval
+        self._last_detect_seq = -detect_interval
+        self._lock = lock
+        self._stop_event = _context.Event()
+        self._active_tracks = 0
+        # Shared (enabled, x0, y0, x1, y1) so the parent can move the region
+        self._roi = _context.Array("i", 5)
+
+    @staticmethod
+    def create_lock() -> Any:
+        """Create a lock usable by both the capture side and the worker."""
+        return _context.Lock()
+
+    def set_roi(self, roi: Optional[ROI]) -> None:
+        """
+        Restrict inference to a region of the frame.
+
+        Can be called from the parent process at any time; boxes are still
+        reported in full-frame coordinates.
+
+        Args:
+            roi (Optional[ROI]): Region (x0, y0, x1, y1), None for the full frame
+        """
+        with self._roi.get_lock():
+            if roi is None:
+                self._roi[0] = 0
+            else:
+                self._roi[:] = [1, *roi]
+
+    def get_roi(self) -> Optional[ROI]:
+        """Return the current inference region, None for the full frame."""
+        with self._roi.get_lock():
+            enabled, x0, y0, x1, y1 = self._roi[:]
+        return (x0, y0, x1, y1) if enabled else None
+
+    def run(self) -> None:
+        """
+        Worker loop: attach to shared memory, load the model and track frames.
+
+        Runs in the child process.
+        """
+        ring = SharedFrameRing.attach(
+            self.ring_name, self.frame_shape, self.ring_slots, self._lock
+        )
+        table = SharedResultTable.attach(
+            self.table_name, self.max_detections, self._lock
+        )
+        backend = load_backend(self.backend, self.model_path, self.threads)
+
+        last_seq = 0
+        try:
+            while not self._stop_event.is_set():
+                seq = self._track_latest(ring, table, backend, last_seq)
+                if seq is None:
+                    time.sleep(0.001)  # Prevent process from hogging CPU
+                else:
+                    last_seq = seq
+        finally:
+            ring.close()
+            table.close()
+
+    def _track_latest(
+        self,
+        ring: SharedFrameRing,
+        table: SharedResultTable,
+        backend: InferenceBackend,
+        last_seq: int,
+    ) -> Optional[int]:
+        """
+        Track the newest frame in the ring and publish the result.
+
+        Frames within the detection interval or rejected by the scheduler
+        are consumed without inference.
+
+        Args:
+            ring (SharedFrameRing): Attached frame ring
+            table (SharedResultTable): Attached result table
+            backend (InferenceBackend): Inference backend
+            last_seq (int): Sequence number of the last processed frame
+
+        Returns:
+            Optional[int]: Sequence number of the consumed frame, None if no
+                new frame was available
+        """
+        frame = ring.acquire_latest(last_seq)
+        if frame is None:
+            return None
+        if frame.seq - self._last_detect_seq < self.detect_interval:
+            ring.release(frame)
+            return frame.seq
+
+        image, offset = crop_to_roi(frame.image, self.get_roi())
+        if self.scheduler is not None and not self.scheduler.should_run(
+            image, self._active_tracks
+        ):
+            ring.release(frame)
+            return frame.seq
+
+        self._last_detect_seq = frame.seq
+        try:
+            detections = backend.track(image, frame.seq, frame.capture_time, offset)
+        finally:
+            ring.release(frame)
+
+        self._active_tracks = len(detections)
+        table.write(detections)
+        return frame.seq
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Resident memory of the worker (see model_loader.memory_usage()).
+
+        With a preloaded model ``shared`` holds the inherited weights and
+        ``pss`` charges this worker only its share of them.
+
+        Returns:
+            Dict[str, int]: Memory in bytes, empty if the worker is not running
+        """
+        if self.pid is None or not self.is_alive():
+            return {}
+        return memory_usage(self.pid)
+
+    def stop(self) -> None:
+        """
+        Ask the worker to exit after its current frame.
+
+        Example:
+            >>> worker.stop()
+            >>> worker.join()
+        """
+        self._stop_event.set()
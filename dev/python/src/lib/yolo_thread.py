@@ -1,9 +1,11 @@
 import threading
 import time
+from typing import Optional
 
-from ultralytics import YOLO
-
-from .frame_buffer import FrameBuffer
+from .frame_buffer import FrameBuffer, FramePacket
+from .inference_backend import InferenceBackend, create_backend
+from .inference_scheduler import InferenceScheduler
+from .roi import ROI, crop_to_roi
 
 
 class YOLOThread(threading.Thread):
@@ -12,12 +14,18 @@ class YOLOThread(threading.Thread):
 
     This class manages a separate thread for running YOLO object detection
     and tracking on frames from a FrameBuffer. It is designed to run
-    continuously while minimizing CPU usage.
+    continuously while minimizing CPU usage. An optional InferenceScheduler
+    skips detection on static scenes, and an optional region of interest
+    restricts inference to a crop of the frame.
 
     Attributes:
         frame_buffer (FrameBuffer): Buffer containing frames to process
         running (bool): Thread control flag
-        model (YOLO): YOLO model instance for detection/tracking
+        backend (InferenceBackend): Detection and tracking backend
+        scheduler (Optional[InferenceScheduler]): Motion-gated detection scheduler
+        detect_interval (int): Minimum captured frames between detections
+        roi (Optional[ROI]): Inference region (x0, y0, x1, y1), None for the
+            full frame
 
     Example:
         >>> buffer = FrameBuffer()
@@ -28,7 +36,15 @@ class YOLOThread(threading.Thread):
         >>> yolo_thread.join()
     """
 
-    def __init__(self, frame_buffer: FrameBuffer, model_path: str = "yolov8n.pt"):
+    def __init__(
+        self,
+        frame_buffer: FrameBuffer,
+        model_path: str = "yolov8n.pt",
+        scheduler: Optional[InferenceScheduler] = None,
+        backend: str = "pytorch",
+        threads: Optional[int] = None,
+        detect_interval: int = 1,
+    ):
         """
         Initialize YOLO detection thread.
 
@@ -36,22 +52,50 @@ class YOLOThread(threading.Thread):
             frame_buffer (FrameBuffer): Buffer to get frames from
             model_path (str, optional): Path to YOLO model weights.
                                       Defaults to 'yolov8n.pt'.
+            scheduler (Optional[InferenceScheduler], optional): Detection
+                scheduler; detection runs on every frame if None.
+            backend (str, optional): Inference backend, 'pytorch', 'onnx' or
+                                     'openvino'. Defaults to 'pytorch'.
+            threads (Optional[int], optional): CPU threads for inference.
+                                               Defaults to the runtime's choice.
+            detect_interval (int, optional): Run detection at most every N
+                                             captured frames. Defaults to 1.
 
         Example:
             >>> buffer = FrameBuffer()
-            >>> thread = YOLOThread(buffer, model_path='yolov8s.pt')
+            >>> thread = YOLOThread(buffer, model_path='yolov8s.pt', backend='onnx')
         """
         super().__init__()
         self.frame_buffer = frame_buffer
         self.running = True
-        self.model = YOLO(model_path, verbose=False)
+        self.backend: InferenceBackend = create_backend(backend, model_path, threads)
+        self.scheduler = scheduler
+        self.roi: Optional[ROI] = None
+        self.detect_interval = detect_interval
+        self._last_detect_seq = -detect_interval
+
+    def set_roi(self, roi: Optional[ROI]) -> None:
+        """
+        Restrict inference to a region of the frame.
+
+        Boxes are still reported in full-frame coordinates.
+
+        Args:
+            roi (Optional[ROI]): Region (x0, y0, x1, y1), None for the full frame
+
+        Example:
+            >>> thread.set_roi((100, 50, 540, 430))
+        """
+        self.roi = roi
 
     def run(self) -> None:
         """
         Main thread execution loop.
 
         Continuously processes frames from the frame buffer using YOLO
-        detection and tracking. Results are stored back in the frame buffer.
+        detection and tracking. Results are stored back in the frame buffer
+        as Detections tagged with the source frame's sequence number and
+        capture time.
 
         The thread will sleep briefly between iterations to prevent
         excessive CPU usage.
@@ -60,18 +104,34 @@ class YOLOThread(threading.Thread):
             >>> thread.start()  # Starts the run loop
         """
         while self.running:
-            frame = self.frame_buffer.get_frame()
-            if frame is not None:
-                # Run detection and tracking on people only (class 0)
-                results = self.model.track(
-                    frame,
-                    persist=True,  # Enable tracking
-                    classes=[0],  # Track people only
-                    verbose=False,  # Suppress progress output
-                )
-                self.frame_buffer.put_result(results)
+            packet = self.frame_buffer.get_frame_packet()
+            if packet is not None:
+                try:
+                    self._detect(packet)
+                finally:
+                    packet.release()
             time.sleep(0.001)  # Prevent thread from hogging CPU
 
+    def _detect(self, packet: FramePacket) -> None:
+        """Track people on a held frame if it is due for detection."""
+        if packet.seq - self._last_detect_seq < self.detect_interval:
+            return
+        image, offset = crop_to_roi(packet.frame, self.roi)
+        if self._should_run(image):
+            self._last_detect_seq = packet.seq
+            self.frame_buffer.put_result(
+                self.backend.track(image, packet.seq, packet.capture_time, offset),
+                packet,
+            )
+
+    def _should_run(self, frame) -> bool:
+        """Ask the scheduler whether to run detection on this frame."""
+        if self.scheduler is None:
+            return True
+        latest = self.frame_buffer.get_result()
+        active_tracks = len(latest) if latest is not None else 0
+        return self.scheduler.should_run(frame, active_tracks)
+
     def stop(self) -> None:
         """
         Stop the detection thread gracefully.
@@ -101,10 +161,7 @@ if __name__ == "__main__":
             results = buffer.get_result()
             if results is not None:
                 # Process detection results
-                boxes = results[0].boxes.xywh.cpu()
-                track_ids = results[0].boxes.id.int().cpu().tolist()
-
-                for box, track_id in zip(boxes, track_ids):
+                for box, track_id in zip(results.boxes, results.track_ids):
                     print(f"Detected person {track_id} at position {box[:2]}")
 
             time.sleep(0.1)  # Simulate frame rate
@@ -1,6 +1,12 @@
 import json
 from typing import List, Optional, Tuple
 
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from .geometry import PolygonSet, point_in_polygon
+
 
 class ZoneManager:
     """
@@ -9,10 +15,18 @@ class ZoneManager:
     This class handles the creation, storage, and querying of polygon zones,
     with support for point-in-polygon testing and zone persistence.
 
+    For fast membership queries the zones can be rasterized once into a
+    label mask in the warped output dimensions (``update_label_mask``). Each
+    pixel holds one bit per zone, packed into bytes so overlapping zones are
+    supported, and ``zones_at`` answers membership for any number of points
+    with a single array lookup. The mask is rebuilt only when the zones, the
+    output dimensions or the calibration version change.
+
     Attributes:
         zones (List[List[Tuple[float, float]]]): List of polygon zones
         current_polygon (List[Tuple[float, float]]): Points of polygon being drawn
         zones_file (str): Path to JSON file for zone persistence
+        version (int): Incremented whenever the zones change
 
     Example:
         >>> manager = ZoneManager(zones_file='zones.json')
@@ -33,6 +47,11 @@ class ZoneManager:
         self.zones: List[List[Tuple[float, float]]] = []
         self.current_polygon: List[Tuple[float, float]] = []
         self.zones_file = zones_file
+        self.version = 0
+        self._label_mask: Optional[NDArray] = None
+        self._label_mask_key = None
+        self._polygon_set: Optional[PolygonSet] = None
+        self._polygon_set_version = -1
         self.load_zones()
 
     def load_zones(self) -> None:
@@ -55,6 +74,7 @@ class ZoneManager:
         except Exception as e:
             print(f"Error loading zones: {e}")
             self.zones = []
+        self.version += 1
 
     def save_zones(self) -> None:
         """
@@ -117,6 +137,7 @@ class ZoneManager:
             self.current_polygon.append(self.current_polygon[0])
             # Add to zones
             self.zones.append(self.current_polygon.copy())
+            self.version += 1
             # Clear current
             self.current_polygon = []
             # Save
@@ -128,6 +149,7 @@ class ZoneManager:
         self.zones = []
         zones.append(zones[0])
         self.zones.append(zones)
+        self.version += 1
         self.save_zones()
 
     def delete_zone(self, index: int) -> bool:
@@ -147,6 +169,7 @@ class ZoneManager:
         """
         if 0 <= index < len(self.zones):
             del self.zones[index]
+            self.version += 1
             self.save_zones()
             return True
         return False
@@ -169,28 +192,31 @@ class ZoneManager:
             >>> manager.point_in_polygon((50, 50), polygon)
             True
         """
-        x, y = point
-        n = len(polygon)
-        inside = False
-
-        p1x, p1y = polygon[0]
-        for i in range(n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-
-        return inside
+        return point_in_polygon(point, polygon)
+
+    def get_polygon_set(self) -> PolygonSet:
+        """
+        Get the zones packed for vectorized point-in-zone tests.
+
+        The packed set is rebuilt only when the zones changed.
+
+        Returns:
+            PolygonSet: Packed zones
+
+        Example:
+            >>> hits = manager.get_polygon_set().contains(points)
+        """
+        if self._polygon_set is None or self._polygon_set_version != self.version:
+            self._polygon_set = PolygonSet(self.zones)
+            self._polygon_set_version = self.version
+        return self._polygon_set
 
     def check_point_in_zones(self, point: Tuple[float, float]) -> List[int]:
         """
         Check which zones contain the given point.
 
+        Uses the label mask when it is up to date, polygon tests otherwise.
+
         Args:
             point (Tuple[float, float]): Point to test (x, y)
 
@@ -200,11 +226,81 @@ class ZoneManager:
         Example:
             >>> zones_containing_point = manager.check_point_in_zones((150, 150))
         """
-        return [
-            i
-            for i, zone in enumerate(self.zones)
-            if self.point_in_polygon(point, zone[:-1])
-        ]  # [:-1] to exclude closing point
+        return np.flatnonzero(self.zones_at(np.array([point]))[0]).tolist()
+
+    def update_label_mask(
+        self, dimensions: Tuple[int, int], calibration_version: int = 0
+    ) -> NDArray:
+        """
+        Rasterize the zones into a bit-packed label mask if anything changed.
+
+        Args:
+            dimensions (Tuple[int, int]): Warped output (width, height)
+            calibration_version (int, optional): Calibration version the
+                dimensions belong to. Defaults to 0.
+
+        Returns:
+            NDArray: (height, width, ceil(zones / 8)) uint8 mask; bit i % 8 of
+                byte i // 8 is set where zone i covers the pixel
+
+        Example:
+            >>> manager.update_label_mask(processor.get_output_dimensions(),
+            ...                           processor.calibration_version)
+            >>> hits = manager.zones_at(points)
+        """
+        key = (self.version, tuple(dimensions), calibration_version)
+        if key == self._label_mask_key and self._label_mask is not None:
+            return self._label_mask
+
+        width, height = dimensions
+        mask = np.zeros((height, width, max(1, -(-len(self.zones) // 8))), np.uint8)
+        layer = np.zeros((height, width), np.uint8)
+        for i, zone in enumerate(self.zones):
+            layer[:] = 0
+            cv2.fillPoly(layer, [np.asarray(zone, dtype=np.int32)], 1 << (i % 8))
+            mask[:, :, i // 8] |= layer
+
+        self._label_mask = mask
+        self._label_mask_key = key
+        return mask
+
+    def zones_at(self, points: NDArray) -> NDArray:
+        """
+        Look up zone membership of many points in the label mask.
+
+        Falls back to vectorized polygon tests if the mask is not up to date.
+        Points outside the mask are in no zone.
+
+        Args:
+            points (NDArray): (M, 2) points in warped coordinates
+
+        Returns:
+            NDArray: (M, Z) bool, True where point m lies in zone z
+
+        Example:
+            >>> in_any_zone = manager.zones_at(positions).any(axis=1)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        zone_count = len(self.zones)
+        mask = self._label_mask
+        if mask is None or self._label_mask_key[0] != self.version:
+            return self.get_polygon_set().contains(points)
+
+        height, width = mask.shape[:2]
+        # NaN coordinates fail both comparisons and are treated as outside
+        inside = (
+            (points[:, 0] >= 0)
+            & (points[:, 0] < width)
+            & (points[:, 1] >= 0)
+            & (points[:, 1] < height)
+        )
+        hits = np.zeros((len(points), zone_count), dtype=bool)
+        if inside.any():
+            xs = points[inside, 0].astype(np.intp)
+            ys = points[inside, 1].astype(np.intp)
+            bits = np.unpackbits(mask[ys, xs], axis=1, bitorder="little")
+            hits[inside] = bits[:, :zone_count].astype(bool)
+        return hits
 
     def get_zone_points(self, index: int) -> Optional[List[Tuple[float, float]]]:
         """
@@ -0,0 +1,134 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from .zone_manager import ZoneManager
+
+
+class ZoneOverlay:
+    """
+    Pre-rendered zone layer composited onto frames with one blend.
+
+    Zones are rasterized once into a color layer and an anti-aliased alpha
+    mask for a given output size. Every frame copies the cached colors of
+    opaque pixels and blends only the anti-aliased edge pixels, inside the
+    zones' bounding box. The cache is keyed by the ZoneManager
+    version and the frame size, so it is rebuilt only when zones change.
+
+    Attributes:
+        fill_color (Tuple[int, int, int]): BGR zone fill color
+        line_color (Tuple[int, int, int]): BGR zone outline color
+        line_thickness (int): Outline thickness in pixels
+        fill_alpha (float): Opacity of the fill (1.0 = opaque)
+
+    Example:
+        >>> overlay = ZoneOverlay()
+        >>> overlay.apply(warped, zone_manager)
+    """
+
+    def __init__(
+        self,
+        fill_color: Tuple[int, int, int] = (50, 50, 150),
+        line_color: Tuple[int, int, int] = (100, 100, 200),
+        line_thickness: int = 2,
+        fill_alpha: float = 1.0,
+    ):
+        """
+        Initialize overlay style.
+
+        Args:
+            fill_color (Tuple[int, int, int], optional): Fill color.
+                                                         Defaults to (50, 50, 150).
+            line_color (Tuple[int, int, int], optional): Outline color.
+                                                         Defaults to (100, 100, 200).
+            line_thickness (int, optional): Outline thickness. Defaults to 2.
+            fill_alpha (float, optional): Fill opacity. Defaults to 1.0.
+        """
+        self.fill_color = fill_color
+        self.line_color = line_color
+        self.line_thickness = line_thickness
+        self.fill_alpha = fill_alpha
+
+        self._key = None
+        self._region: Optional[Tuple[slice, slice]] = None
+        self._color: Optional[NDArray] = None
+        self._opaque: Optional[NDArray] = None
+        self._edge_pixels: Optional[Tuple[NDArray, NDArray]] = None
+        self._edge_color: Optional[NDArray] = None
+        self._edge_alpha: Optional[NDArray] = None
+
+    def _render(self, zone_manager: ZoneManager, size: Tuple[int, int]) -> None:
+        """Rasterize the zones for frames of the given (height, width)."""
+        height, width = size
+        color = np.zeros((height, width, 3), np.uint8)
+        fill_mask = np.zeros((height, width), np.uint8)
+        line_mask = np.zeros((height, width), np.uint8)
+        polygons = [np.asarray(zone, dtype=np.int32) for zone in zone_manager.zones]
+
+        for polygon in polygons:
+            # Solid colors, drawn slightly wider than the anti-aliased masks;
+            # smooth edges come from the masks
+            cv2.fillPoly(color, [polygon], self.fill_color)
+            cv2.polylines(
+                color, [polygon], True, self.line_color, self.line_thickness + 2
+            )
+            cv2.fillPoly(fill_mask, [polygon], 255, lineType=cv2.LINE_AA)
+            cv2.polylines(
+                line_mask,
+                [polygon],
+                True,
+                255,
+                self.line_thickness,
+                lineType=cv2.LINE_AA,
+            )
+
+        alpha = np.maximum(
+            fill_mask.astype(np.float32) * self.fill_alpha, line_mask.astype(np.float32)
+        )
+        rows = np.flatnonzero(alpha.any(axis=1))
+        cols = np.flatnonzero(alpha.any(axis=0))
+        if len(rows) == 0:
+            self._region = None
+            return
+        region = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        alpha = alpha[region] / 255.0
+        color = color[region]
+
+        # Most covered pixels are opaque and are simply copied; only the
+        # anti-aliased edge pixels need an actual blend
+        edges = (alpha > 0) & (alpha < 1)
+        self._region = region
+        self._color = color
+        self._opaque = (alpha >= 1).astype(np.uint8)
+        self._edge_pixels = np.nonzero(edges)
+        self._edge_color = color[edges].astype(np.float32)
+        self._edge_alpha = alpha[edges][:, None].astype(np.float32)
+
+    def apply(self, frame: NDArray, zone_manager: ZoneManager) -> NDArray:
+        """
+        Blend the zones onto a frame in place.
+
+        Args:
+            frame (NDArray): BGR frame (modified in place)
+            zone_manager (ZoneManager): Zones to draw
+
+        Returns:
+            NDArray: The same frame, for chaining
+        """
+        size = frame.shape[:2]
+        key = (zone_manager.version, size)
+        if key != self._key:
+            self._render(zone_manager, size)
+            self._key = key
+
+        if self._region is None:
+            return frame
+
+        target = frame[self._region]
+        cv2.copyTo(self._color, self._opaque, target)
+        ys, xs = self._edge_pixels
+        background = target[ys, xs].astype(np.float32)
+        target[ys, xs] = background + (self._edge_color - background) * self._edge_alpha
+        return frame
@@ -1,5 +1,8 @@
+from typing import Optional
+
 from fastapi import APIRouter
-from utils.setup import main_app
+from fastapi.concurrency import run_in_threadpool
+from utils.setup import camera_manager, cameras_file, get_main_app
 from utils.types import Pin, PinAndDistance
 
 router = APIRouter(
@@ -14,27 +17,59 @@ async def read_test():
     return {"message": "here is frame!"}
 
 
+# カメラ一覧とパイプラインごとのリソース使用状況
+@router.get("/cameras")
+async def get_cameras():
+    return camera_manager.stats()
+
+
+# cameras.json を読み直し、カメラの追加・削除・再起動を反映する
+@router.post("/cameras")
+async def reload_cameras():
+    await run_in_threadpool(camera_manager.load, cameras_file)
+    return {"cameras": camera_manager.camera_ids}
+
+
+# camera_id のないルートは既定のカメラ (0) を使う
 @router.post("/get_frame")
-async def get_frame():
-    frame_base64 = main_app.get_frame()
+@router.post("/{camera_id}/get_frame")
+async def get_frame(camera_id: Optional[str] = None):
+    main_app = get_main_app(camera_id)
+    frame_base64 = await main_app.render_executor.run(main_app.get_frame)
     return {"frame_base64": frame_base64}
 
 
 @router.get("/get_wrap")
-async def get_wrap():
-    wrap_base64, height, width = main_app.get_wrap_code()
+@router.get("/{camera_id}/get_wrap")
+async def get_wrap(camera_id: Optional[str] = None):
+    main_app = get_main_app(camera_id)
+    wrap_base64, height, width = await main_app.render_executor.run(
+        main_app.get_wrap_code
+    )
     return {"wrap_base64": wrap_base64, "height": height, "width": width}
 
 
 @router.post("/floor_setting")
-async def floor_setting(data: PinAndDistance):
+@router.post("/{camera_id}/floor_setting")
+async def floor_setting(data: PinAndDistance, camera_id: Optional[str] = None):
     print(data)
-    warped_base64 = main_app.set_floor(data)
+    main_app = get_main_app(camera_id)
+    warped_base64 = await main_app.render_executor.run(main_app.set_floor, data)
     return {"warped_base64": warped_base64}
 
 
 @router.post("/zone_setting")
-async def zone_setting(data: Pin):
+@router.post("/{camera_id}/zone_setting")
+async def zone_setting(data: Pin, camera_id: Optional[str] = None):
     print(data)
-    warped_with_zone = main_app.set_zone(data)
+    main_app = get_main_app(camera_id)
+    warped_with_zone = await main_app.render_executor.run(main_app.set_zone, data)
     return {"warped_with_zone": warped_with_zone}
+
+
+# キャリブレーションとゾーンのファイルを読み直す (カメラは止めない)
+@router.post("/{camera_id}/reload")
+async def reload_camera(camera_id: str):
+    main_app = get_main_app(camera_id)
+    await main_app.render_executor.run(main_app.reload_data)
+    return {"camera_id": camera_id}
@@ -3,53 +3,184 @@ import json
 import os
 import time
 from contextlib import asynccontextmanager
-from typing import Tuple
+from typing import Optional, Tuple
 
 import cv2
 import numpy as np
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from lib.camera_capture import is_device_source
+from lib.camera_manager import CameraConfig, CameraManager, thread_cpu_time
 from lib.camera_thread import CameraThread
+from lib.frame_codec import JpegCache, RenderedFrame, encode_jpeg
+from lib.inference_scheduler import InferenceScheduler, MotionDetector
+from lib.inference_server import InferenceServer
+from lib.model_loader import share_with_workers
 from lib.point import Point
+from lib.render_executor import RenderExecutor
+from lib.tracking_batch import TrackingBatch
 from lib.vision_processor import VisionProcessor
 from lib.zone_manager import ZoneManager
+from lib.zone_overlay import ZoneOverlay
 from numpy.typing import NDArray
 
 from .types import Pin, PinAndDistance
 
 
+def encode_base64_jpeg(image: NDArray, quality: int = 95) -> str:
+    """画像を1回だけJPEGエンコードし、Base64文字列に変換する"""
+    return base64.b64encode(encode_jpeg(image, quality=quality)).decode("utf-8")
+
+
+# INFERENCE_MODE=server の場合、全カメラの推論を1つのモデルでまとめてバッチ実行する
+inference_server = None
+if os.getenv("INFERENCE_MODE", "thread") == "server":
+    inference_server = InferenceServer(
+        backend=os.getenv("INFERENCE_BACKEND", "pytorch"),
+        threads=int(os.getenv("INFERENCE_THREADS", "0")) or None,
+    )
+    inference_server.start()
+
+# INFERENCE_MODE=process の場合、カメラごとの推論プロセスは fork サーバーで1回だけ
+# 読み込んだモデルを共有する (重みはコピーオンライトで共有される)
+inference_process = os.getenv("INFERENCE_MODE", "thread") == "process"
+if inference_process:
+    share_with_workers(
+        backend=os.getenv("INFERENCE_BACKEND", "pytorch"),
+        threads=int(os.getenv("INFERENCE_THREADS", "0")) or None,
+    )
+
+
 class MainApplication:
-    def __init__(self) -> None:
+    def __init__(
+        self, camera_id: str = "0", source=0, data_dir: str = ".", **camera_options
+    ) -> None:
+        self.camera_id = camera_id
+        self.source = source
+        # キャリブレーションとゾーンのファイルはカメラごとに分ける
+        os.makedirs(data_dir, exist_ok=True)
+        self.json_path = os.path.join(data_dir, "homography_data.json")
+
         self.vision_processor = VisionProcessor(scale_factor=100)
+        # カメラごとの設定 (cameras.json の options) がなければ環境変数の値を使う
+        motion_gating = camera_options.pop(
+            "motion_gating", os.getenv("MOTION_GATING", "1") == "1"
+        )
+        idle_rate = camera_options.pop("idle_rate", 1.0)
+        low_latency = camera_options.pop(
+            "low_latency", os.getenv("CAMERA_LOW_LATENCY", "0") == "1"
+        )
+        options = dict(
+            # 動きがない間は検出を idle_rate (既定 1fps) まで落とす
+            scheduler=(
+                InferenceScheduler(MotionDetector(), idle_rate=idle_rate)
+                if motion_gating
+                else None
+            ),
+            # 推論バックエンドは環境変数で切り替える (pytorch / onnx / openvino)
+            backend=os.getenv("INFERENCE_BACKEND", "pytorch"),
+            backend_threads=int(os.getenv("INFERENCE_THREADS", "0")) or None,
+            # ディスプレイのないサーバーではウィンドウを出さずに動かす
+            headless=os.getenv("CAMERA_HEADLESS", "0") == "1",
+            # ドライバに溜まった古いフレームを捨てて最新フレームだけを処理する
+            # (カメラデバイスのみ。動画ファイルやストリームではフレームを落とさない)
+            low_latency=low_latency and is_device_source(source),
+        )
+        if inference_server is not None:
+            options.update(inference_mode="server", inference_server=inference_server)
+        elif inference_process:
+            options.update(inference_mode="process")
+        options.update(camera_options)
         self.camera_thread = CameraThread(
             frame_callback=self.update_frame,
-            mapping_callback=self.handle_mapped_point,
-            camera_id=0,
+            batch_callback=self.handle_tracking_batch,
+            calibration_callback=self.handle_points_changed,
+            camera_id=source,
+            save_file=self.json_path,
+            **options,
+        )
+        self.zone_manager = ZoneManager(os.path.join(data_dir, "zones.json"))
+        self.zone_overlay = ZoneOverlay()
+        # 描画・エンコード処理はイベントループ外のカメラ専用スレッドで実行する
+        self.render_executor = RenderExecutor(
+            max_workers=1, thread_name_prefix=f"render-{camera_id}"
         )
-        self.zone_manager = ZoneManager()
         self.camera_thread.daemon = True
         self.camera_thread.start()
 
         self.points = []
         self.distances = {}
+        self.lens = {}
 
-        self.mapped_points = []
-
-        self.json_path = "homography_data.json"
+        self.tracking_batch = TrackingBatch()
+        self.last_frame_packet = None
+        # 同じフレームへのスナップショット要求はエンコード済みJPEGを使い回す
+        self.jpeg_cache = JpegCache()
 
         self.load_data()
 
+    @classmethod
+    def from_config(cls, config: CameraConfig) -> "MainApplication":
+        """CameraManager用: 設定からパイプラインを作成して起動する"""
+        return cls(
+            camera_id=config.camera_id,
+            source=config.source,
+            data_dir=config.resolve_data_dir(),
+            **config.options,
+        )
+
     def update_frame(self, frame, results):
         pass
 
     def stop(self) -> None:
+        self.render_executor.shutdown(wait=False)
         self.camera_thread.stop()
         self.camera_thread.join()
 
+    def reload_data(self) -> None:
+        """キャリブレーションとゾーンをファイルから読み直す（カメラは止めない）"""
+        self.lens = {}
+        self.vision_processor.set_lens(None)
+        self.load_data()
+        self.camera_thread.points = self.points
+        self.vision_processor.invalidate_calibration()
+        self.zone_manager.load_zones()
+
+    def stats(self) -> dict:
+        """このパイプラインのリソース使用状況"""
+        thread = self.camera_thread
+        capture = thread.capture
+        yolo_thread = thread.yolo_thread
+        yolo_process = thread.yolo_process
+        return {
+            "camera_id": self.camera_id,
+            "source": self.source,
+            "running": thread.is_alive(),
+            "fps": thread.fps,
+            "capture_age": capture.capture_age,
+            "drained_frames": capture.drained_frames,
+            "reconnects": capture.reconnects,
+            "result_latency": thread.frame_buffer.result_latency,
+            "tracks": len(thread.frame_buffer.track_store),
+            "frame_buffers": len(thread.frame_pool),
+            "frame_buffer_bytes": thread.frame_pool.nbytes,
+            "camera_cpu_time": thread_cpu_time(thread.native_id),
+            "inference_cpu_time": (
+                thread_cpu_time(yolo_thread.native_id)
+                if yolo_thread is not None
+                else None
+            ),
+            "inference_pid": yolo_process.pid if yolo_process is not None else None,
+            "inference_memory": (
+                yolo_process.memory_usage() if yolo_process is not None else None
+            ),
+        }
+
     def save(self, points, distances):
         data = {
             "points": [point.to_dict() for point in points],
             "distances": distances,
         }
+        data.update(self.lens)
         with open(self.json_path, "w") as f:
             json.dump(data, f)
 
@@ -64,34 +195,61 @@ class MainApplication:
                         for point_data in data.get("points", [])
                     ]
                     self.distances = data.get("distances", {})
+                    # レンズ歪み補正用のカメラパラメータ（任意）
+                    if "camera_matrix" in data:
+                        self.lens = {
+                            "camera_matrix": data["camera_matrix"],
+                            "dist_coeffs": data.get("dist_coeffs"),
+                        }
+                        self.vision_processor.set_lens(
+                            np.array(data["camera_matrix"]),
+                            data.get("dist_coeffs"),
+                        )
             except Exception as e:
                 print(f"Error loading data: {e}")
 
+    def render_frame(self) -> Optional[RenderedFrame]:
+        """Warp the latest frame and draw zones and tracked points on it"""
+        warped = self.get_waped()
+        if warped is None:
+            return None
+        packet = self.last_frame_packet
+        batch = self.tracking_batch
+
+        warped_with_zone = self._draw_zones(warped)
+        warped_with_zone, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id = (
+            self._draw_tracked_points(warped_with_zone, batch)
+        )
+
+        return RenderedFrame(
+            image=warped_with_zone,
+            seq=packet.seq,
+            capture_time=packet.capture_time,
+            render_time=time.time(),
+            is_hit=is_hit,
+            is_hit_id=is_hit_id,
+            is_pred_hit=is_pred_hit,
+            is_pred_hit_id=is_pred_hit_id,
+            track_ids=batch.track_ids.tolist(),
+        )
+
     def next(self):
         is_hit = False
         is_hit_id = None
         is_pred_hit = False
         is_pred_hit_id = None
         try:
-            warped = self.get_waped()
-            if warped is not None:
-                warped_with_zone = self._draw_zones(warped)
-                warped_with_zone, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id = (
-                    self._draw_tracked_points(warped_with_zone)
-                )
-
-                ret, buffer = cv2.imencode(".jpg", warped_with_zone)
-                # フレームをJPEG形式にエンコード
-                _, buffer = cv2.imencode(".jpg", warped_with_zone)
-                # Base64エンコードしてテキスト形式に変換
-                warped_with_zone_base64 = base64.b64encode(buffer).decode("utf-8")
+            rendered = self.render_frame()
+            if rendered is not None:
+                # フレームをJPEG形式にエンコードし、Base64エンコードしてテキスト形式に変換
+                warped_with_zone_base64 = encode_base64_jpeg(rendered.image)
 
                 return (
                     warped_with_zone_base64,
-                    is_hit,
-                    is_hit_id,
-                    is_pred_hit,
-                    is_pred_hit_id,
+                    rendered.is_hit,
+                    rendered.is_hit_id,
+                    rendered.is_pred_hit,
+                    rendered.is_pred_hit_id,
                 )
             else:
                 # warpedがNoneの場合の処理
@@ -104,59 +262,61 @@ class MainApplication:
             print(f"Unexpected error occurred: {e}")
             return "", is_hit, is_hit_id, is_pred_hit, is_pred_hit_id
 
-    def get_frame(self) -> str:
-        frame = self.camera_thread.frame_buffer.get_frame()
-        height, width, _ = frame.shape
-        print(height, width)
-        if frame is not None:
-            ret, buffer = cv2.imencode(".jpg", frame)
-            # フレームをJPEG形式にエンコード
-            _, buffer = cv2.imencode(".jpg", frame)
-            # Base64エンコードしてテキスト形式に変換
-            frame_base64 = base64.b64encode(buffer).decode("utf-8")
-            return frame_base64
+    def get_frame(self) -> Optional[str]:
+        """カメラの最新フレームをBase64エンコードしたJPEGで返す"""
+        # 検出用のキューからは取り出さず、最新フレームを参照するだけ
+        packet = self.camera_thread.frame_buffer.retain_latest()
+        if packet is None:
+            return None
+        try:
+            jpeg = self.jpeg_cache.get(("raw", packet.seq), packet.frame)
+        finally:
+            packet.release()
+        return base64.b64encode(jpeg).decode("utf-8")
 
     def get_waped(self):
-        frame = self.camera_thread.frame_buffer.get_frame()
-        if len(self.points) == 4:
-            # Calculate homography using vision processor
-            self.vision_processor.calculate_homography(self.points, self.distances)
-            dimensions = self.vision_processor.get_output_dimensions()
-
-            if dimensions is None:
-                return
-
-            # Apply homography transform
-            warped = cv2.warpPerspective(
-                frame, self.vision_processor._matrix, dimensions
-            )
+        packet = self.camera_thread.frame_buffer.retain_latest()
+        if packet is None:
+            return None
+        # フレームを離した後もseqと撮影時刻だけは参照する
+        self.last_frame_packet = packet
+        try:
+            if len(self.points) == 4:
+                # Calculate homography using vision processor
+                self.vision_processor.calculate_homography(self.points, self.distances)
+                # Apply homography transform (and lens undistortion) in one remap
+                warped = self.vision_processor.warp(packet.frame)
 
-            if warped is not None:
-                return warped
+                if warped is not None:
+                    return warped
+        finally:
+            packet.release()
 
     def get_wrap_code(self) -> Tuple[str, int, int]:
-        frame = self.camera_thread.frame_buffer.get_frame()
-        if len(self.points) == 4:
-            # Calculate homography using vision processor
-            self.vision_processor.calculate_homography(self.points, self.distances)
-            dimensions = self.vision_processor.get_output_dimensions()
-
-            if dimensions is None:
-                return
-
-            # Apply homography transform
-            warped = cv2.warpPerspective(
-                frame, self.vision_processor._matrix, dimensions
-            )
-
-            if warped is not None:
-                height, width, _ = warped.shape
-                ret, buffer = cv2.imencode(".jpg", warped)
-                # フレームをJPEG形式にエンコード
-                _, buffer = cv2.imencode(".jpg", warped)
-                # Base64エンコードしてテキスト形式に変換
-                warped_base64 = base64.b64encode(buffer).decode("utf-8")
-                return warped_base64, height, width
+        packet = self.camera_thread.frame_buffer.retain_latest()
+        if packet is None:
+            return "", 0, 0
+        try:
+            if len(self.points) == 4:
+                # Calculate homography using vision processor
+                self.vision_processor.calculate_homography(self.points, self.distances)
+                # Apply homography transform (and lens undistortion) in one remap
+                warped = self.vision_processor.warp(packet.frame)
+
+                if warped is not None:
+                    height, width, _ = warped.shape
+                    # フレームをJPEG形式にエンコードし、Base64エンコードしてテキスト形式に変換
+                    key = (
+                        "warp",
+                        packet.seq,
+                        self.vision_processor.calibration_version,
+                    )
+                    jpeg = self.jpeg_cache.get(key, warped)
+                    warped_base64 = base64.b64encode(jpeg).decode("utf-8")
+                    return warped_base64, height, width
+        finally:
+            packet.release()
+        return "", 0, 0
 
     def set_floor(self, pin_and_distances: PinAndDistance) -> str:
         pin_1_x = int(pin_and_distances.pin_1_x * 16 / 11)
@@ -214,17 +374,15 @@ class MainApplication:
         self.points = [Point.from_dict(p) for p in self.points]
 
         self.save(self.points, self.distances)
+        self.vision_processor.invalidate_calibration()
 
         self.camera_thread.points = self.points
 
         warped = self.get_waped()
 
         if warped is not None:
-            ret, buffer = cv2.imencode(".jpg", warped)
-            # フレームをJPEG形式にエンコード
-            _, buffer = cv2.imencode(".jpg", warped)
-            # Base64エンコードしてテキスト形式に変換
-            warped_base64 = base64.b64encode(buffer).decode("utf-8")
+            # フレームをJPEG形式にエンコードし、Base64エンコードしてテキスト形式に変換
+            warped_base64 = encode_base64_jpeg(warped)
             return warped_base64
 
     def set_zone(self, zones: Pin) -> NDArray:
@@ -250,160 +408,106 @@ class MainApplication:
         if warped is not None:
             warped_with_zone = self._draw_zones(warped)
 
-            ret, buffer = cv2.imencode(".jpg", warped_with_zone)
-            # フレームをJPEG形式にエンコード
-            _, buffer = cv2.imencode(".jpg", warped_with_zone)
-            # Base64エンコードしてテキスト形式に変換
-            warped_with_zone_base64 = base64.b64encode(buffer).decode("utf-8")
+            # フレームをJPEG形式にエンコードし、Base64エンコードしてテキスト形式に変換
+            warped_with_zone_base64 = encode_base64_jpeg(warped_with_zone)
 
             return warped_with_zone_base64
 
     def _draw_zones(self, warped: NDArray) -> NDArray:
         """Draw zones and current polygon"""
-        for zone in self.zone_manager.zones:
-            points = np.array(zone)
-            cv2.fillPoly(
-                warped,
-                [points.astype(np.int32)],
-                (50, 50, 150, 100),
-                lineType=cv2.LINE_AA,
-            )
-            cv2.polylines(
-                warped,
-                [points.astype(np.int32)],
-                True,
-                (100, 100, 200),
-                2,
-                lineType=cv2.LINE_AA,
-            )
+        # ゾーンはキャッシュ済みのオーバーレイを合成するだけ
+        return self.zone_overlay.apply(warped, self.zone_manager)
 
-        return warped
-
-    def _draw_tracked_points(self, warped):
+    def _draw_tracked_points(self, warped, batch=None):
         """Draw tracked points with zone detection"""
-        # print(self.mapped_points)
+        if batch is None:
+            batch = self.tracking_batch
         is_hit = False
         is_hit_id = None
         is_pred_hit = False
         is_pred_hit_id = None
-        for point in self.mapped_points:
-            try:
-                # Process tracking results using vision processor
-                result = self.vision_processor.process_tracking_result(
-                    point, self.zone_manager.zones
-                )
-
-                # Draw current position
-                px, py = result.transformed_coord
-
-                if not (0 <= px < warped.shape[1] and 0 <= py < warped.shape[0]):
-                    continue
-
-                # Check zone collisions
-                zones_hit = self.zone_manager.check_point_in_zones((px, py))
-                if zones_hit:
-                    is_hit = True
-                    is_hit_id = point.get("track_id", "unknown")
-
-                # Color based on zone presence
-                point_color = (0, 255, 255)  # default yellow
-                if result.zones:  # if in any zones
-                    point_color = (0, 255, 0)  # green
-
-                cv2.circle(warped, (int(px), int(py)), 5, point_color, -1)
-
-                # Draw prediction if available
-                if result.prediction:
-                    pred_x, pred_y = result.prediction
-                    if 0 <= pred_x < warped.shape[1] and 0 <= pred_y < warped.shape[0]:
-                        cv2.circle(
-                            warped, (int(pred_x), int(pred_y)), 5, (0, 0, 255), -1
-                        )
-                        cv2.line(
-                            warped,
-                            (int(px), int(py)),
-                            (int(pred_x), int(pred_y)),
-                            (0, 0, 255),
-                            2,
-                        )
-
-                    # Check predicted position zone collisions
-                    pred_zones_hit = self.zone_manager.check_point_in_zones(
-                        (pred_x, pred_y)
-                    )
-                    if pred_zones_hit:
-                        is_pred_hit = True
-                        is_pred_hit_id = point.get("track_id", "unknown")
-
-            except Exception as e:
-                print(f"Error processing tracking result: {e}")
-                continue
-
-        return warped, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id
-
-    def handle_mapped_point(self, point_data):
-        """Process mapped points from tracking"""
-        if point_data is None:
-            self.clear_mapped_points()
-            return
+        if len(batch) == 0:
+            return warped, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id
 
         try:
-            # Update or add point tracking data
-            existing_point = next(
-                (
-                    p
-                    for p in self.mapped_points
-                    if p.get("track_id") == point_data["track_id"]
-                ),
-                None,
+            # ゾーンのラベルマスクはゾーンかキャリブレーションが変わった時だけ作り直す
+            self.zone_manager.update_label_mask(
+                (warped.shape[1], warped.shape[0]),
+                self.vision_processor.calibration_version,
             )
+            # 全員分の座標変換とゾーン判定を1回で行う
+            result = self.vision_processor.process_tracking_batch(
+                batch, self.zone_manager.zones, self.zone_manager.zones_at
+            )
+        except Exception as e:
+            print(f"Error processing tracking result: {e}")
+            return warped, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id
 
-            current_time = time.time()
-
-            if existing_point:
-                existing_point.update(
-                    {
-                        "prev_coord": existing_point["coord"],
-                        "coord": point_data["coord"],
-                        "mapped": point_data["mapped"],
-                        "last_update": current_time,
-                    }
-                )
-
-                # Calculate prediction
-                if "prev_coord" in existing_point:
-                    dx = existing_point["coord"][0] - existing_point["prev_coord"][0]
-                    dy = existing_point["coord"][1] - existing_point["prev_coord"][1]
+        height, width = warped.shape[:2]
 
-                    speed = np.sqrt(dx * dx + dy * dy)
-                    scale = min(max(speed / 10, 3.0), 15.0)
+        def in_frame(points):
+            return (
+                (points[:, 0] >= 0)
+                & (points[:, 0] < width)
+                & (points[:, 1] >= 0)
+                & (points[:, 1] < height)
+            )
 
-                    existing_point["predicted"] = (
-                        existing_point["mapped"][0] + dx * scale,
-                        existing_point["mapped"][1] + dy * scale,
-                    )
-            else:
-                point_data["last_update"] = current_time
-                self.mapped_points.append(point_data)
+        visible = in_frame(result.transformed_coords)
+        hit = visible & result.zones.any(axis=1)
+        pred_hit = visible & result.prediction_zones.any(axis=1)
+        if hit.any():
+            is_hit = True
+            is_hit_id = int(result.track_ids[hit][-1])
+        if pred_hit.any():
+            is_pred_hit = True
+            is_pred_hit_id = int(result.track_ids[pred_hit][-1])
+
+        # Draw current positions (green inside a zone, yellow otherwise)
+        # and predictions that fall inside the frame
+        pred_visible = in_frame(result.predictions)
+        for (px, py), (pred_x, pred_y), in_zone, show_pred in zip(
+            result.transformed_coords[visible].astype(int).tolist(),
+            result.predictions[visible].astype(int).tolist(),
+            hit[visible].tolist(),
+            pred_visible[visible].tolist(),
+        ):
+            point_color = (0, 255, 0) if in_zone else (0, 255, 255)
+            cv2.circle(warped, (px, py), 5, point_color, -1)
+            if show_pred:
+                cv2.circle(warped, (pred_x, pred_y), 5, (0, 0, 255), -1)
+                cv2.line(warped, (px, py), (pred_x, pred_y), (0, 0, 255), 2)
 
-            # Clean up old points
-            self.mapped_points = [
-                p for p in self.mapped_points if current_time - p["last_update"] < 1.0
-            ]
+        return warped, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id
 
-            # self.update_sim_frame()
+    def handle_tracking_batch(self, batch: TrackingBatch) -> None:
+        """カメラスレッドから1フレーム分の追跡結果をまとめて受け取る"""
+        self.tracking_batch = batch
 
-        except Exception as e:
-            print(f"Error mapping point: {e}")
+    def handle_points_changed(self, points):
+        """Adopt homography points edited on the camera thread"""
+        self.points = points
+        self.vision_processor.invalidate_calibration()
 
     def clear_mapped_points(self):
         """Clear all mapped tracking points"""
-        self.mapped_points = []
+        self.tracking_batch = TrackingBatch()
 
 
 # camera_thread = Camera_Thread(buffer_all=False)
 
-main_app = MainApplication()
+# カメラごとのパイプラインを管理する (cameras.json がなければカメラ0だけ)
+cameras_file = os.getenv("CAMERAS_FILE", "cameras.json")
+camera_manager = CameraManager(MainApplication.from_config)
+camera_manager.load(cameras_file)
+
+
+def get_main_app(camera_id: Optional[str] = None) -> MainApplication:
+    """カメラIDのパイプラインを返す (Noneなら既定のカメラ)"""
+    try:
+        return camera_manager.get(camera_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown camera: {camera_id}")
 
 
 @asynccontextmanager
@@ -411,5 +515,7 @@ async def lifespan(app: FastAPI):
     print("startup event")
     yield
     print("Stopping the server...")
-    main_app.stop()  # カメラスレッドの停止処理
+    camera_manager.stop_all()  # カメラスレッドの停止処理
+    if inference_server is not None:
+        inference_server.stop()
     print("Server stopped gracefully.")
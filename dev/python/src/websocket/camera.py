@@ -1,8 +1,13 @@
 import asyncio
+import base64
 import json
+import time
+from typing import Any, Dict, Optional, Set
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from utils.setup import main_app
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from lib.frame_codec import RenderedFrame, StreamProfile, encode_jpeg, pack_frame
+from lib.stream_hub import StreamHub
+from utils.setup import camera_manager, get_main_app
 
 router = APIRouter(
     prefix="/ws/camera",
@@ -11,39 +16,123 @@ router = APIRouter(
 )
 
 
+def render_payloads(main_app, profiles: Set[StreamProfile]) -> Dict[StreamProfile, Any]:
+    """フレームを1回だけ描画し、配信設定ごとに1回だけエンコードする"""
+    rendered = main_app.render_frame()
+    if rendered is None:
+        # キャリブレーション前は画像なしでフラグだけを送る
+        now = time.time()
+        rendered = RenderedFrame(image=None, seq=0, capture_time=now, render_time=now)
+
+    payloads = {}
+    for profile in profiles:
+        jpeg = b""
+        if rendered.image is not None:
+            jpeg = encode_jpeg(
+                rendered.image, quality=profile.quality, max_width=profile.max_width
+            )
+        if profile.binary:
+            # ヘッダー + JPEGのバイナリフレーム
+            payloads[profile] = pack_frame(jpeg, rendered)
+        else:
+            # 従来のBase64 JSON形式
+            payloads[profile] = json.dumps(
+                {
+                    "image": base64.b64encode(jpeg).decode("utf-8"),
+                    "is_hit": rendered.is_hit,
+                    "is_hit_id": rendered.is_hit_id,
+                    "is_pred_hit": rendered.is_pred_hit,
+                    "is_pred_hit_id": rendered.is_pred_hit_id,
+                }
+            )
+    return payloads
+
+
+async def render_payloads_async(
+    camera_id: str, profiles: Set[StreamProfile]
+) -> Dict[StreamProfile, Any]:
+    """描画処理をイベントループ外のカメラ専用レンダースレッドで実行する"""
+    # ホットリロード後も新しいパイプラインを参照するよう毎回引き直す
+    if camera_id not in camera_manager:
+        return {}
+    main_app = camera_manager.get(camera_id)
+    return await main_app.render_executor.run(render_payloads, main_app, profiles)
+
+
+# カメラごとに全クライアントで共有する配信ハブ (約30fps)
+camera_hubs: Dict[str, StreamHub] = {}
+# ハブを動かしているイベントループ (カメラ停止の通知は別スレッドから届く)
+hub_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_camera_hub(camera_id: str) -> StreamHub:
+    """カメラの配信ハブを返す (初回接続時に作成)"""
+    global hub_loop
+    hub_loop = asyncio.get_running_loop()
+    hub = camera_hubs.get(camera_id)
+    if hub is None:
+
+        async def render(profiles: Set[StreamProfile]) -> Dict[StreamProfile, Any]:
+            return await render_payloads_async(camera_id, profiles)
+
+        hub = StreamHub(render=render, frame_interval=0.03)
+        camera_hubs[camera_id] = hub
+    return hub
+
+
+def close_camera_hub(camera_id: str) -> None:
+    """カメラが削除されたら配信ハブを閉じ、接続中のクライアントを切断する"""
+    hub = camera_hubs.pop(camera_id, None)
+    if hub is None or hub_loop is None or hub_loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(hub.close(), hub_loop)
+
+
+camera_manager.add_stop_listener(close_camera_hub)
+
+
 # WebSocketエンドポイント
+# format=binary でバイナリフレーム、quality / width で画質と解像度を指定できる
+# camera_id のないルートは既定のカメラ (0) を配信する
 @router.websocket("/get")
-async def websocket_endpoint(websocket: WebSocket):
+@router.websocket("/{camera_id}/get")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    camera_id: Optional[str] = None,
+    format: str = "json",
+    quality: int = 95,
+    width: Optional[int] = None,
+):
+    try:
+        camera_id = get_main_app(camera_id).camera_id
+    except HTTPException:
+        await websocket.close(code=1008)  # 存在しないカメラ
+        return
+    camera_hub = get_camera_hub(camera_id)
     await websocket.accept()  # WebSocket接続を承認
 
+    profile = StreamProfile(
+        binary=format == "binary",
+        quality=min(max(quality, 1), 100),
+        max_width=width,
+    )
+    queue = await camera_hub.subscribe(profile)
     try:
         while True:
-            warped_with_zone_base64, is_hit, is_hit_id, is_pred_hit, is_pred_hit_id = (
-                main_app.next()
-            )
-            print(type(is_hit), is_hit)
-            print(type(is_hit_id), is_hit_id)
-            print(type(is_pred_hit), is_pred_hit)
-            print(type(is_pred_hit_id), is_pred_hit_id)
-
-            if warped_with_zone_base64 is not None:
-                data = {
-                    "image": warped_with_zone_base64,
-                    "is_hit": is_hit,
-                    "is_hit_id": is_hit_id,
-                    "is_pred_hit": is_pred_hit,
-                    "is_pred_hit_id": is_pred_hit_id,
-                }
-                json_data = json.dumps(data)
-                # WebSocketで送信
-                await websocket.send_text(json_data)
-                # 適切なフレームレートで送信
-                await asyncio.sleep(0.03)  # 約30fps
-            else:
-                print("not frame")
+            payload = await queue.get()
+            if payload is None:
+                # カメラが削除されたので接続を閉じる
+                await websocket.close(code=1001)
                 break
+            # WebSocketで送信
+            if profile.binary:
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
 
     except WebSocketDisconnect:
         print("WebSocket disconnected")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        camera_hub.unsubscribe(queue)